@@ -3,11 +3,13 @@
 
 Scans a messages folder for CSV files and collects every attachment along
 with the sender and recipients of the message that referenced it. Results
-are written to an Excel workbook and an accompanying HTML table with
-thumbnails of image attachments.
+are written to an Excel workbook (or CSV, JSONL, Parquet or SQLite with
+``--log-format``) and an accompanying HTML table with thumbnails of image
+attachments. ``--html virtual`` replaces the table with a virtual-scrolling
+viewer for very large logs (see :mod:`synchronoss_parser.attachment_viewer`).
 
 Usage:
-    attachment-log [--messages DIR] [--out DIR]
+    attachment-log [--messages DIR] [--out DIR] [--log-format FMT] [--html virtual] [--sprites] [--thumb-format webp] [--profile]
     python -m synchronoss_parser.attachment_log [--messages DIR] [--out DIR]
 
 By default it expects a ``messages`` folder in the current working
@@ -17,31 +19,38 @@ directory and writes outputs under ``Attachment Log``.
 import argparse
 import csv
 import html
-import logging
 import os
 from pathlib import Path
-from typing import List, Tuple
-
-from openpyxl import Workbook
-from PIL import Image
+from typing import Dict, List, Optional, Tuple
 
+from .attachment_viewer import href, write_viewer
+from .log_sinks import LOG_FORMATS, open_sink
+from .profiling import add_profile_arguments, profile_from_args, span
 from .render_transcripts import (
     Message,
     build_attachment_path,
     derive_attachment_day_from_csv_name,
+    parse_csv_date,
     split_attachments,
 )
+from .sprites import SpriteSheets
+from .thumbnails import DEFAULT_SIZE, THUMBNAIL_FORMATS, ThumbnailCache, create_thumbnail
+
 
+AttachmentEntry = Tuple[str, str, str, str, str, str, str]
+# (filename, sender, recipient, msg_type, direction, day, date)
 
-AttachmentEntry = Tuple[str, str, str, str, str, str]
-# (filename, sender, recipient, msg_type, direction, day)
+LOG_COLUMNS = ["filename", "sender", "recipient"]
+
+# "table" writes one HTML table; "virtual" writes a viewer with data shards
+HTML_MODES = ("table", "virtual")
 
 
 def collect_attachments(messages_root: Path) -> List[AttachmentEntry]:
     entries: List[AttachmentEntry] = []
     for csv_file in sorted(messages_root.glob("*.csv")):
         day = derive_attachment_day_from_csv_name(csv_file) or ""
-        with csv_file.open("r", encoding="utf-8", newline="") as f:
+        with span("csv_parse", csv_file.stat().st_size), csv_file.open("r", encoding="utf-8", newline="") as f:
             reader = csv.DictReader(f)
             for row in reader:
                 attachments = split_attachments(row.get("Attachments") or "")
@@ -60,74 +69,171 @@ def collect_attachments(messages_root: Path) -> List[AttachmentEntry]:
                     attachment_day=day,
                 )
                 for fname in attachments:
-                    entries.append((fname, msg.sender, msg.recipients, msg.msg_type, msg.direction, day))
+                    entries.append(
+                        (fname, msg.sender, msg.recipients, msg.msg_type, msg.direction, day, msg.date_raw)
+                    )
     return entries
 
 
-def create_thumbnail(src: Path, dest: Path, size: Tuple[int, int] = (128, 128)) -> bool:
-    """Create a thumbnail image.
-
-    Returns ``True`` on success, ``False`` if the source cannot be processed
-    as an image or the thumbnail cannot be written.
+def generate_log(
+    messages_root: Path,
+    out_dir: Path,
+    log_format: Optional[str] = None,
+    thumb_size: int = DEFAULT_SIZE[0],
+    thumb_format: str = "source",
+    thumb_quality: Optional[int] = None,
+    thumb_workers: int = 1,
+    html_mode: str = "table",
+    sprite_sheets: bool = False,
+) -> Dict[str, int]:
+    """Write the attachment log and HTML page into ``out_dir``.
+
+    ``html_mode`` is one of :data:`HTML_MODES`. ``"virtual"`` writes the
+    rows as data shards with a virtual-scrolling viewer instead of a single
+    table, for logs too large for the browser to lay out at once.
+
+    Thumbnails come from a :class:`~synchronoss_parser.thumbnails.ThumbnailCache`
+    in ``out_dir/thumbnails``, so re-runs only render new or changed images.
+    Missing ones are rendered on ``thumb_workers`` processes as
+    ``thumb_size`` pixel ``thumb_format`` images. With ``sprite_sheets``
+    they are packed into :class:`~synchronoss_parser.sprites.SpriteSheets`
+    in ``out_dir/sprites`` and shown with CSS offsets; packed thumbnails no
+    longer keep their own file. Returns the cache statistics (``reused``,
+    ``created`` and ``failed``).
     """
-    try:
-        with Image.open(src) as img:
-            img.thumbnail(size)
-            dest.parent.mkdir(parents=True, exist_ok=True)
-            img.save(dest)
-        return True
-    except Exception:
-        return False
-
-
-def generate_log(messages_root: Path, out_dir: Path) -> None:
+    if html_mode not in HTML_MODES:
+        raise ValueError(f"Unknown HTML mode '{html_mode}'. Choose from: {', '.join(HTML_MODES)}")
     entries = collect_attachments(messages_root)
     out_dir.mkdir(parents=True, exist_ok=True)
-    thumb_dir = out_dir / "thumbnails"
-    thumb_dir.mkdir(parents=True, exist_ok=True)
-
-    wb = Workbook()
-    ws = wb.active
-    ws.append(["filename", "sender", "recipient"])
+    thumbs = ThumbnailCache(out_dir / "thumbnails", (thumb_size, thumb_size), thumb_format, thumb_quality)
+    attach_paths = [
+        build_attachment_path(messages_root, msg_type, direction, day, fname)
+        for fname, _, _, msg_type, direction, day, _ in entries
+    ]
+    sprites = None
+    if sprite_sheets:
+        sprites = SpriteSheets(out_dir / "sprites", (thumb_size, thumb_size), thumb_format, thumb_quality)
+    thumb_paths = thumbs.get_many(attach_paths, thumb_workers, stored=sprites)
+    if sprites is not None:
+        sprites.pack(dict.fromkeys(p for p in thumb_paths.values() if p))
+        sprites.save()
+        thumb_paths = {
+            src: _sprite_ref(sprites, thumb) if thumb else None for src, thumb in thumb_paths.items()
+        }
 
     html_rows = []
-    for fname, sender, recipient, msg_type, direction, day in entries:
-        ws.append([fname, sender, recipient])
-        attach_path = build_attachment_path(messages_root, msg_type, direction, day, fname)
-        thumb_path = thumb_dir / msg_type / direction / day / fname
-        if not create_thumbnail(attach_path, thumb_path):
-            logging.warning("Failed to create thumbnail for %s", attach_path)
-            thumb_path = None
-        html_rows.append((fname, sender, recipient, attach_path, thumb_path))
-
-    wb.save(out_dir / "attachment_log.xlsx")
-
-    html_file = out_dir / "attachment_log.html"
-    with html_file.open("w", encoding="utf-8") as f:
+    with open_sink(out_dir / "attachment_log.xlsx", LOG_COLUMNS, log_format) as sink:
+        for (fname, sender, recipient, *_, day, date), attach_path in zip(entries, attach_paths):
+            sink.write({"filename": fname, "sender": sender, "recipient": recipient})
+            # The viewer filters and sorts dates as text, so it needs ISO dates
+            shown = _iso_date(date, day) if html_mode == "virtual" else date or day
+            html_rows.append((fname, sender, recipient, shown, attach_path, thumb_paths[os.fspath(attach_path)]))
+    thumbs.save()
+
+    if html_mode == "virtual":
+        write_viewer(out_dir, _viewer_rows(html_rows, out_dir), thumb_size)
+    else:
+        _write_table(out_dir / "attachment_log.html", html_rows, out_dir)
+    return thumbs.stats
+
+
+def _iso_date(date_raw: str, day: str) -> str:
+    """Return ``date_raw`` as an ISO timestamp, or the folder ``day`` if it cannot be parsed."""
+    parsed = parse_csv_date(date_raw)
+    if parsed is not None:
+        return parsed.isoformat()
+    return day or date_raw
+
+
+def _relative(path: Path, out_dir: Path) -> str:
+    return os.path.relpath(path, start=out_dir).replace(os.sep, "/")
+
+
+def _sprite_ref(sprites: SpriteSheets, thumb: Path):
+    ref = sprites.ref(thumb.name)
+    if ref is None:
+        return None
+    sheet, x, y, w, h = ref
+    return (sprites.sprite_dir / sheet, x, y, w, h)
+
+
+def _viewer_rows(html_rows, out_dir: Path):
+    for fname, sender, recipient, date, attach_path, thumb_path in html_rows:
+        if isinstance(thumb_path, tuple):
+            sheet, x, y, w, h = thumb_path
+            thumb = [href(_relative(sheet, out_dir)), x, y, w, h]
+        else:
+            thumb = href(_relative(thumb_path, out_dir)) if thumb_path else ""
+        yield (fname, sender, recipient, date, href(_relative(attach_path, out_dir)), thumb)
+
+
+def _thumb_html(thumb_path, out_dir: Path) -> str:
+    if isinstance(thumb_path, tuple):
+        sheet, x, y, w, h = thumb_path
+        return (
+            f'<div style="width:{w}px;height:{h}px;'
+            f'background:url({href(_relative(sheet, out_dir))}) -{x}px -{y}px no-repeat"></div>'
+        )
+    return f'<img src="{_relative(thumb_path, out_dir)}" />'
+
+
+def _write_table(html_file: Path, html_rows, out_dir: Path) -> None:
+    with span("write_html"), html_file.open("w", encoding="utf-8") as f:
         f.write("<table>\n")
         f.write("<tr><th>filename</th><th>sender</th><th>recipient</th><th>thumbnail</th></tr>\n")
-        for fname, sender, recipient, attach_path, thumb_path in html_rows:
+        for fname, sender, recipient, _, attach_path, thumb_path in html_rows:
             link = html.escape(fname)
-            rel = os.path.relpath(attach_path, start=out_dir).replace(os.sep, "/")
+            rel = _relative(attach_path, out_dir)
             f.write("<tr>")
             f.write(f'<td><a href="{rel}">{link}</a></td>')
             f.write(f"<td>{html.escape(sender)}</td>")
             f.write(f"<td>{html.escape(recipient)}</td>")
-            if thumb_path and thumb_path.exists():
-                rel_thumb = os.path.relpath(thumb_path, start=out_dir).replace(os.sep, "/")
-                f.write(f'<td><img src="{rel_thumb}" /></td>')
+            if thumb_path:
+                f.write(f"<td>{_thumb_html(thumb_path, out_dir)}</td>")
             else:
                 f.write("<td></td>")
             f.write("</tr>\n")
         f.write("</table>\n")
 
 
-def main() -> None:
+def main(argv: Optional[List[str]] = None) -> None:
     ap = argparse.ArgumentParser(description="Generate attachment log")
     ap.add_argument("--messages", default="messages", help="Folder containing message CSVs")
     ap.add_argument("--out", default="Attachment Log", help="Output folder")
-    args = ap.parse_args()
-    generate_log(Path(args.messages), Path(args.out))
+    ap.add_argument("--log-format", choices=LOG_FORMATS, help="Format of attachment_log (default: xlsx)")
+    ap.add_argument(
+        "--html",
+        choices=HTML_MODES,
+        default="table",
+        help="HTML output: one table, or a virtual-scrolling viewer for large logs (default: table)",
+    )
+    ap.add_argument(
+        "--sprites",
+        action="store_true",
+        help="Pack thumbnails into sprite sheets of 256 instead of one file each",
+    )
+    ap.add_argument("--thumb-size", type=int, default=DEFAULT_SIZE[0], help=f"Thumbnail bounding box in pixels (default: {DEFAULT_SIZE[0]})")
+    ap.add_argument("--thumb-format", choices=THUMBNAIL_FORMATS, default="source", help="Thumbnail format (default: same as the source)")
+    ap.add_argument("--thumb-quality", type=int, help="Quality for jpeg/webp thumbnails (1-100)")
+    ap.add_argument("--thumb-workers", type=int, default=os.cpu_count() or 1, help="Processes rendering thumbnails (default: CPU count)")
+    add_profile_arguments(ap)
+    args = ap.parse_args(argv)
+    with profile_from_args(args):
+        stats = generate_log(
+            Path(args.messages),
+            Path(args.out),
+            args.log_format,
+            thumb_size=args.thumb_size,
+            thumb_format=args.thumb_format,
+            thumb_quality=args.thumb_quality,
+            thumb_workers=args.thumb_workers,
+            html_mode=args.html,
+            sprite_sheets=args.sprites,
+        )
+    print(
+        f"Thumbnails: {stats['created']} created, {stats['reused']} reused from cache, "
+        f"{stats['failed']} could not be rendered."
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,213 @@
+"""Virtual-scrolling HTML viewer for large attachment logs.
+
+A single ``<table>`` with one row per attachment stops being usable long
+before 100,000 rows: the page runs to tens of megabytes and the browser lays
+out every row and requests every thumbnail up front. The viewer written here
+keeps the rows out of the page instead. They are stored as JavaScript data
+shards of :data:`SHARD_SIZE` rows in ``attachment_log_data/``, loaded with
+plain ``<script>`` tags so the page also works when opened from disk, where
+``fetch`` is not allowed.
+
+The page renders only the rows inside the scrolled window (plus a small
+margin) into a fixed-height spacer, so the DOM stays at a few dozen rows no
+matter how long the log is. Thumbnails are created with the rows that show
+them, which makes them load lazily; thumbnails packed into sprite sheets are
+shown as CSS backgrounds with an offset. Columns sort on click, and sender,
+recipient and a date range filter the rows on the client.
+"""
+
+from __future__ import annotations
+
+import json
+import shutil
+from pathlib import Path
+from string import Template
+from typing import Iterable, List, Optional, Sequence
+from urllib.parse import quote
+
+from .profiling import span
+
+SHARD_SIZE = 5000
+DATA_DIR = "attachment_log_data"
+
+# (filename, sender, recipient, date, attachment href, thumbnail): the thumbnail
+# is an href, "" or a sprite sheet cell [sheet href, x, y, width, height]
+ViewerRow = Sequence[object]
+
+
+def href(rel_path: str) -> str:
+    """Return ``rel_path`` (``/`` separated) quoted for use in a URL."""
+    return quote(rel_path, safe="/")
+
+
+def _write_shard(path: Path, rows: List[ViewerRow]) -> None:
+    with path.open("w", encoding="utf-8") as f:
+        f.write("ATTACHMENT_ROWS.push.apply(ATTACHMENT_ROWS, ")
+        json.dump([list(r) for r in rows], f, separators=(",", ":"))
+        f.write(");\n")
+
+
+def write_viewer(
+    out_dir: Path,
+    rows: Iterable[ViewerRow],
+    thumb_size: int = 128,
+    html_name: str = "attachment_log.html",
+    shard_size: int = SHARD_SIZE,
+) -> Path:
+    """Write the viewer page and its data shards into ``out_dir``.
+
+    ``rows`` are streamed into shards as they arrive, so the full list is
+    never held as one JSON document. Shards left over from an earlier, longer
+    run are removed. Returns the path of the page.
+    """
+    data_dir = out_dir / DATA_DIR
+    if data_dir.exists():
+        shutil.rmtree(data_dir)
+    data_dir.mkdir(parents=True)
+
+    shards: List[str] = []
+    batch: List[ViewerRow] = []
+    with span("write_html"):
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= shard_size:
+                shards.append(f"{DATA_DIR}/rows-{len(shards):05d}.js")
+                _write_shard(out_dir / shards[-1], batch)
+                batch = []
+        if batch or not shards:
+            shards.append(f"{DATA_DIR}/rows-{len(shards):05d}.js")
+            _write_shard(out_dir / shards[-1], batch)
+
+        page = out_dir / html_name
+        scripts = "\n".join(f'<script src="{href(s)}"></script>' for s in shards)
+        page.write_text(
+            VIEWER_TEMPLATE.substitute(
+                thumb=thumb_size,
+                row=thumb_size + 8,
+                shards=scripts,
+            ),
+            encoding="utf-8",
+        )
+    return page
+
+
+VIEWER_TEMPLATE = Template(
+    """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Attachment Log</title>
+<style>
+body { margin: 0; font: 14px system-ui, sans-serif; }
+#bar { display: flex; flex-wrap: wrap; gap: 8px; align-items: center; padding: 8px; background: #f3f4f6; }
+#head, .row { display: grid; grid-template-columns: 3fr 2fr 2fr 11em ${thumb}px; gap: 8px; align-items: center; padding: 0 8px; }
+#head { height: 32px; font-weight: 600; background: #e5e7eb; }
+#head span[data-col] { cursor: pointer; user-select: none; }
+#viewport { height: calc(100vh - 82px); overflow-y: auto; }
+#spacer { position: relative; }
+.row { position: absolute; left: 0; right: 0; height: ${row}px; box-sizing: border-box; border-bottom: 1px solid #eee; }
+.row span { overflow: hidden; text-overflow: ellipsis; white-space: nowrap; }
+.row img { max-width: ${thumb}px; max-height: ${thumb}px; }
+</style>
+</head>
+<body>
+<div id="bar">
+<input id="f-sender" placeholder="Sender">
+<input id="f-recipient" placeholder="Recipient">
+<label>From <input id="f-from" type="date"></label>
+<label>To <input id="f-to" type="date"></label>
+<span id="count"></span>
+</div>
+<div id="head"><span data-col="0">filename</span><span data-col="1">sender</span><span data-col="2">recipient</span><span data-col="3">date</span><span>thumbnail</span></div>
+<div id="viewport"><div id="spacer"></div></div>
+<script>var ATTACHMENT_ROWS = [];</script>
+${shards}
+<script>
+(function () {
+  var ROW = ${row}, OVERSCAN = 10;
+  var rows = ATTACHMENT_ROWS, view = rows, sortCol = -1, sortDir = 1, first = -1, last = -1;
+  var viewport = document.getElementById("viewport");
+  var spacer = document.getElementById("spacer");
+  var count = document.getElementById("count");
+  var ESC = {"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;"};
+  function esc(s) { return String(s).replace(/[&<>"]/g, function (c) { return ESC[c]; }); }
+  function value(id) { return document.getElementById(id).value.trim().toLowerCase(); }
+
+  function thumbnail(r) {
+    var t = r[5];
+    if (!t) return "";
+    if (typeof t === "string") return '<img loading="lazy" src="' + esc(t) + '">';
+    // Sprite sheet cell: [sheet, x, y, width, height]
+    return '<div style="width:' + t[3] + 'px;height:' + t[4] + 'px;background:url(' + esc(t[0]) +
+      ') -' + t[1] + 'px -' + t[2] + 'px no-repeat"></div>';
+  }
+
+  function render(force) {
+    var top = viewport.scrollTop, height = viewport.clientHeight;
+    var start = Math.max(0, Math.floor(top / ROW) - OVERSCAN);
+    var end = Math.min(view.length, Math.ceil((top + height) / ROW) + OVERSCAN);
+    if (!force && start === first && end === last) return;
+    first = start; last = end;
+    var out = [];
+    for (var i = start; i < end; i++) {
+      var r = view[i];
+      out.push('<div class="row" style="top:' + (i * ROW) + 'px">' +
+        '<span><a href="' + esc(r[4]) + '">' + esc(r[0]) + '</a></span>' +
+        '<span>' + esc(r[1]) + '</span><span>' + esc(r[2]) + '</span>' +
+        '<span>' + esc(r[3]) + '</span><span>' + thumbnail(r) + '</span></div>');
+    }
+    spacer.innerHTML = out.join("");
+  }
+
+  function sortView() {
+    var c = sortCol, d = sortDir;
+    view.sort(function (a, b) {
+      var x = a[c].toLowerCase(), y = b[c].toLowerCase();
+      return x < y ? -d : x > y ? d : 0;
+    });
+  }
+
+  function update() {
+    var sender = value("f-sender"), recipient = value("f-recipient");
+    var from = value("f-from"), to = value("f-to");
+    if (sender || recipient || from || to) {
+      view = rows.filter(function (r) {
+        var day = r[3].slice(0, 10);
+        return (!sender || r[1].toLowerCase().indexOf(sender) >= 0) &&
+          (!recipient || r[2].toLowerCase().indexOf(recipient) >= 0) &&
+          (!from || day >= from) && (!to || day <= to);
+      });
+    } else {
+      view = rows.slice();
+    }
+    if (sortCol >= 0) sortView();
+    spacer.style.height = (view.length * ROW) + "px";
+    count.textContent = view.length + " of " + rows.length + " attachments";
+    render(true);
+  }
+
+  var pending = false;
+  viewport.addEventListener("scroll", function () {
+    if (pending) return;
+    pending = true;
+    requestAnimationFrame(function () { pending = false; render(false); });
+  });
+  window.addEventListener("resize", function () { render(true); });
+  ["f-sender", "f-recipient", "f-from", "f-to"].forEach(function (id) {
+    document.getElementById(id).addEventListener("input", update);
+  });
+  document.querySelectorAll("#head span[data-col]").forEach(function (el) {
+    el.addEventListener("click", function () {
+      var c = Number(el.getAttribute("data-col"));
+      sortDir = c === sortCol ? -sortDir : 1;
+      sortCol = c;
+      update();
+    });
+  });
+  update();
+})();
+</script>
+</body>
+</html>
+"""
+)
@@ -0,0 +1,214 @@
+"""Call activity summaries for annotated call logs.
+
+Analysts used to rebuild the same pivot tables from ``call_log_named.csv``
+in Excel, which struggles long before a call log reaches millions of rows.
+:class:`CallSummary` computes them once in pandas instead:
+
+* ``by_contact`` – one row per contact: total calls, calls per direction,
+  first and last call, total duration and a 24-column hour-of-day
+  histogram.
+* ``by_day`` – one row per day: total calls, calls per direction, distinct
+  contacts and total duration.
+
+Each call is turned into one wide row (direction and hour one-hot encoded)
+so both tables come out of a single ``groupby().agg()``. Chunks of a
+streamed log are summarized as they pass and the partial tables are
+combined at the end, so the summary needs no more memory than the merge.
+
+The contact of a call is its other party: the recipient of outgoing calls
+and the caller of anything else. Without a direction column each call
+counts for both parties, as ``in`` for the caller and ``out`` for the
+recipient. Timestamps with an offset are converted to UTC; naive ones are
+taken as they are.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import pandas as pd
+
+from .log_sinks import open_sink
+
+# Candidate column names, matched case-insensitively in this order
+PARTY_COLUMNS = [("caller", "recipient"), ("sender", "recipients")]
+DATE_COLUMNS = ("date", "datetime", "timestamp", "start_time", "start", "call_date", "time")
+DIRECTION_COLUMNS = ("direction", "call_type", "type")
+DURATION_COLUMNS = ("duration", "duration_seconds", "call_duration")
+# Direction values whose contact is the recipient
+OUTGOING = {"out", "outgoing", "dialed", "dialled", "sent"}
+
+HOUR_COLUMNS = [f"hour_{h:02d}" for h in range(24)]
+SUMMARY_TABLES = {"by_contact": "Calls by Contact", "by_day": "Calls by Day"}
+
+
+def _find(columns: Sequence[str], candidates: Sequence[str]) -> Optional[str]:
+    lower = {c.strip().lower(): c for c in columns}
+    for name in candidates:
+        if name in lower:
+            return lower[name]
+    return None
+
+
+def parse_dates(values: pd.Series) -> pd.Series:
+    """Parse a column of date strings, trying one inferred format first."""
+    parsed = pd.to_datetime(values, errors="coerce", utc=True)
+    missing = parsed.isna() & values.notna()
+    if missing.any():
+        parsed[missing] = pd.to_datetime(values[missing], errors="coerce", utc=True, format="mixed")
+    return parsed
+
+
+def parse_durations(values: pd.Series) -> pd.Series:
+    """Return call durations in seconds from seconds or ``HH:MM:SS`` text."""
+    seconds = pd.to_numeric(values, errors="coerce")
+    missing = seconds.isna() & values.notna()
+    if missing.any():
+        seconds[missing] = pd.to_timedelta(values[missing], errors="coerce").dt.total_seconds()
+    return seconds
+
+
+class CallSummary:
+    """Accumulate per-contact and per-day call aggregates over log chunks."""
+
+    def __init__(self):
+        self._contacts: List[pd.DataFrame] = []
+        self._days: List[pd.DataFrame] = []
+        self._pairs: List[pd.DataFrame] = []
+        self.calls = 0
+        self.has_duration = False
+
+    def _calls(self, df: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """Return one row per (call, contact) with the columns to aggregate."""
+        columns = list(df.columns)
+        parties = next(
+            (p for p in PARTY_COLUMNS if _find(columns, p[:1]) and _find(columns, p[1:])), None
+        )
+        if parties is None:
+            return None
+        sides = []
+        for party in parties:
+            column = _find(columns, (party,))
+            named = _find(columns, (f"{party}_name",))
+            sides.append(df[named].fillna(df[column]) if named else df[column])
+        caller, recipient = sides
+
+        date_col = _find(columns, DATE_COLUMNS)
+        direction_col = _find(columns, DIRECTION_COLUMNS)
+        duration_col = _find(columns, DURATION_COLUMNS)
+        when = parse_dates(df[date_col]) if date_col else pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns, UTC]")
+        duration = parse_durations(df[duration_col]) if duration_col else pd.Series(float("nan"), index=df.index)
+        self.has_duration = self.has_duration or duration_col is not None
+
+        if direction_col:
+            direction = df[direction_col].fillna("").astype(str).str.strip().str.lower()
+            contact = recipient.where(direction.isin(OUTGOING), caller)
+            calls = pd.DataFrame({"contact": contact, "direction": direction, "when": when, "duration": duration})
+        else:
+            calls = pd.concat(
+                [
+                    pd.DataFrame({"contact": caller, "direction": "in", "when": when, "duration": duration}),
+                    pd.DataFrame({"contact": recipient, "direction": "out", "when": when, "duration": duration}),
+                ],
+                ignore_index=True,
+            )
+        calls["contact"] = calls["contact"].fillna("").astype(str).str.strip()
+        calls = calls[calls["contact"] != ""]
+        calls["direction"] = calls["direction"].replace("", "unknown")
+        return calls
+
+    def add(self, df: pd.DataFrame) -> None:
+        """Summarize one chunk of an annotated call log."""
+        calls = self._calls(df)
+        if calls is None or calls.empty:
+            return
+        self.calls += len(calls)
+        hour = pd.Categorical(calls["when"].dt.hour, categories=range(24))
+        wide = pd.concat(
+            [
+                calls[["contact", "duration"]].assign(
+                    day=calls["when"].dt.normalize(), calls=1, first=calls["when"], last=calls["when"]
+                ),
+                pd.get_dummies(calls["direction"], prefix="calls", dtype=int),
+                pd.DataFrame(
+                    pd.get_dummies(hour, dtype=int).to_numpy(), columns=HOUR_COLUMNS, index=calls.index
+                ),
+            ],
+            axis=1,
+        )
+        direction_cols = [c for c in wide.columns if c.startswith("calls_")]
+        counts = ["calls"] + direction_cols
+        self._contacts.append(wide.groupby("contact").agg(_spec(counts + HOUR_COLUMNS, first=True)))
+        self._days.append(wide.groupby("day").agg(_spec(counts, first=False)))
+        self._pairs.append(wide[["day", "contact"]].dropna().drop_duplicates())
+
+    def tables(self) -> Dict[str, pd.DataFrame]:
+        """Return the ``by_contact`` and ``by_day`` tables."""
+        if not self._contacts:
+            empty = pd.DataFrame(columns=["calls"])
+            return {"by_contact": empty.rename_axis("contact").reset_index(), "by_day": empty.rename_axis("day").reset_index()}
+        contacts = _combine(self._contacts, first=True)
+        contacts = contacts.sort_values("calls", ascending=False, kind="stable")
+        days = _combine(self._days, first=False)
+        pairs = pd.concat(self._pairs).drop_duplicates()
+        days.insert(1, "contacts", pairs.groupby("day").size().reindex(days.index, fill_value=0))
+        days = days.sort_index()
+        days.index = days.index.strftime("%Y-%m-%d")
+        if not self.has_duration:
+            contacts, days = contacts.drop(columns="duration"), days.drop(columns="duration")
+        return {
+            "by_contact": contacts.rename_axis("contact").reset_index(),
+            "by_day": days.rename_axis("day").reset_index(),
+        }
+
+
+def _spec(sums: Sequence[str], first: bool) -> Dict[str, str]:
+    spec = {c: "sum" for c in sums}
+    if first:
+        spec.update({"first": "min", "last": "max"})
+    spec["duration"] = "sum"
+    return spec
+
+
+def _combine(parts: List[pd.DataFrame], first: bool) -> pd.DataFrame:
+    frame = pd.concat(parts)
+    counts = [c for c in frame.columns if c == "calls" or c.startswith("calls_") or c in HOUR_COLUMNS]
+    frame[counts] = frame[counts].fillna(0).astype(int)
+    frame = frame.groupby(level=0).agg(_spec(counts, first))
+    directions = sorted(c for c in counts if c.startswith("calls_"))
+    order = ["calls"] + directions + (["first", "last"] if first else []) + ["duration"]
+    if first:
+        order += HOUR_COLUMNS
+    return frame[order]
+
+
+def summary_paths(output_csv: str | Path, log_format: str = "xlsx") -> Dict[str, Path]:
+    """Return the summary file for each table, next to ``output_csv``.
+
+    ``call_log_named.csv.gz`` gives ``call_log_named_by_contact.xlsx`` and
+    ``call_log_named_by_day.xlsx``; the extension follows ``log_format``.
+    """
+    path = Path(output_csv)
+    while path.suffix.lower() in (".csv", ".gz", ".zst"):
+        path = path.with_suffix("")
+    return {name: path.with_name(f"{path.name}_{name}.{log_format}") for name in SUMMARY_TABLES}
+
+
+def write_summary(
+    summary: CallSummary, output_csv: str | Path, log_format: str = "xlsx"
+) -> List[Path]:
+    """Write the summary tables next to ``output_csv``; return their paths."""
+    tables = summary.tables()
+    written = []
+    for name, path in summary_paths(output_csv, log_format).items():
+        frame = tables[name]
+        for column in ("first", "last"):
+            if column in frame.columns:
+                # Excel has no time zones; the times are UTC already
+                frame[column] = frame[column].dt.tz_convert(None)
+        records = frame.astype(object).where(frame.notna(), None).to_dict("records")
+        with open_sink(path, list(frame.columns), log_format, title=SUMMARY_TABLES[name]) as sink:
+            sink.write_many(records)
+        written.append(sink.path)
+    return written
@@ -6,7 +6,8 @@ all attachment files into a single ``Compiled Attachments`` directory,
 computes basic metadata (MD5 and EXIF) and attempts to associate each
 attachment with the sender and recipients of the message that referenced
 it. The results are written to an Excel workbook similar to the
-``collect_media`` script.
+``collect_media`` script, or to CSV, JSONL, Parquet or SQLite with
+``--log-format``.
 
 The CSV files under ``messages/`` are scanned to map attachment filenames
 back to their messages. Attachment paths are constructed using utilities
@@ -15,17 +16,42 @@ from ``render_transcripts``.
 
 from __future__ import annotations
 
+import argparse
 import csv
+import os
 import re
 import shutil
+import tempfile
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Callable, Dict, Iterable, List, Tuple
-
-from openpyxl import Workbook
-
-from .collect_media import md5sum, extract_exif, ensure_unique_name
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .collect_media import UniqueNamer, _path_arguments, extract_exif
+from .exif import exif_path_stats
+from .hashing import (
+    DEFAULT_DIGESTS,
+    DIGEST_COLUMNS,
+    MANIFEST_FORMATS,
+    ManifestWriter,
+    copy_and_hash,
+    digest_columns,
+    parse_digests,
+)
+from .log_sinks import LOG_FORMATS, open_sink
+from .near_duplicates import (
+    DEFAULT_RADIUS,
+    HASH_ALGORITHMS,
+    NEAR_DUPE_COLUMNS,
+    NearDuplicateIndex,
+    report_path_for_log,
+)
+from .phone_match import DEFAULT_MIN_SUFFIX
+from .pipeline import Pipeline, StageTiming, format_timings
+from .profiling import add_profile_arguments, profile_from_args, span
+from .progress import Progress, ProgressCallback, console_progress
+from .walker import scan_files
 from .render_transcripts import (
-    build_attachment_path,
+    PLACEHOLDER_ATTACHMENTS,
     build_contact_lookup,
     derive_attachment_day_from_csv_name,
     parse_csv_date,
@@ -39,6 +65,17 @@ DEFAULT_ATTACHMENTS_ROOT = Path("messages") / "attachments"
 DEFAULT_COMPILED = Path("Compiled Attachments")
 DEFAULT_LOGFILE = DEFAULT_COMPILED / "compiled_attachment_log" / "compiled_attachment_log.xlsx"
 
+# Worker threads for the copy+hash and EXIF pipeline stages
+DEFAULT_IO_WORKERS = 4
+DEFAULT_EXIF_WORKERS = 2
+
+# Fixed log columns; digest columns and then EXIF keys follow
+BASE_COLUMNS = ["File Name", "Date", "Sender", "Recipient"]
+LOG_COLUMNS = BASE_COLUMNS + ["MD5"]
+
+# Column added with ``--dedupe``: where each referenced copy was found
+ORIGINAL_PATH_COLUMN = "Original Path"
+
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
@@ -48,25 +85,92 @@ def sanitize_filename_component(text: str) -> str:
     cleaned = re.sub(r'[<>:"/\\|?*\x00-\x1F]', "", text)
     return cleaned.strip().rstrip(".")
 
+
+def log_columns(digests: Iterable[str] = DEFAULT_DIGESTS, dedupe: bool = False) -> List[str]:
+    """Return the fixed log columns for the chosen ``digests``."""
+    columns = BASE_COLUMNS + ([ORIGINAL_PATH_COLUMN] if dedupe else [])
+    return columns + digest_columns(list(digests))
+
 # ---------------------------------------------------------------------------
 # Helper to map attachment files to message metadata
 # ---------------------------------------------------------------------------
 
+# (type, direction, day, filename) of an attachment below ``attachments/``
+AttachmentKey = Tuple[str, str, str, str]
+
+
+def attachment_key(msg_type: str, direction: str, day: str, filename: str) -> AttachmentKey:
+    """Return the index key for an attachment reference or walked file."""
+    return (msg_type.lower(), direction.lower(), day, os.path.normcase(filename))
+
+
+def walked_attachment_key(attachments_root: str, path: str) -> AttachmentKey | None:
+    """Return the key of ``path`` from its position below ``attachments_root``.
+
+    Only string operations are used. Files at ``<type>/<direction>/<file>``
+    get an empty day, like references from a CSV whose name has no date;
+    files at any other depth have no key.
+    """
+    parts = os.path.relpath(path, attachments_root).split(os.sep)
+    if len(parts) == 4:
+        return attachment_key(*parts)
+    if len(parts) == 3:
+        return attachment_key(parts[0], parts[1], "", parts[2])
+    return None
+
+
+def undated_fallback(index: Dict[AttachmentKey, list]) -> Dict[Tuple[str, str, str], List[AttachmentKey]]:
+    """Group the dated keys of ``index`` by ``(type, direction, filename)``, in day order.
+
+    A reference whose dated file is missing falls back to an undated file
+    of the same name, as in :mod:`synchronoss_parser.reconcile`.
+    """
+    fallback: Dict[Tuple[str, str, str], List[AttachmentKey]] = {}
+    for key in sorted(k for k in index if k[2]):
+        fallback.setdefault((key[0], key[1], key[3]), []).append(key)
+    return fallback
+
+
+def _references(
+    index: Dict[AttachmentKey, List[Dict[str, str]]],
+    fallback: Dict[Tuple[str, str, str], List[AttachmentKey]],
+    attachments_root: str,
+    path: str,
+) -> List[Dict[str, str]]:
+    key = walked_attachment_key(attachments_root, path)
+    if key is None:
+        return []
+    refs = index.get(key, [])
+    if key[2]:
+        return refs
+    # Undated file: dated references whose own file does not exist also match
+    refs = list(refs)
+    folder, name = os.path.split(path)
+    for dated in fallback.get((key[0], key[1], key[3]), ()):
+        if not os.path.exists(os.path.join(folder, dated[2], name)):
+            refs.extend(index[dated])
+    return refs
+
+
 def build_metadata_index(
     messages_root: Path, contact_lookup: Callable[[str], str] = lambda x: x
-) -> Dict[Path, Dict[str, str]]:
-    """Scan message CSV files and map attachment paths to metadata."""
-    index: Dict[Path, Dict[str, str]] = {}
+) -> Dict[AttachmentKey, List[Dict[str, str]]]:
+    """Scan message CSV files and map attachment keys to message metadata.
+
+    Each key lists the metadata of every message referencing that
+    attachment, in CSV order.
+    """
+    index: Dict[AttachmentKey, List[Dict[str, str]]] = {}
     for csv_file in sorted(messages_root.glob("*.csv")):
-        day = derive_attachment_day_from_csv_name(csv_file)
-        with csv_file.open("r", encoding="utf-8", newline="") as f:
+        day = derive_attachment_day_from_csv_name(csv_file) or ""
+        with span("csv_parse", csv_file.stat().st_size), csv_file.open("r", encoding="utf-8", newline="") as f:
             reader = csv.DictReader(f)
             for row in reader:
                 attachments = split_attachments(row.get("Attachments") or "")
                 if not attachments:
                     continue
-                msg_type = (row.get("Type") or "").strip().lower()
-                direction = (row.get("Direction") or "").strip().lower()
+                msg_type = (row.get("Type") or "").strip()
+                direction = (row.get("Direction") or "").strip()
                 date = (row.get("Date") or "").strip()
                 sender = contact_lookup((row.get("Sender") or "").strip())
 
@@ -78,110 +182,333 @@ def build_metadata_index(
                         recip_parts.append(contact_lookup(p))
                 recipient = "; ".join(recip_parts)
 
+                meta = {"Date": date, "Sender": sender, "Recipient": recipient}
                 for fname in attachments:
-                    path = build_attachment_path(
-                        messages_root, msg_type, direction, day or "", fname
-                    )
-                    index[path.resolve()] = {
-                        "Date": date,
-                        "Sender": sender,
-                        "Recipient": recipient,
-                    }
+                    if fname.lower() in PLACEHOLDER_ATTACHMENTS:
+                        continue
+                    refs = index.setdefault(attachment_key(msg_type, direction, day, fname), [])
+                    if not refs or refs[-1] != meta:
+                        refs.append(meta)
     return index
 
 # ---------------------------------------------------------------------------
 # Main processing
 # ---------------------------------------------------------------------------
 
-def collect_attachments(
+@dataclass
+class _AttachmentJob:
+    entry: os.DirEntry
+    dest_name: str
+    staged: Path
+    refs: List[Dict[str, str]]
+    original_path: str = ""
+    hashes: Dict[str, str] = field(default_factory=dict)
+    exif: Dict[str, object] = field(default_factory=dict)
+    perceptual_hash: Optional[int] = None
+    size: int = 0
+
+
+def iter_attachments(
     attachments_root: Path,
     compiled_path: Path,
     contacts_xlsx: str | Path | None = None,
-) -> Tuple[List[Dict[str, str]], List[str]]:
-    """Copy attachments from ``attachments_root`` into ``compiled_path``.
-
-    Returns a tuple ``(records, exif_keys)`` where ``records`` is a list of
-    metadata dictionaries and ``exif_keys`` is the sorted list of all EXIF
-    keys encountered.
+    digests: Iterable[str] = DEFAULT_DIGESTS,
+    manifest: ManifestWriter | None = None,
+    walk_workers: int = 1,
+    progress: ProgressCallback | None = None,
+    near_dupes: NearDuplicateIndex | None = None,
+    io_workers: int = DEFAULT_IO_WORKERS,
+    exif_workers: int = DEFAULT_EXIF_WORKERS,
+    timings: List[StageTiming] | None = None,
+    dedupe: bool = False,
+    match_suffix: int | None = None,
+    stats: Dict[str, int] | None = None,
+) -> Iterator[Dict[str, str]]:
+    """Copy attachments from ``attachments_root`` into ``compiled_path``,
+    yielding metadata records as soon as each file has been copied.
+
+    Files are matched to messages by ``(type, direction, day, filename)``
+    without touching the filesystem. A file referenced by several messages
+    is copied once, named after the first reference, and yields one record
+    per message; unreferenced files yield a single record.
+
+    With ``dedupe`` each distinct content (same size and digests) is stored
+    once, under the name of its first occurrence in walk order. Later copies
+    yield records pointing at that file, and every record gains an
+    ``Original Path`` column relative to ``attachments_root``.
+
+    Work runs as a :class:`~synchronoss_parser.pipeline.Pipeline`: the walk
+    stays serial, ``io_workers`` threads copy and hash into a staging
+    folder, ``exif_workers`` threads read EXIF (and perceptual hashes), and
+    files are named and moved into place in walk order as the caller
+    consumes records. Bounded queues between the stages keep memory flat.
+    When ``timings`` is given it is filled with per-stage
+    :class:`~synchronoss_parser.pipeline.StageTiming` entries once the run
+    ends. ``stats["copied"]`` counts the files written to ``compiled_path``
+    so far.
+
+    Every name in ``digests`` is computed during the copy; finished files
+    are also added to ``manifest`` when given. ``walk_workers`` top-level
+    folders (``mms``, ``rcs``...) are scanned concurrently. ``progress``
+    receives a pre-scan total followed by per-file updates. ``near_dupes``
+    adds perceptual-hash cluster columns for images. ``match_suffix`` enables
+    suffix matching of contact numbers (see
+    :func:`~synchronoss_parser.render_transcripts.build_contact_lookup`).
     """
+    digests = tuple(digests)
     compiled_path.mkdir(exist_ok=True)
 
     messages_root = attachments_root.parent
-    lookup = build_contact_lookup(str(contacts_xlsx) if contacts_xlsx else None)
+    lookup = build_contact_lookup(str(contacts_xlsx) if contacts_xlsx else None, match_suffix)
     metadata_index = build_metadata_index(messages_root, lookup)
+    fallback = undated_fallback(metadata_index)
+
+    entries = scan_files(attachments_root, exclude_dirs=[compiled_path], workers=walk_workers)
+    tracker = Progress(progress, "Collecting attachments")
+    if tracker.active:
+        entries = list(entries)
+        tracker.start(len(entries))
+    root = os.fspath(attachments_root)
+    namer = UniqueNamer(compiled_path)
+    staging = Path(tempfile.mkdtemp(prefix=".staging-", dir=compiled_path))
+
+    def jobs() -> Iterator[_AttachmentJob]:
+        for n, entry in enumerate(entries):
+            refs = _references(metadata_index, fallback, root, entry.path) or [{}]
+            meta = refs[0]
+
+            sender = sanitize_filename_component(meta.get("Sender", "")) or "unknown"
+            date_raw = meta.get("Date", "")
+            date_dt = parse_csv_date(date_raw)
+            if date_dt:
+                formatted_date = date_dt.strftime("%Y-%m-%d %H-%M-%S")
+            else:
+                formatted_date = sanitize_filename_component(date_raw.replace(":", "-")) or "unknown-date"
+
+            suffix = os.path.splitext(entry.name)[1]
+            job = _AttachmentJob(entry, f"{sender} - {formatted_date}{suffix}", staging / f"{n}{suffix}", refs)
+            if dedupe:
+                job.original_path = os.path.relpath(entry.path, root).replace(os.sep, "/")
+            yield job
+
+    def copy(job: _AttachmentJob) -> _AttachmentJob:
+        job.hashes = copy_and_hash(job.entry.path, job.staged, digests)
+        if dedupe or tracker.active:
+            job.size = job.entry.stat().st_size
+        return job
+
+    def read_metadata(job: _AttachmentJob) -> _AttachmentJob:
+        job.exif = extract_exif(Path(job.entry.path))
+        if near_dupes is not None:
+            job.perceptual_hash = near_dupes.hash_path(Path(job.entry.path))
+        return job
+
+    pipeline = Pipeline(
+        [("copy", copy, io_workers), ("exif", read_metadata, exif_workers)],
+        source_name="walk",
+        sink_name="write",
+    )
+    # (size, digests) -> (stored name, EXIF and near-duplicate columns)
+    stored: Dict[Tuple, Tuple[str, Dict[str, object]]] = {}
+    try:
+        for job in pipeline.run(jobs()):
+            content = (job.size, tuple(job.hashes[d] for d in digests))
+            if dedupe and content in stored:
+                os.remove(job.staged)
+                name, extra = stored[content]
+            else:
+                dest = namer(job.dest_name)
+                os.replace(job.staged, dest)
+                name = dest.name
+                if stats is not None:
+                    stats["copied"] = stats.get("copied", 0) + 1
+                if manifest is not None:
+                    manifest.add(dest, job.hashes)
+                extra = job.exif
+                if near_dupes is not None:
+                    extra.update(near_dupes.hash_columns(name, job.perceptual_hash))
+                if dedupe:
+                    stored[content] = (name, extra)
+            tracker.advance(1, job.size)
+
+            # One row per referencing message, all pointing at the same copy
+            for ref in job.refs:
+                record = {
+                    "File Name": name,
+                    "Date": ref.get("Date", ""),
+                    "Sender": ref.get("Sender", ""),
+                    "Recipient": ref.get("Recipient", ""),
+                }
+                if dedupe:
+                    record[ORIGINAL_PATH_COLUMN] = job.original_path
+                record.update({DIGEST_COLUMNS[d]: job.hashes[d] for d in digests})
+                record.update(extra)
+                yield record
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+        if timings is not None:
+            timings[:] = pipeline.timings
+    tracker.finish()
 
-    records: List[Dict[str, str]] = []
-    exif_keys: set[str] = set()
-
-    for file in attachments_root.rglob("*"):
-        if not file.is_file():
-            continue
-
-        meta = metadata_index.get(file.resolve(), {})
-
-        sender = sanitize_filename_component(meta.get("Sender", "")) or "unknown"
-        date_raw = meta.get("Date", "")
-        date_dt = parse_csv_date(date_raw)
-        if date_dt:
-            formatted_date = date_dt.strftime("%Y-%m-%d %H-%M-%S")
-        else:
-            formatted_date = sanitize_filename_component(date_raw.replace(":", "-")) or "unknown-date"
-
-        dest_name = f"{sender} - {formatted_date}{file.suffix}"
-        dest = ensure_unique_name(compiled_path, dest_name)
-        shutil.copy2(file, dest)
-
-        exif = extract_exif(file)
-        exif_keys.update(exif.keys())
 
-        record = {
-            "File Name": dest.name,
-            "Date": date_raw,
-            "Sender": meta.get("Sender", ""),
-            "Recipient": meta.get("Recipient", ""),
-            "MD5": md5sum(file),
-        }
-        record.update(exif)
-        records.append(record)
+def collect_attachments(
+    attachments_root: Path,
+    compiled_path: Path,
+    contacts_xlsx: str | Path | None = None,
+    digests: Iterable[str] = DEFAULT_DIGESTS,
+    progress: ProgressCallback | None = None,
+    near_dupes: NearDuplicateIndex | None = None,
+    dedupe: bool = False,
+    match_suffix: int | None = None,
+) -> Tuple[List[Dict[str, str]], List[str]]:
+    """Copy attachments from ``attachments_root`` into ``compiled_path``.
 
+    Returns a tuple ``(records, exif_keys)`` where ``records`` is a list of
+    metadata dictionaries and ``exif_keys`` is the sorted list of all EXIF
+    keys encountered.
+    """
+    records = list(
+        iter_attachments(
+            attachments_root,
+            compiled_path,
+            contacts_xlsx,
+            digests,
+            progress=progress,
+            near_dupes=near_dupes,
+            dedupe=dedupe,
+            match_suffix=match_suffix,
+        )
+    )
+    fixed = set(log_columns(dedupe=True)) | set(DIGEST_COLUMNS.values()) | set(NEAR_DUPE_COLUMNS)
+    exif_keys = {k for rec in records for k in rec if k not in fixed}
     return records, sorted(exif_keys)
 
 # ---------------------------------------------------------------------------
-# Excel logging
+# Logging
 # ---------------------------------------------------------------------------
 
 def write_excel(records: Iterable[Dict[str, str]], exif_keys: Iterable[str], logfile: Path | None = None) -> None:
-    logfile = logfile or DEFAULT_LOGFILE
-    logfile.parent.mkdir(parents=True, exist_ok=True)
-
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Attachment Metadata"
+    write_log(records, exif_keys, logfile or DEFAULT_LOGFILE, "xlsx")
 
-    headers = ["File Name", "Date", "Sender", "Recipient", "MD5"] + list(exif_keys)
-    ws.append(headers)
 
-    for rec in records:
-        row = [rec.get(h, "") for h in headers]
-        ws.append(row)
+def write_log(
+    records: Iterable[Dict[str, str]],
+    exif_keys: Iterable[str],
+    logfile: Path,
+    log_format: str | None = None,
+    digests: Iterable[str] = DEFAULT_DIGESTS,
+    dedupe: bool = False,
+) -> Path:
+    """Write ``records`` to ``logfile`` in any supported log format.
 
-    wb.save(logfile)
+    Returns the path actually written, whose extension follows ``log_format``.
+    """
+    columns = log_columns(digests, dedupe) + list(exif_keys)
+    with open_sink(logfile, columns, log_format, title="Attachment Metadata") as sink:
+        sink.write_many(records)
+    return sink.path
 
 # ---------------------------------------------------------------------------
 # Command line interface
 # ---------------------------------------------------------------------------
 
-def main(attachments_root: Path | str = DEFAULT_ATTACHMENTS_ROOT, compiled_path: Path | str = DEFAULT_COMPILED, contacts_xlsx: Path | str | None = None, logfile: Path | None = None) -> None:
-    attachments_root = Path(attachments_root)
-    compiled_path = Path(compiled_path)
+def main(
+    argv: List[str] | Path | str | None = None,
+    compiled_path: Path | str | None = None,
+    contacts_xlsx: Path | str | None = None,
+    logfile: Path | str | None = None,
+    *,
+    attachments_root: Path | str | None = None,
+) -> None:
+    """CLI entry point.
+
+    ``argv`` holds command line arguments. The older call
+    ``main(attachments_root, compiled_path, contacts_xlsx, logfile)`` with
+    paths (positional or by keyword) is still accepted and runs as the
+    matching ``--attachments``/``--out``/``--contacts-xlsx``/``--log``.
+    """
+    if isinstance(argv, (str, os.PathLike)):
+        argv, attachments_root = None, argv
+    paths = (attachments_root, compiled_path, contacts_xlsx, logfile)
+    if argv is None and paths != (None,) * 4:
+        argv = _path_arguments(
+            ("--attachments", attachments_root),
+            ("--out", compiled_path),
+            ("--contacts-xlsx", contacts_xlsx),
+            ("--log", logfile),
+        )
+    ap = argparse.ArgumentParser(description="Collect message attachments and log metadata.")
+    ap.add_argument("--attachments", default=str(DEFAULT_ATTACHMENTS_ROOT), help="messages/attachments folder")
+    ap.add_argument("--out", default=str(DEFAULT_COMPILED), help="Output folder")
+    ap.add_argument("--contacts-xlsx", help="Contacts Excel file or phone index for name lookups")
+    ap.add_argument("--match-suffix", type=int, nargs="?", const=DEFAULT_MIN_SUFFIX, metavar="DIGITS", help=f"Also match contacts on the last DIGITS digits (default: {DEFAULT_MIN_SUFFIX})")
+    ap.add_argument("--log", help="Log file (default: <out>/compiled_attachment_log/compiled_attachment_log.xlsx)")
+    ap.add_argument("--log-format", choices=LOG_FORMATS, help="Log format (default: from --log extension)")
+    ap.add_argument("--digest", default="md5", help="Comma separated digests: md5, sha1, sha256, blake2b (default: md5)")
+    ap.add_argument("--manifest", choices=MANIFEST_FORMATS, help="Also write a sha256sum-style or hashdeep manifest")
+    ap.add_argument("--walk-workers", type=int, default=1, help="Attachment folders scanned concurrently (default: 1)")
+    ap.add_argument("--dedupe", action="store_true", help="Store identical attachments once and log every original path")
+    ap.add_argument("--io-workers", type=int, default=DEFAULT_IO_WORKERS, help=f"Threads copying and hashing files (default: {DEFAULT_IO_WORKERS})")
+    ap.add_argument("--exif-workers", type=int, default=DEFAULT_EXIF_WORKERS, help=f"Threads reading EXIF data (default: {DEFAULT_EXIF_WORKERS})")
+    ap.add_argument("--near-dupes", action="store_true", help="Cluster visually similar images by perceptual hash")
+    ap.add_argument("--near-dupe-radius", type=int, default=DEFAULT_RADIUS, help=f"Max differing hash bits (default: {DEFAULT_RADIUS})")
+    ap.add_argument("--near-dupe-hash", choices=HASH_ALGORITHMS, default="dhash", help="Perceptual hash (default: dhash)")
+    add_profile_arguments(ap)
+    args = ap.parse_args(argv)
+    try:
+        digests = parse_digests(args.digest)
+    except ValueError as e:
+        ap.error(str(e))
+
+    attachments_root = Path(args.attachments)
+    compiled_path = Path(args.out)
+    logfile = Path(args.log) if args.log else compiled_path / DEFAULT_LOGFILE.parent.name / DEFAULT_LOGFILE.name
     if not attachments_root.exists():
         raise SystemExit(f"Attachments folder '{attachments_root}' not found.")
 
-    records, exif_keys = collect_attachments(attachments_root, compiled_path, contacts_xlsx)
-    write_excel(records, exif_keys, logfile)
-    print(
-        f"Copied {len(records)} files from '{attachments_root}' to '{compiled_path}' and logged metadata to '{logfile or DEFAULT_LOGFILE}'."
-    )
+    with profile_from_args(args):
+        manifest = (
+            ManifestWriter.for_log(logfile, compiled_path, digests, args.manifest) if args.manifest else None
+        )
+        near_dupes = (
+            NearDuplicateIndex(args.near_dupe_radius, args.near_dupe_hash) if args.near_dupes else None
+        )
+        columns = log_columns(digests, args.dedupe) + (NEAR_DUPE_COLUMNS if near_dupes else [])
+        timings: List[StageTiming] = []
+        counts: Dict[str, int] = {"copied": 0}
+        with open_sink(logfile, columns, args.log_format, title="Attachment Metadata") as sink:
+            records = iter_attachments(
+                attachments_root,
+                compiled_path,
+                args.contacts_xlsx,
+                digests,
+                manifest=manifest,
+                walk_workers=args.walk_workers,
+                progress=console_progress(),
+                near_dupes=near_dupes,
+                io_workers=args.io_workers,
+                exif_workers=args.exif_workers,
+                timings=timings,
+                dedupe=args.dedupe,
+                match_suffix=args.match_suffix,
+                stats=counts,
+            )
+            sink.write_many(records)
+        if manifest is not None:
+            manifest.close()
+        print(
+            f"Copied {counts['copied']} files from '{attachments_root}' to '{compiled_path}' and logged {sink.rows} "
+            f"message references to '{sink.path}'."
+        )
+        if manifest is not None:
+            print(f"Wrote {args.manifest} manifest to '{manifest.path}'.")
+        if near_dupes is not None:
+            report = report_path_for_log(sink.path)
+            clusters = near_dupes.write_report(report)
+            print(f"Found {clusters} near-duplicate clusters; report written to '{report}'.")
+        stats = exif_path_stats()
+        print(f"EXIF: {stats['header']} read from headers, {stats['pillow']} via Pillow.")
+        print(format_timings(timings))
 
 
 if __name__ == "__main__":
@@ -11,18 +11,43 @@ VZMOBILE/
 Outputs:
 1. Compiled Media/   — all copied media
 2. Compiled Media/compiled_media_log/compiled_media_log.xlsx — metadata
-   spreadsheet stored in its own folder
+   spreadsheet stored in its own folder (``--log-format`` selects CSV,
+   JSONL, Parquet or SQLite instead)
 """
 
+from __future__ import annotations
+
 from pathlib import Path
-import hashlib
-import shutil
+import argparse
+import os
 from fractions import Fraction
 from datetime import datetime
 import numbers
-from PIL import Image, ExifTags
+from typing import Iterator
 from PIL.TiffImagePlugin import IFDRational
-from openpyxl import Workbook
+
+from .exif import exif_path_stats, read_exif
+from .hashing import (
+    DEFAULT_DIGESTS,
+    DIGEST_COLUMNS,
+    MANIFEST_FORMATS,
+    ManifestWriter,
+    copy_and_hash,
+    digest_columns,
+    hash_file,
+    parse_digests,
+)
+from .log_sinks import LOG_FORMATS, open_sink
+from .near_duplicates import (
+    DEFAULT_RADIUS,
+    HASH_ALGORITHMS,
+    NEAR_DUPE_COLUMNS,
+    NearDuplicateIndex,
+    report_path_for_log,
+)
+from .profiling import add_profile_arguments, profile_from_args, timed
+from .progress import Progress, ProgressCallback, console_progress
+from .walker import scan_dirs, scan_many
 
 # -------------------------------------------------------------
 # Default paths used when running as a script
@@ -32,6 +57,10 @@ DEFAULT_COMPILED = DEFAULT_ROOT / "Compiled Media"
 DEFAULT_LOGFILE = DEFAULT_COMPILED / "compiled_media_log" / "compiled_media_log.xlsx"
 LOGFILE = DEFAULT_LOGFILE
 
+# Fixed log columns; digest columns and then EXIF keys follow
+BASE_COLUMNS = ["File Name", "Date", "Device"]
+LOG_COLUMNS = BASE_COLUMNS + ["MD5"]
+
 # Media file extensions to search
 MEDIA_EXTS = {".jpg", ".jpeg", ".png", ".gif", ".bmp", ".tiff", ".webp", ".mp4", ".mov"}
 
@@ -40,11 +69,12 @@ MEDIA_EXTS = {".jpg", ".jpeg", ".png", ".gif", ".bmp", ".tiff", ".webp", ".mp4",
 # -------------------------------------------------------------
 def md5sum(path: Path) -> str:
     """Return MD5 hash of a file."""
-    h = hashlib.md5()
-    with path.open("rb") as f:
-        for chunk in iter(lambda: f.read(8192), b""):
-            h.update(chunk)
-    return h.hexdigest()
+    return hash_file(path, ("md5",))["md5"]
+
+
+def log_columns(digests=DEFAULT_DIGESTS) -> list:
+    """Return the fixed log columns for the chosen ``digests``."""
+    return BASE_COLUMNS + digest_columns(digests)
 
 
 def normalize_exif_value(value):
@@ -69,15 +99,16 @@ def normalize_exif_value(value):
         return float(value)
     return str(value)
 
+@timed("extract_exif")
 def extract_exif(path: Path) -> dict:
     """
     Extract EXIF data from an image (if any).
     Returns dict with human-readable keys; empty dict if none or file not image.
+    JPEG/TIFF headers are parsed directly; other formats go through Pillow.
     """
     try:
-        with Image.open(path) as img:
-            raw = {ExifTags.TAGS.get(k, k): v for k, v in img.getexif().items()}
-            return {k: normalize_exif_value(v) for k, v in raw.items()}
+        raw = read_exif(path)
+        return {k: normalize_exif_value(v) for k, v in raw.items()}
     except Exception:
         return {}
 
@@ -92,86 +123,211 @@ def ensure_unique_name(target_dir: Path, filename: str) -> Path:
         candidate = target_dir / f"{base}_{counter}{ext}"
     return candidate
 
+
+class UniqueNamer:
+    """Hand out unique file names in ``target_dir`` before the files exist.
+
+    Like :func:`ensure_unique_name`, but names already handed out count as
+    taken, so destinations can be assigned up front and copied concurrently.
+    """
+
+    def __init__(self, target_dir: Path):
+        self.target_dir = target_dir
+        self._taken: set = set()
+
+    def __call__(self, filename: str) -> Path:
+        base = Path(filename).stem
+        ext = Path(filename).suffix
+        counter = 0
+        name = filename
+        while name in self._taken or (self.target_dir / name).exists():
+            counter += 1
+            name = f"{base}_{counter}{ext}"
+        self._taken.add(name)
+        return self.target_dir / name
+
+def _path_arguments(*options: tuple) -> list[str]:
+    """Return ``[flag, path, ...]`` for the options whose path is given."""
+    return [arg for flag, path in options if path is not None for arg in (flag, os.fspath(path))]
+
 # -------------------------------------------------------------
 # Main processing
 # -------------------------------------------------------------
-def collect_media(root_path: Path, compiled_path: Path):
-    """Copy media from ``root_path`` into ``compiled_path`` collecting metadata."""
+def iter_media(
+    root_path: Path,
+    compiled_path: Path,
+    digests=DEFAULT_DIGESTS,
+    manifest: ManifestWriter | None = None,
+    walk_workers: int = 1,
+    progress: ProgressCallback | None = None,
+    near_dupes: NearDuplicateIndex | None = None,
+) -> Iterator[dict]:
+    """Copy media from ``root_path`` into ``compiled_path``, yielding one
+    metadata record per file as soon as it has been copied.
+
+    Every name in ``digests`` is computed during the copy; finished files
+    are also added to ``manifest`` when given. ``walk_workers`` device
+    folders are scanned concurrently. ``progress`` receives a pre-scan
+    total followed by per-file updates. ``near_dupes`` adds perceptual-hash
+    cluster columns for images.
+    """
     compiled_path.mkdir(exist_ok=True)
 
-    records = []
-    exif_keys = set()
-
-    for date_dir in sorted(root_path.glob("20??-??-??")):  # match YYYY-MM-DD
-        if not date_dir.is_dir():
-            continue
-        date_str = date_dir.name
-
-        for device_dir in date_dir.iterdir():
-            if not device_dir.is_dir():
-                continue
-            device_name = device_dir.name
-
-            for media_file in device_dir.rglob("*"):
-                if media_file.suffix.lower() not in MEDIA_EXTS:
-                    continue
-
-                # Copy to compiled folder
-                dest = ensure_unique_name(compiled_path, media_file.name)
-                shutil.copy2(media_file, dest)
-
-                # Metadata
-                exif = extract_exif(media_file)
-                exif_keys.update(exif.keys())
-                record = {
-                    "File Name": dest.name,
-                    "Date": date_str,
-                    "Device": device_name,
-                    "MD5": md5sum(media_file),
-                }
-                record.update(exif)
-                for k, v in list(record.items()):
-                    value = normalize_exif_value(v)
-                    if not isinstance(value, (str, int, float, bool, datetime)):
-                        value = str(value)
-                    record[k] = value
-                records.append(record)
+    # (date, device) for every YYYY-MM-DD/<device> folder
+    device_dirs = {}
+    for date_dir in scan_dirs(root_path, "20??-??-??"):
+        for device_dir in scan_dirs(date_dir.path):
+            device_dirs[device_dir.path] = (date_dir.name, device_dir.name)
+
+    entries = scan_many(
+        list(device_dirs),
+        extensions=MEDIA_EXTS,
+        exclude_dirs=[compiled_path],
+        workers=walk_workers,
+    )
+    tracker = Progress(progress, "Collecting media")
+    if tracker.active:
+        entries = list(entries)
+        tracker.start(len(entries))
+    for device_path, entry in entries:
+        date_str, device_name = device_dirs[device_path]
+        media_file = Path(entry.path)
+
+        # Copy to compiled folder
+        dest = ensure_unique_name(compiled_path, entry.name)
+        hashes = copy_and_hash(media_file, dest, digests)
+        if manifest is not None:
+            manifest.add(dest, hashes)
 
+        # Metadata
+        exif = extract_exif(media_file)
+        record = {
+            "File Name": dest.name,
+            "Date": date_str,
+            "Device": device_name,
+        }
+        record.update({DIGEST_COLUMNS[d]: hashes[d] for d in digests})
+        record.update(exif)
+        if near_dupes is not None:
+            record.update(near_dupes.record_columns(dest.name, media_file))
+        for k, v in list(record.items()):
+            value = normalize_exif_value(v)
+            if not isinstance(value, (str, int, float, bool, datetime)):
+                value = str(value)
+            record[k] = value
+        if tracker.active:
+            tracker.advance(1, entry.stat().st_size)
+        yield record
+    tracker.finish()
+
+
+def collect_media(
+    root_path: Path,
+    compiled_path: Path,
+    digests=DEFAULT_DIGESTS,
+    progress: ProgressCallback | None = None,
+    near_dupes: NearDuplicateIndex | None = None,
+):
+    """Copy media from ``root_path`` into ``compiled_path`` collecting metadata."""
+    records = list(iter_media(root_path, compiled_path, digests, progress=progress, near_dupes=near_dupes))
+    fixed = set(BASE_COLUMNS) | set(DIGEST_COLUMNS.values()) | set(NEAR_DUPE_COLUMNS)
+    exif_keys = {k for rec in records for k in rec if k not in fixed}
     return records, sorted(exif_keys)
 
 # -------------------------------------------------------------
-# Excel logging
+# Logging
 # -------------------------------------------------------------
 def write_excel(records, exif_keys, logfile: Path | None = None):
-    logfile = logfile or LOGFILE
-    logfile.parent.mkdir(parents=True, exist_ok=True)
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Media Metadata"
+    write_log(records, exif_keys, logfile or LOGFILE, "xlsx")
 
-    headers = ["File Name", "Date", "Device", "MD5"] + list(exif_keys)
-    ws.append(headers)
 
-    for rec in records:
-        row = [rec.get(h, "") for h in headers]
-        ws.append(row)
+def write_log(
+    records, exif_keys, logfile: Path, log_format: str | None = None, digests=DEFAULT_DIGESTS
+) -> Path:
+    """Write ``records`` to ``logfile`` in any supported log format.
+
+    Returns the path actually written, whose extension follows ``log_format``.
+    """
+    columns = log_columns(digests) + list(exif_keys)
+    with open_sink(logfile, columns, log_format, title="Media Metadata") as sink:
+        sink.write_many(records)
+    return sink.path
 
-    wb.save(logfile)
 
 def main(
-    root_path: Path = DEFAULT_ROOT,
-    compiled_path: Path = DEFAULT_COMPILED,
-    logfile: Path = DEFAULT_LOGFILE,
+    argv: list[str] | Path | str | None = None,
+    compiled_path: Path | str | None = None,
+    logfile: Path | str | None = None,
+    *,
+    root_path: Path | str | None = None,
 ) -> None:
-    """CLI entry point using default paths."""
+    """CLI entry point using default paths.
+
+    ``argv`` holds command line arguments. The older call
+    ``main(root_path, compiled_path, logfile)`` with paths (positional or by
+    keyword) is still accepted and runs as ``--root``/``--out``/``--log``.
+    """
+    if isinstance(argv, (str, os.PathLike)):
+        argv, root_path = None, argv
+    if argv is None and (root_path, compiled_path, logfile) != (None, None, None):
+        argv = _path_arguments(("--root", root_path), ("--out", compiled_path), ("--log", logfile))
+    ap = argparse.ArgumentParser(description="Copy media from a Verizon Mobile backup and log metadata.")
+    ap.add_argument("--root", default=str(DEFAULT_ROOT), help="Backup folder containing YYYY-MM-DD folders")
+    ap.add_argument("--out", help="Output folder (default: <root>/Compiled Media)")
+    ap.add_argument("--log", help="Log file (default: <out>/compiled_media_log/compiled_media_log.xlsx)")
+    ap.add_argument("--log-format", choices=LOG_FORMATS, help="Log format (default: from --log extension)")
+    ap.add_argument("--digest", default="md5", help="Comma separated digests: md5, sha1, sha256, blake2b (default: md5)")
+    ap.add_argument("--manifest", choices=MANIFEST_FORMATS, help="Also write a sha256sum-style or hashdeep manifest")
+    ap.add_argument("--walk-workers", type=int, default=1, help="Device folders scanned concurrently (default: 1)")
+    ap.add_argument("--near-dupes", action="store_true", help="Cluster visually similar images by perceptual hash")
+    ap.add_argument("--near-dupe-radius", type=int, default=DEFAULT_RADIUS, help=f"Max differing hash bits (default: {DEFAULT_RADIUS})")
+    ap.add_argument("--near-dupe-hash", choices=HASH_ALGORITHMS, default="dhash", help="Perceptual hash (default: dhash)")
+    add_profile_arguments(ap)
+    args = ap.parse_args(argv)
+    try:
+        digests = parse_digests(args.digest)
+    except ValueError as e:
+        ap.error(str(e))
+
+    root_path = Path(args.root)
+    compiled_path = Path(args.out) if args.out else root_path / DEFAULT_COMPILED.name
+    logfile = Path(args.log) if args.log else compiled_path / DEFAULT_LOGFILE.parent.name / DEFAULT_LOGFILE.name
     if not root_path.exists():
         raise SystemExit(f"Root folder '{root_path}' not found.")
 
-    records, exif_keys = collect_media(root_path, compiled_path)
-    write_excel(records, exif_keys, logfile)
-    print(
-        f"Copied {len(records)} files from '{root_path}' to '{compiled_path}' and logged metadata to '{logfile}'."
-    )
+    with profile_from_args(args):
+        manifest = (
+            ManifestWriter.for_log(logfile, compiled_path, digests, args.manifest) if args.manifest else None
+        )
+        near_dupes = (
+            NearDuplicateIndex(args.near_dupe_radius, args.near_dupe_hash) if args.near_dupes else None
+        )
+        columns = log_columns(digests) + (NEAR_DUPE_COLUMNS if near_dupes else [])
+        with open_sink(logfile, columns, args.log_format, title="Media Metadata") as sink:
+            records = iter_media(
+                root_path,
+                compiled_path,
+                digests,
+                manifest=manifest,
+                walk_workers=args.walk_workers,
+                progress=console_progress(),
+                near_dupes=near_dupes,
+            )
+            for record in records:
+                sink.write(record)
+        if manifest is not None:
+            manifest.close()
+        print(
+            f"Copied {sink.rows} files from '{root_path}' to '{compiled_path}' and logged metadata to '{sink.path}'."
+        )
+        if manifest is not None:
+            print(f"Wrote {args.manifest} manifest to '{manifest.path}'.")
+        if near_dupes is not None:
+            report = report_path_for_log(sink.path)
+            clusters = near_dupes.write_report(report)
+            print(f"Found {clusters} near-duplicate clusters; report written to '{report}'.")
+        stats = exif_path_stats()
+        print(f"EXIF: {stats['header']} read from headers, {stats['pillow']} via Pillow.")
 
 
 if __name__ == "__main__":
@@ -2,10 +2,12 @@
 """Simple Tkinter GUI wrapper around collect_media.py."""
 
 from pathlib import Path
+import threading
 import tkinter as tk
 from tkinter import filedialog, ttk
 
 from .collect_media import collect_media, write_excel
+from .progress import tk_progress_callback
 
 
 def main():
@@ -26,6 +28,23 @@ def main():
         if path:
             out_var.set(path)
 
+    # Set once the window is gone; the worker then stops posting updates
+    closed = threading.Event()
+
+    def post(update) -> None:
+        """Run ``update`` on the Tk thread unless the window was closed."""
+        if closed.is_set():
+            return
+        try:
+            window.after(0, update)
+        except (tk.TclError, RuntimeError):
+            pass  # closed while posting
+
+    def finish(msg: str) -> None:
+        status_var.set(msg)
+        progress.stop()
+        run_button.configure(state="normal")
+
     def run():
         root_path = Path(in_var.get()).expanduser()
         compiled_path = Path(out_var.get()).expanduser()
@@ -42,18 +61,35 @@ def main():
 
         logfile = compiled_path / "compiled_media_log" / "compiled_media_log.xlsx"
 
+        run_button.configure(state="disabled")
+        progress.configure(mode="indeterminate", value=0)
         progress.start()
-        window.update_idletasks()
-        try:
-            records, exif_keys = collect_media(root_path, compiled_path)
-            write_excel(records, exif_keys, logfile)
-            status_var.set(
-                f"Copied {len(records)} files from '{root_path}' to '{compiled_path}' and logged to '{logfile}'."
-            )
-        except Exception as e:  # pragma: no cover - user feedback
-            status_var.set(f"Error: {e}")
-        finally:
-            progress.stop()
+        update_bar = tk_progress_callback(window, progress, status_var)
+
+        def on_progress(event) -> None:
+            if closed.is_set():
+                return
+            try:
+                update_bar(event)
+            except (tk.TclError, RuntimeError):
+                pass  # closed while posting
+
+        def task() -> None:
+            try:
+                records, exif_keys = collect_media(root_path, compiled_path, progress=on_progress)
+                write_excel(records, exif_keys, logfile)
+                msg = (
+                    f"Copied {len(records)} files from '{root_path}' to '{compiled_path}' and logged to '{logfile}'."
+                )
+            except Exception as e:  # pragma: no cover - user feedback
+                msg = f"Error: {e}"
+            post(lambda: finish(msg))
+
+        threading.Thread(target=task, daemon=True).start()
+
+    def close():
+        closed.set()
+        window.destroy()
 
     tk.Label(window, text="'VZMOBILE' Folder Path:").grid(row=0, column=0, sticky="e", padx=5, pady=5)
     tk.Entry(window, textvariable=in_var, width=50).grid(row=0, column=1, padx=5)
@@ -63,7 +99,8 @@ def main():
     tk.Entry(window, textvariable=out_var, width=50).grid(row=1, column=1, padx=5)
     tk.Button(window, text="Browse", command=browse_out).grid(row=1, column=2, padx=5)
 
-    tk.Button(window, text="Run", command=run).grid(row=2, column=1, pady=10)
+    run_button = tk.Button(window, text="Run", command=run)
+    run_button.grid(row=2, column=1, pady=10)
 
     progress = ttk.Progressbar(window, mode="indeterminate")
     progress.grid(row=3, column=0, columnspan=3, sticky="ew", padx=5)
@@ -72,6 +109,7 @@ def main():
         row=4, column=0, columnspan=3, padx=5, pady=5
     )
 
+    window.protocol("WM_DELETE_WINDOW", close)
     window.mainloop()
 
 
@@ -1,14 +1,32 @@
 #!/usr/bin/env python3
-"""Extract and collect quarantined files from a Verizon backup."""
+"""Extract and collect quarantined files from a Verizon backup.
+
+Each member of a ``*.zip_file_*`` archive is streamed with ``ZipFile.open``
+straight to its final name in the compiled folder, so every byte is read and
+written once. The file type is detected from the first bytes of that same
+stream. Members larger than ``max_member_size`` bytes, or inflating to more
+than ``max_ratio`` times their compressed size, are skipped with a warning so
+a hostile archive cannot fill the disk. Both limits are checked against the
+bytes actually written, not only the sizes the archive claims.
+"""
 
 from __future__ import annotations
 
-from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+from typing import Iterator
+import argparse
+import logging
 import shutil
 import tempfile
 import zipfile
 
 from .collect_media import ensure_unique_name
+from .pipeline import ordered_map
+from .profiling import add_profile_arguments, profile_from_args, span
+from .progress import Progress, ProgressCallback, console_progress
+from .walker import scan_files
 
 # -------------------------------------------------------------
 # Default paths used when running as a script
@@ -16,15 +34,18 @@ from .collect_media import ensure_unique_name
 DEFAULT_ROOT = Path("VZMOBILE")
 DEFAULT_COMPILED = DEFAULT_ROOT / "Compiled Quarantine Files"
 
+COPY_CHUNK_SIZE = 1 << 20
+# Members may inflate to this many times their compressed size; smaller
+# members than RATIO_MIN_SIZE bytes are exempt (a page of zeros is harmless)
+DEFAULT_MAX_RATIO = 100
+RATIO_MIN_SIZE = 1 << 20
+
 # -------------------------------------------------------------
 # File type detection
 # -------------------------------------------------------------
 
-def detect_extension(path: Path) -> str | None:
-    """Return file extension based on signature bytes."""
-    with path.open("rb") as f:
-        header = f.read(16)
-
+def detect_extension_from_header(header: bytes) -> str | None:
+    """Return file extension based on the first bytes of a file."""
     signatures = {
         b"\xFF\xD8\xFF": ".jpg",
         b"\x89PNG\r\n\x1a\n": ".png",
@@ -41,51 +62,231 @@ def detect_extension(path: Path) -> str | None:
     return None
 
 
-def rename_with_extension(path: Path) -> Path:
-    """Rename file to have correct extension if detectable."""
-    ext = detect_extension(path)
-    if ext and path.suffix.lower() != ext:
-        new_path = ensure_unique_name(path.parent, path.stem + ext)
-        path.rename(new_path)
-        return new_path
-    return path
-
 # -------------------------------------------------------------
 # Main processing
 # -------------------------------------------------------------
 
-def collect_quarantined_files(root: Path, compiled_path: Path) -> list[Path]:
-    """Extract quarantined zip files and copy contents to ``compiled_path``."""
+class MemberLimitError(ValueError):
+    """An archive member breaks the size or compression ratio limit."""
+
+
+
+def _member_limit(info: zipfile.ZipInfo, max_member_size: int | None, max_ratio: float | None) -> int | None:
+    limits = []
+    if max_member_size:
+        limits.append(max_member_size)
+    if max_ratio:
+        limits.append(max(RATIO_MIN_SIZE, int(info.compress_size * max_ratio)))
+    return min(limits) if limits else None
+
+
+def extract_member(
+    zf: zipfile.ZipFile,
+    info: zipfile.ZipInfo,
+    compiled_path: Path,
+    max_member_size: int | None = None,
+    max_ratio: float | None = DEFAULT_MAX_RATIO,
+) -> Path:
+    """Stream one archive member to a unique name in ``compiled_path``.
+
+    The member keeps its base name, with the extension corrected from its
+    signature bytes. Raises :class:`MemberLimitError` (after removing the
+    partial file) when the member breaks a size limit.
+    """
+    name = PurePosixPath(info.filename.replace("\\", "/")).name
+    if name in ("", ".", ".."):
+        name = "member"
+    limit = _member_limit(info, max_member_size, max_ratio)
+    if limit is not None and info.file_size > limit:
+        raise MemberLimitError(f"declares {info.file_size} bytes, limit {limit}")
+    with zf.open(info) as src:
+        chunk = src.read(COPY_CHUNK_SIZE)
+        ext = detect_extension_from_header(chunk[:16])
+        if ext and Path(name).suffix.lower() != ext:
+            name = Path(name).stem + ext
+        dest = ensure_unique_name(compiled_path, name)
+        written = 0
+        with dest.open("xb") as out:
+            try:
+                while chunk:
+                    written += len(chunk)
+                    if limit is not None and written > limit:
+                        raise MemberLimitError(f"inflates past the {limit} byte limit")
+                    out.write(chunk)
+                    chunk = src.read(COPY_CHUNK_SIZE)
+            except BaseException:
+                out.close()
+                dest.unlink()
+                raise
+    return dest
+
+
+@dataclass
+class ArchiveError:
+    """An archive that could not be read to the end, and why."""
+
+    path: Path
+    reason: str
+
+
+def _extract_archive(
+    zip_path: Path,
+    out_dir: Path,
+    max_member_size: int | None,
+    max_ratio: float | None,
+    staged: bool = False,
+) -> tuple[list[Path], str | None]:
+    """Extract every member of ``zip_path`` into ``out_dir``.
+
+    Returns the files written and, when the archive is damaged, the reason
+    reading stopped. With ``staged`` every member gets a folder of its own,
+    so the file keeps its wanted name for the final move.
+    """
+    written: list[Path] = []
+    try:
+        with zipfile.ZipFile(zip_path) as zf:
+            for n, info in enumerate(zf.infolist()):
+                if info.is_dir():
+                    continue
+                target = out_dir
+                if staged:
+                    target = out_dir / f"{n:06d}"
+                    target.mkdir(parents=True)
+                try:
+                    written.append(extract_member(zf, info, target, max_member_size, max_ratio))
+                except MemberLimitError as e:
+                    logging.warning("Skipping %s in %s: %s", info.filename, zip_path, e)
+    except Exception as e:  # a damaged archive must not end the run
+        return written, f"{type(e).__name__}: {e}"
+    return written, None
+
+
+def _extract_staged(job: tuple[Path, Path, int | None, float | None]) -> tuple[list[Path], str | None]:
+    zip_path, out_dir, max_member_size, max_ratio = job
+    return _extract_archive(zip_path, out_dir, max_member_size, max_ratio, staged=True)
+
+
+def _extract_parallel(
+    archives: list[tuple[Path, int]],
+    staging: Path,
+    max_member_size: int | None,
+    max_ratio: float | None,
+    workers: int,
+) -> Iterator[tuple[list[Path], str | None]]:
+    jobs = (
+        (zip_path, staging / f"{n:06d}", max_member_size, max_ratio)
+        for n, (zip_path, _) in enumerate(archives)
+    )
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from ordered_map(pool, _extract_staged, jobs, workers * 2)
+
+
+def collect_quarantined_files(
+    root: Path,
+    compiled_path: Path,
+    progress: ProgressCallback | None = None,
+    max_member_size: int | None = None,
+    max_ratio: float | None = DEFAULT_MAX_RATIO,
+    workers: int = 1,
+    errors: list[ArchiveError] | None = None,
+) -> list[Path]:
+    """Extract quarantined zip files into ``compiled_path``.
+
+    ``progress`` receives the number of archives found followed by
+    per-archive updates. Members over ``max_member_size`` bytes or
+    ``max_ratio`` times their compressed size are skipped with a warning;
+    ``None`` or ``0`` disables a limit.
+
+    With ``workers`` greater than one, archives are decompressed by a
+    process pool into private staging folders. Their files are then moved
+    into place in archive order by this process alone, so names never
+    collide and the result is the same as a serial run. A damaged archive
+    is logged and added to ``errors`` when given; files read from it before
+    the damage are kept and the run continues.
+    """
     compiled_path.mkdir(parents=True, exist_ok=True)
     copied: list[Path] = []
 
-    for zip_path in root.rglob("*.zip_file_*"):
-        if not zip_path.is_file():
-            continue
-        with zipfile.ZipFile(zip_path) as zf, tempfile.TemporaryDirectory() as tmpdir:
-            zf.extractall(tmpdir)
-            for extracted in Path(tmpdir).rglob("*"):
-                if extracted.is_dir():
-                    continue
-                fixed = rename_with_extension(extracted)
-                dest = ensure_unique_name(compiled_path, fixed.name)
-                shutil.copy2(fixed, dest)
-                copied.append(dest)
+    archives = [
+        (Path(entry.path), entry.stat().st_size)
+        for entry in scan_files(root, patterns=["*.zip_file_*"], exclude_dirs=[compiled_path])
+    ]
+    tracker = Progress(progress, "Extracting archives")
+    tracker.start(len(archives))
+    staging = None
+    if workers > 1 and len(archives) > 1:
+        staging = Path(tempfile.mkdtemp(prefix=".staging-", dir=compiled_path))
+        results = _extract_parallel(archives, staging, max_member_size, max_ratio, workers)
+    else:
+        results = (
+            _extract_archive(zip_path, compiled_path, max_member_size, max_ratio)
+            for zip_path, _ in archives
+        )
+    try:
+        for zip_path, size in archives:
+            with span("extract_archive", size):
+                written, error = next(results)
+                for path in written:
+                    if staging is not None:
+                        dest = ensure_unique_name(compiled_path, path.name)
+                        path.rename(dest)
+                        path = dest
+                    copied.append(path)
+            if error is not None:
+                logging.warning("Failed to extract %s: %s", zip_path, error)
+                if errors is not None:
+                    errors.append(ArchiveError(zip_path, error))
+            tracker.advance(1, size)
+    finally:
+        results.close()
+        if staging is not None:
+            shutil.rmtree(staging, ignore_errors=True)
+    tracker.finish()
     return copied
 
 # -------------------------------------------------------------
 # CLI
 # -------------------------------------------------------------
 
-def main(root_path: Path = DEFAULT_ROOT, compiled_path: Path = DEFAULT_COMPILED) -> None:
+def main(argv: list[str] | None = None) -> None:
     """CLI entry point using default paths."""
+    ap = argparse.ArgumentParser(description="Extract quarantined zip files from a Verizon Mobile backup.")
+    ap.add_argument("--root", default=str(DEFAULT_ROOT), help="Backup folder to search for *.zip_file_* archives")
+    ap.add_argument("--out", help="Output folder (default: <root>/Compiled Quarantine Files)")
+    ap.add_argument("--max-member-size", type=int, metavar="MB", help="Skip archive members larger than MB megabytes")
+    ap.add_argument(
+        "--max-ratio",
+        type=float,
+        default=DEFAULT_MAX_RATIO,
+        help=f"Skip members inflating to more than this many times their compressed size, 0 to allow any (default: {DEFAULT_MAX_RATIO})",
+    )
+    ap.add_argument("--workers", type=int, default=1, help="Processes extracting archives (default: 1)")
+    add_profile_arguments(ap)
+    args = ap.parse_args(argv)
+
+    root_path = Path(args.root)
+    compiled_path = Path(args.out) if args.out else root_path / DEFAULT_COMPILED.name
     if not root_path.exists():
         raise SystemExit(f"Root folder '{root_path}' not found.")
 
-    files = collect_quarantined_files(root_path, compiled_path)
+    errors: list[ArchiveError] = []
+    with profile_from_args(args):
+        files = collect_quarantined_files(
+            root_path,
+            compiled_path,
+            console_progress(),
+            max_member_size=args.max_member_size * 1024 * 1024 if args.max_member_size else None,
+            max_ratio=args.max_ratio,
+            workers=args.workers,
+            errors=errors,
+        )
     print(
         f"Copied {len(files)} files from '{root_path}' to '{compiled_path}'.",
     )
+    if errors:
+        print(f"{len(errors)} damaged archives (files read before the damage were kept):")
+        for error in errors:
+            print(f"  {error.path}: {error.reason}")
 
 
 if __name__ == "__main__":
@@ -1,17 +1,38 @@
 #!/usr/bin/env python3
-"""Convert Synchronoss contacts exports to Excel files."""
+"""Convert Synchronoss contacts exports to Excel files.
 
-import sys, re, json, argparse
+Dumps are read as a stream: :func:`iter_contacts` scans the raw bytes for one
+contact record at a time and parses only that record, so multi-GB exports
+convert with bounded memory. Records are converted in batches of
+:data:`BATCH_SIZE` and written through the log sinks, so besides Excel the
+output can be CSV, JSONL, Parquet or SQLite.
+"""
+
+import sys, re, json, argparse, logging
+from dataclasses import dataclass, field
 from pathlib import Path
 
 # Try imports and give friendly guidance if packages aren't installed
 try:
+    import numpy as np
     import pandas as pd
 except ImportError:  # pragma: no cover - user guidance path
     print("Missing dependency: pandas. Install with:\n  pip install --user pandas openpyxl")
     print("Exiting due to missing dependency.")
     sys.exit(1)
 
+from .log_sinks import LOG_FORMATS, open_sink
+from .phone_index import INDEX_COLUMNS, INDEX_FORMATS, is_phone_index
+from .profiling import add_profile_arguments, profile_from_args, span
+from .render_transcripts import normalize_phone_series
+
+CHUNK_SIZE = 1 << 20
+BATCH_SIZE = 5000
+PREFERRED_COLUMNS = [
+    'firstname','lastname','phone_numbers','phone_types','phone_preferences',
+    'source','created','deleted','itemguid','incaseofemergency','favorite'
+]
+
 # ----- helpers to clean/parse “almost JSON” -----
 def quick_clean(txt: str) -> str:
     txt = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f]', '', txt)  # remove control chars
@@ -40,72 +61,399 @@ def parse_contacts(raw_text: str):
         raise ValueError("Couldn’t find a contact list in the file.")
     return contacts
 
+# ----- streaming tokenizer -----
+# Control characters are skipped wherever whitespace may appear
+_WS = rb'[\s\x00-\x1f]*'
+_LEAD = re.compile(rb'(?:\xef\xbb\xbf)?' + _WS)
+_BETWEEN = re.compile(rb'[\s\x00-\x1f,]*')
+_LIST_START = re.compile(rb'"contact"' + _WS + rb':' + _WS + rb'\[')
+# The next record or the end of the list, after stray bytes
+_RESYNC = re.compile(rb'[{\]]')
+# A string (possibly cut off by the end of the buffer) or a bracket. Bytes of
+# multi-byte UTF-8 characters never match, so scanning raw bytes is safe.
+_TOKEN = re.compile(rb'"(?:[^"\\]|\\.)*(")?|[{}\[\]]', re.S)
+
+
+def _nested_pattern(depth):
+    # Every alternative starts with a different byte, so a failed match
+    # backs off in linear time
+    string = rb'"(?:[^"\\]|\\.)*"'
+    inner = rb'(?:[^"{}\[\]]|' + string + rb')*'
+    pattern = rb'[{\[]' + inner + rb'[}\]]'
+    for _ in range(depth - 1):
+        pattern = rb'[{\[](?:[^"{}\[\]]|' + string + rb'|' + pattern + rb')*[}\]]'
+    return re.compile(pattern, re.S)
+
+
+# Matches a whole record nested up to 6 levels in one C-level call; deeper or
+# incomplete records fall back to the token scanner
+_RECORD = _nested_pattern(6)
+
+
+class _Buffer:
+    """Bytes read so far, with the file offset of the first one."""
+
+    def __init__(self, f, chunk_size):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.data = bytearray()
+        self.base = 0
+
+    def more(self, keep):
+        """Drop bytes before ``keep`` and read another chunk.
+
+        Returns how far positions shifted, or ``None`` at end of file. The
+        buffer is compacted in place rather than copied on every refill.
+        """
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            return None
+        del self.data[:keep]
+        self.data += chunk
+        self.base += keep
+        return keep
+
+
+def _find_list(buf):
+    """Return the position just inside the contact list, or raise ``ValueError``."""
+    while len(buf.data) < 3 and buf.more(0) is not None:
+        pass  # enough bytes to recognise a byte order mark
+    while True:
+        pos = _LEAD.match(buf.data).end()
+        if pos < len(buf.data):
+            break
+        if buf.more(0) is None:
+            raise ValueError("Couldn’t find a contact list in the file.")
+    if buf.data[pos:pos + 1] == b"[":
+        return pos + 1
+    if buf.data[pos:pos + 1] != b"{":
+        raise ValueError(f"JSON parse error at byte {buf.base + pos}: expected an object or a list")
+    start = pos
+    while True:
+        m = _LIST_START.search(buf.data, start)
+        if m:
+            return m.end()
+        # Keep a tail in case the key is split across chunks
+        keep = max(0, len(buf.data) - 64)
+        if buf.more(keep) is None:
+            raise ValueError("Couldn’t find a contact list in the file.")
+        start = 0
+
+
+def _record_end(buf, start):
+    """Return the end of the record starting at ``start``, reading as needed.
+
+    Returns ``(start, end)`` with ``start`` adjusted for any bytes dropped
+    while reading, and ``end`` ``None`` if the file ends inside the record.
+    """
+    depth = 0
+    scan = start
+    while True:
+        for tok in _TOKEN.finditer(buf.data, scan):
+            c = tok.group()[:1]
+            if c == b'"':
+                if tok.group(1) is None:
+                    scan = tok.start()
+                    break
+            elif c in b"{[":
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return start, tok.end()
+            scan = tok.end()
+        else:
+            scan = len(buf.data)
+        shift = buf.more(start)
+        if shift is None:
+            return start, None
+        start -= shift
+        scan -= shift
+
+
+@dataclass
+class DroppedRecord:
+    """Bytes ``start:end`` of a dump that could not be read as a contact."""
+
+    start: int
+    end: int
+    reason: str
+    data: bytes = field(default=b"", repr=False)
+
+
+def _drop(buf, start, end, reason, dropped):
+    if dropped is None:
+        raise ValueError(f"JSON parse error at byte {buf.base + start}: {reason}")
+    dropped.append(DroppedRecord(buf.base + start, buf.base + end, reason, bytes(buf.data[start:end])))
+
+
+def _skip_garbage(buf, pos):
+    """Return ``(pos, next)`` where ``next`` is the next record or list end, or ``None`` at end of file."""
+    scan = pos
+    while True:
+        m = _RESYNC.search(buf.data, scan)
+        if m:
+            return pos, m.start()
+        scan = len(buf.data)
+        shift = buf.more(pos)
+        if shift is None:
+            return pos, None
+        pos -= shift
+        scan -= shift
+
+
+def iter_contacts(source, chunk_size=CHUNK_SIZE, dropped=None):
+    """Yield contact dicts one at a time from a contacts dump.
+
+    ``source`` is a path or a binary file object. The dump may be
+    ``{"contacts":{"contact":[...]}}``, ``{"contact":[...]}`` or a bare list.
+    Records that are not valid JSON are parsed again without control
+    characters and trailing commas, and a dump cut off between two records ends
+    cleanly, like :func:`parse_contacts`.
+
+    By default a record that cannot be parsed raises ``ValueError``. When a
+    ``dropped`` list is given the dump is recovered instead: every complete
+    record is kept, and each damaged one (a record cut off by the end of the
+    file, a record that is not valid JSON, stray bytes between records) is
+    skipped and appended to ``dropped`` as a :class:`DroppedRecord` with its
+    byte offsets. Recovery happens during the same single pass.
+    """
+    if isinstance(source, (str, Path)):
+        with open(source, "rb") as f:
+            yield from iter_contacts(f, chunk_size, dropped)
+        return
+
+    buf = _Buffer(source, chunk_size)
+    pos = _find_list(buf)
+    while True:
+        pos = _BETWEEN.match(buf.data, pos).end()
+        if pos == len(buf.data):
+            shift = buf.more(pos)
+            if shift is None:
+                return
+            pos -= shift
+            continue
+        if buf.data[pos:pos + 1] == b"]":
+            return
+        if buf.data[pos:pos + 1] != b"{":
+            start, end = _skip_garbage(buf, pos)
+            _drop(buf, start, len(buf.data) if end is None else end, "expected a contact record", dropped)
+            if end is None:
+                return
+            pos = end
+            continue
+        m = _RECORD.match(buf.data, pos)
+        if m:
+            start, end = pos, m.end()
+        else:
+            start, end = _record_end(buf, pos)
+        if end is None:
+            _drop(buf, start, len(buf.data), "file ends inside a contact record", dropped)
+            return
+        text = buf.data[start:end].decode("utf-8", errors="ignore")
+        try:
+            contact = json.loads(text)
+        except json.JSONDecodeError:
+            try:
+                contact = json.loads(quick_clean(text))
+            except json.JSONDecodeError as e:
+                _drop(buf, start, end, e.msg, dropped)
+                contact = None
+        if contact is not None:
+            yield contact
+        pos = end
+
+
+def _list_to_str(v):
+    if v and all(isinstance(x, dict) for x in v):
+        def one(d): return ", ".join(f"{k}={v}" for k, v in d.items())
+        return "; ".join(one(x) for x in v)
+    return "; ".join(map(str, v))
+
+# infer_dtype results that rule out lists; "mixed", "mixed-integer" and the
+# rest may hold them
+SCALAR_DTYPES = {
+    "empty", "string", "bytes", "integer", "floating", "mixed-integer-float",
+    "decimal", "complex", "boolean", "datetime64", "datetime", "date",
+    "timedelta64", "timedelta", "time", "period",
+}
+
 def normalize_lists_to_strings(df):
-    def list_to_str(v):
-        if isinstance(v, list):
-            if v and all(isinstance(x, dict) for x in v):
-                def one(d): return ", ".join(f"{k}={d.get(k,'')}" for k in d.keys())
-                return "; ".join(one(x) for x in v)
-            return "; ".join(map(str, v))
-        return v
+    """Join list values into strings, touching only cells that hold lists."""
     for col in df.columns:
-        df[col] = df[col].apply(list_to_str)
+        # Columns of plain strings or numbers infer as such in one C-level pass
+        if df[col].dtype != object or pd.api.types.infer_dtype(df[col], skipna=True) in SCALAR_DTYPES:
+            continue
+        is_list = df[col].map(type) == list
+        if is_list.any():
+            df.loc[is_list, col] = df.loc[is_list, col].map(_list_to_str)
     return df
 
+PHONE_FIELDS = {'number': 'phone_numbers', 'type': 'phone_types', 'preference': 'phone_preferences'}
+
 def extract_phone_columns(df):
-    if 'tel' in df.columns:
-        numbers, types, prefs = [], [], []
-        for val in df['tel'].fillna(""):
-            num_list, type_list, pref_list = [], [], []
-            for part in str(val).split(';'):
-                for kv in part.split(','):
-                    k, _, v = kv.partition('=')
-                    k, v = k.strip(), v.strip()
-                    if k == 'number' and v: num_list.append(v)
-                    elif k == 'type' and v: type_list.append(v)
-                    elif k == 'preference' and v: pref_list.append(v)
-            numbers.append("; ".join(num_list) or None)
-            types.append("; ".join(type_list) or None)
-            prefs.append("; ".join(pref_list) or None)
-        df['phone_numbers'] = numbers
-        df['phone_types'] = types
-        df['phone_preferences'] = prefs
+    """Add phone number, type and preference columns from the ``tel`` lists.
+
+    Runs on the structured lists, before :func:`normalize_lists_to_strings`:
+    the lists are exploded to one row per phone entry, and the values of
+    each field are joined per contact with one ``reduceat`` over the column.
+    """
+    if 'tel' not in df.columns:
+        return df
+    entries = df['tel'].explode()
+    entries = entries[entries.map(type) == dict]
+    parts = pd.DataFrame(entries.tolist(), index=entries.index, columns=list(PHONE_FIELDS), dtype=object)
+    for field, column in PHONE_FIELDS.items():
+        values = parts[field].dropna().astype(str).str.strip()
+        values = values[values != ""]
+        df[column] = _join_per_row(values).reindex(df.index)
     return df
 
+def _join_per_row(values):
+    """Join consecutive ``values`` sharing an index label with "; "."""
+    labels = values.index.to_numpy()
+    items = values.to_numpy(dtype=object)
+    first = np.ones(len(labels), dtype=bool)
+    first[1:] = labels[1:] != labels[:-1]
+    starts = np.flatnonzero(first)
+    if not len(starts):
+        return pd.Series([], dtype=object)
+    items = np.where(first, "", "; ").astype(object) + items
+    return pd.Series(np.add.reduceat(items, starts), index=labels[starts])
+
 def build_dataframe(contacts):
     import pandas as pd
     df = pd.json_normalize(contacts, sep='.')
-    df = normalize_lists_to_strings(df)
     df = extract_phone_columns(df)
-    preferred = [
-        'firstname','lastname','phone_numbers','phone_types','phone_preferences',
-        'source','created','deleted','itemguid','incaseofemergency','favorite'
-    ]
-    cols = [c for c in preferred if c in df.columns] + [c for c in df.columns if c not in preferred]
+    df = normalize_lists_to_strings(df)
+    cols = [c for c in PREFERRED_COLUMNS if c in df.columns] + [c for c in df.columns if c not in PREFERRED_COLUMNS]
     return df[cols]
 
-def convert_contacts(input_file: str, output_file: str) -> int:
-    """Convert a Synchronoss contacts dump to Excel."""
+def phone_index_frame(df):
+    """Return one row per phone number in ``df`` for the phone index.
+
+    Rows hold the normalized ``number``, the display ``name`` (first and last
+    name, as used for lookups) and all of the contact's columns. Contacts
+    without a name or number are left out.
+    """
+    def text(col):
+        if col not in df.columns:
+            return pd.Series("", index=df.index)
+        return df[col].fillna("").astype(str).str.strip()
+
+    names = (text('firstname') + " " + text('lastname')).str.strip()
+    numbers = normalize_phone_series(text('phone_numbers').str.split(";").explode())
+    numbers = numbers[(numbers != "") & (names.reindex(numbers.index) != "")]
+    contacts = df.loc[numbers.index].drop(columns=INDEX_COLUMNS, errors="ignore").reset_index(drop=True)
+    index = pd.DataFrame({"number": numbers.to_numpy(), "name": names.loc[numbers.index].to_numpy()})
+    return pd.concat([index, contacts], axis=1)
+
+def _records(df):
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+def _batches(contacts, size):
+    batch = []
+    for contact in contacts:
+        batch.append(contact)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def convert_contacts(
+    input_file: str,
+    output_file: str,
+    log_format=None,
+    batch_size: int = BATCH_SIZE,
+    dropped=None,
+    strict: bool = False,
+    phone_index=None,
+) -> int:
+    """Convert a Synchronoss contacts dump to Excel (or another ``log_format``).
+
+    The dump is streamed with :func:`iter_contacts` and converted
+    ``batch_size`` contacts at a time. Damaged records are skipped with a
+    warning and appended to ``dropped`` when a list is given; with ``strict``
+    they raise ``ValueError`` instead. ``phone_index`` also writes a phone
+    index (see :mod:`synchronoss_parser.phone_index`) whose format follows
+    its extension. Returns the number of rows written.
+    """
     in_path = Path(input_file)
     if not in_path.exists():
         raise FileNotFoundError(f"File not found: {in_path}")
 
-    raw = in_path.read_text(encoding="utf-8", errors="ignore")
-    contacts = parse_contacts(raw)
-    df = build_dataframe(contacts)
-    df.to_excel(output_file, index=False)
-    return len(df)
+    if phone_index and not is_phone_index(phone_index):
+        raise ValueError(f"Phone index must be one of: {', '.join(INDEX_FORMATS)} (got '{phone_index}')")
+    if dropped is None:
+        dropped = []
+    batches = _batches(iter_contacts(in_path, dropped=None if strict else dropped), batch_size)
+    sink = index_sink = None
+    try:
+        while True:
+            with span("parse_contacts"):
+                batch = next(batches, None)
+            if batch is None:
+                break
+            with span("build_dataframe"):
+                df = build_dataframe(batch)
+                index = phone_index_frame(df) if phone_index else None
+            if sink is None:
+                sink = open_sink(Path(output_file), list(df.columns), log_format, title="Contacts")
+                if phone_index:
+                    index_sink = open_sink(Path(phone_index), list(index.columns), title="Phone Index")
+            sink.write_many(_records(df))
+            if index_sink is not None:
+                index_sink.write_many(_records(index))
+        if sink is None:
+            sink = open_sink(Path(output_file), PREFERRED_COLUMNS[:2], log_format, title="Contacts")
+            if phone_index:
+                index_sink = open_sink(Path(phone_index), INDEX_COLUMNS, title="Phone Index")
+    finally:
+        for s in (sink, index_sink):
+            if s is not None:
+                with span("log_save"):
+                    s.close()
+    for record in dropped:
+        logging.warning(
+            "Skipped damaged contact data at bytes %d-%d of %s: %s", record.start, record.end, in_path, record.reason
+        )
+    return sink.rows
 
 
-def main():  # pragma: no cover - CLI convenience wrapper
+def main(argv=None):  # pragma: no cover - CLI convenience wrapper
     parser = argparse.ArgumentParser(description="Convert Synchronoss contacts dump to Excel.")
     parser.add_argument("--input", required=True, help="Path to contacts.txt")
     parser.add_argument("--output", required=True, help="Path to output .xlsx file")
-    args = parser.parse_args()
+    parser.add_argument("--log-format", choices=LOG_FORMATS, help="Output format (default: from the --output extension)")
+    parser.add_argument(
+        "--phone-index",
+        help="Also write a phone index (.sqlite, .parquet, .csv or .jsonl) for fast lookups by other tools",
+    )
+    parser.add_argument("--strict", action="store_true", help="Fail on a damaged record instead of skipping it")
+    parser.add_argument("--quarantine", help="Write the bytes of skipped records to this file")
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
 
+    dropped = []
     try:
-        rows = convert_contacts(args.input, args.output)
+        with profile_from_args(args):
+            rows = convert_contacts(
+                args.input, args.output, args.log_format, dropped=dropped, strict=args.strict,
+                phone_index=args.phone_index,
+            )
         print(f"Wrote {rows} rows to {args.output}")
+        if args.phone_index:
+            print(f"Wrote phone index to {args.phone_index}")
+        if dropped:
+            print(f"Skipped {len(dropped)} damaged record(s):")
+            for record in dropped:
+                print(f"  bytes {record.start}-{record.end}: {record.reason}")
+        if dropped and args.quarantine:
+            with open(args.quarantine, "wb") as f:
+                for record in dropped:
+                    f.write(record.data + b"\n")
+            print(f"Wrote skipped records to {args.quarantine}")
     except Exception as e:  # broad but intentional for user guidance
         print(f"Error: {e}")
         sys.exit(1)
@@ -144,8 +492,12 @@ def launch_gui():  # pragma: no cover - GUI wrapper
         status.set("Converting...")
         root.update_idletasks()
         try:
-            rows = convert_contacts(in_var.get(), out_var.get())
-            status.set(f"Wrote {rows} rows to {out_var.get()}")
+            dropped = []
+            rows = convert_contacts(in_var.get(), out_var.get(), dropped=dropped)
+            msg = f"Wrote {rows} rows to {out_var.get()}"
+            if dropped:
+                msg += f"\nSkipped {len(dropped)} damaged record(s); run contacts-to-excel for details"
+            status.set(msg)
         except Exception as e:
             status.set(f"Error: {e}")
 
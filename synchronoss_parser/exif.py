@@ -0,0 +1,234 @@
+"""Lightweight EXIF reading helpers.
+
+Opening every image with Pillow just to call ``getexif()`` is wasteful for
+large JPEG and TIFF files: the EXIF block lives in the first few kilobytes of
+a JPEG (the ``APP1`` segment) and in the IFD0/EXIF IFD of a TIFF. This module
+reads only those structures with bounded reads and decodes tag numbers using
+a name table computed once at import time. Anything the fast path cannot
+handle falls back to Pillow.
+
+How often each path was taken is tracked so the command line tools can report
+it; see :func:`exif_path_stats`.
+"""
+
+from __future__ import annotations
+
+import io
+import struct
+import threading
+from collections import Counter
+from fractions import Fraction
+from pathlib import Path
+from typing import BinaryIO, Dict, Optional
+
+from PIL import ExifTags, Image
+
+# Tag number -> human readable name, built once instead of per image.
+TAG_NAMES: Dict[int, str] = dict(ExifTags.TAGS)
+
+EXIF_IFD_POINTER = 0x8769
+
+# Upper bounds keeping the fast path cheap on odd or hostile files.
+MAX_JPEG_SCAN = 1 << 20  # bytes of JPEG segments walked looking for APP1
+MAX_IFD_ENTRIES = 1024
+MAX_VALUE_BYTES = 1 << 16  # larger tag values are skipped
+
+JPEG_SOI = b"\xFF\xD8"
+TIFF_LE = b"II*\x00"
+TIFF_BE = b"MM\x00*"
+
+# TIFF field type -> (struct code, size in bytes)
+_FIELD_TYPES = {
+    1: ("B", 1),   # BYTE
+    2: ("s", 1),   # ASCII
+    3: ("H", 2),   # SHORT
+    4: ("L", 4),   # LONG
+    5: ("LL", 8),  # RATIONAL
+    6: ("b", 1),   # SBYTE
+    7: ("s", 1),   # UNDEFINED
+    8: ("h", 2),   # SSHORT
+    9: ("l", 4),   # SLONG
+    10: ("ll", 8),  # SRATIONAL
+    11: ("f", 4),  # FLOAT
+    12: ("d", 8),  # DOUBLE
+    13: ("L", 4),  # IFD
+}
+
+_stats: Counter = Counter()
+_stats_lock = threading.Lock()
+
+
+class _Unsupported(Exception):
+    """Raised when the fast path cannot decode a file."""
+
+
+def _count(path_name: str) -> None:
+    with _stats_lock:
+        _stats[path_name] += 1
+
+
+def exif_path_stats() -> Dict[str, int]:
+    """Return how many files used the header-only and Pillow paths."""
+    with _stats_lock:
+        return {"header": _stats["header"], "pillow": _stats["pillow"]}
+
+
+def reset_exif_path_stats() -> None:
+    """Reset the counters reported by :func:`exif_path_stats`."""
+    with _stats_lock:
+        _stats.clear()
+
+
+# ---------------------------------------------------------------------------
+# TIFF structure decoding
+# ---------------------------------------------------------------------------
+
+class _TiffReader:
+    """Random access reader over a TIFF structure starting at ``base``."""
+
+    def __init__(self, fp: BinaryIO, base: int = 0):
+        self.fp = fp
+        self.base = base
+        header = self.read(0, 8)
+        if header[:4] == TIFF_LE:
+            self.order = "<"
+        elif header[:4] == TIFF_BE:
+            self.order = ">"
+        else:
+            raise _Unsupported("not a TIFF header")
+        self.ifd0 = struct.unpack(self.order + "L", header[4:8])[0]
+
+    def read(self, offset: int, size: int) -> bytes:
+        self.fp.seek(self.base + offset)
+        data = self.fp.read(size)
+        if len(data) != size:
+            raise _Unsupported("truncated TIFF structure")
+        return data
+
+    def _decode_value(self, typ: int, count: int, data: bytes):
+        code, size = _FIELD_TYPES[typ]
+        if typ == 2:
+            return data.split(b"\x00", 1)[0].decode("utf-8", errors="replace")
+        if typ == 7:
+            return data
+        if typ in (5, 10):
+            nums = struct.unpack(self.order + code[0] * (2 * count), data)
+            values = tuple(
+                Fraction(n, d) if d else float("nan")
+                for n, d in zip(nums[::2], nums[1::2])
+            )
+        else:
+            values = struct.unpack(self.order + code * count, data)
+        return values[0] if len(values) == 1 else values
+
+    def read_ifd(self, offset: int) -> Dict[int, object]:
+        (count,) = struct.unpack(self.order + "H", self.read(offset, 2))
+        if count > MAX_IFD_ENTRIES:
+            raise _Unsupported("implausible IFD entry count")
+        table = self.read(offset + 2, count * 12)
+        tags: Dict[int, object] = {}
+        for i in range(count):
+            entry = table[i * 12:(i + 1) * 12]
+            tag, typ, n = struct.unpack(self.order + "HHL", entry[:8])
+            if typ not in _FIELD_TYPES:
+                continue
+            size = _FIELD_TYPES[typ][1] * n
+            if size > MAX_VALUE_BYTES:
+                continue
+            if size <= 4:
+                data = entry[8:8 + size]
+            else:
+                (value_offset,) = struct.unpack(self.order + "L", entry[8:12])
+                data = self.read(value_offset, size)
+            tags[tag] = self._decode_value(typ, n, data)
+        return tags
+
+
+def _decode_tiff(fp: BinaryIO, base: int = 0) -> Dict[str, object]:
+    reader = _TiffReader(fp, base)
+    tags = reader.read_ifd(reader.ifd0)
+    exif_offset = tags.get(EXIF_IFD_POINTER)
+    if isinstance(exif_offset, int):
+        for tag, value in reader.read_ifd(exif_offset).items():
+            tags.setdefault(tag, value)
+    return {TAG_NAMES.get(k, k): v for k, v in tags.items()}
+
+
+def _read_jpeg_app1(fp: BinaryIO) -> Optional[bytes]:
+    """Return the EXIF ``APP1`` payload of a JPEG or ``None`` if absent."""
+    fp.seek(2)
+    while fp.tell() < MAX_JPEG_SCAN:
+        byte = fp.read(1)
+        if not byte:
+            return None
+        if byte != b"\xFF":
+            raise _Unsupported("corrupt JPEG marker")
+        marker = fp.read(1)
+        while marker == b"\xFF":  # fill bytes
+            marker = fp.read(1)
+        if not marker:
+            return None
+        code = marker[0]
+        if code in (0xDA, 0xD9):  # start of scan / end of image
+            return None
+        if code == 0x01 or 0xD0 <= code <= 0xD7:
+            continue
+        length_bytes = fp.read(2)
+        if len(length_bytes) != 2:
+            return None
+        (length,) = struct.unpack(">H", length_bytes)
+        if length < 2:
+            raise _Unsupported("corrupt JPEG segment length")
+        if code == 0xE1:
+            payload = fp.read(length - 2)
+            if payload.startswith(b"Exif\x00\x00"):
+                return payload[6:]
+        else:
+            fp.seek(length - 2, io.SEEK_CUR)
+    raise _Unsupported("EXIF segment not found within scan limit")
+
+
+def read_exif_header(path: Path) -> Dict[str, object]:
+    """Decode EXIF tags from JPEG or TIFF headers without decoding pixels.
+
+    Raises an internal ``_Unsupported`` error for other formats or files the
+    fast path cannot parse; use :func:`read_exif` for automatic fallback.
+    """
+    with Path(path).open("rb") as fp:
+        magic = fp.read(4)
+        if magic[:2] == JPEG_SOI:
+            payload = _read_jpeg_app1(fp)
+            if payload is None:
+                return {}
+            return _decode_tiff(io.BytesIO(payload))
+        if magic in (TIFF_LE, TIFF_BE):
+            return _decode_tiff(fp)
+    raise _Unsupported("not a JPEG or TIFF file")
+
+
+def read_exif_pillow(path: Path) -> Dict[str, object]:
+    """Return EXIF tags using Pillow; empty if the file is not an image."""
+    try:
+        with Image.open(path) as img:
+            exif = img.getexif()
+            tags = dict(exif.items())
+            for tag, value in exif.get_ifd(EXIF_IFD_POINTER).items():
+                tags.setdefault(tag, value)
+            return {TAG_NAMES.get(k, k): v for k, v in tags.items()}
+    except Exception:
+        return {}
+
+
+def read_exif(path: Path) -> Dict[str, object]:
+    """Return raw EXIF tags of ``path`` keyed by tag name.
+
+    JPEG and TIFF files are decoded from their headers; everything else, and
+    any file the fast path rejects, is handed to Pillow.
+    """
+    try:
+        tags = read_exif_header(path)
+    except (_Unsupported, struct.error, OSError):
+        _count("pillow")
+        return read_exif_pillow(path)
+    _count("header")
+    return tags
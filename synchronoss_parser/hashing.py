@@ -0,0 +1,167 @@
+"""File hashing helpers shared by the collectors.
+
+Several digests can be computed from a single read of each file, optionally
+while the file is being copied, using large reusable buffers. Finished
+digests can be recorded in a manifest that standard tools verify in one
+streaming job:
+
+* ``sums`` – coreutils format (``sha256sum -c``, ``md5sum -c``, ``b2sum -c``)
+* ``hashdeep`` – hashdeep known-file format (``hashdeep -r -a -k``)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+from .profiling import span
+
+DIGESTS = ("md5", "sha1", "sha256", "blake2b")
+DEFAULT_DIGESTS = ("md5",)
+
+# Log column used for each digest
+DIGEST_COLUMNS = {"md5": "MD5", "sha1": "SHA1", "sha256": "SHA256", "blake2b": "BLAKE2B"}
+
+# Coreutils tool whose ``-c`` option verifies each digest
+SUM_TOOLS = {"md5": "md5sum", "sha1": "sha1sum", "sha256": "sha256sum", "blake2b": "b2sum"}
+
+MANIFEST_FORMATS = ("sums", "hashdeep")
+HASHDEEP_DIGESTS = ("md5", "sha1", "sha256")
+
+BUFFER_SIZE = 1 << 20
+
+
+def parse_digests(text: str | Iterable[str] | None) -> Tuple[str, ...]:
+    """Return a validated tuple of digest names from ``"md5,sha256"`` style input."""
+    if not text:
+        return DEFAULT_DIGESTS
+    parts = text.split(",") if isinstance(text, str) else list(text)
+    names = []
+    for part in parts:
+        name = part.strip().lower().replace("-", "")
+        if not name:
+            continue
+        if name not in DIGESTS:
+            raise ValueError(f"Unsupported digest '{part}'. Choose from: {', '.join(DIGESTS)}")
+        if name not in names:
+            names.append(name)
+    return tuple(names) or DEFAULT_DIGESTS
+
+
+def digest_columns(digests: Sequence[str]) -> list:
+    """Return the log column names for ``digests``."""
+    return [DIGEST_COLUMNS[d] for d in digests]
+
+
+def _new_hashers(digests: Sequence[str]):
+    return [(name, hashlib.new(name)) for name in digests]
+
+
+def hash_file(
+    path: Path, digests: Sequence[str] = DEFAULT_DIGESTS, bufsize: int = BUFFER_SIZE
+) -> Dict[str, str]:
+    """Return ``{digest: hexdigest}`` for ``path`` computed in a single read."""
+    hashers = _new_hashers(digests)
+    buf = bytearray(bufsize)
+    view = memoryview(buf)
+    with span("hash_file") as s, Path(path).open("rb") as f:
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
+            s.add_bytes(n)
+            for _, h in hashers:
+                h.update(view[:n])
+    return {name: h.hexdigest() for name, h in hashers}
+
+
+def copy_and_hash(
+    src: Path, dest: Path, digests: Sequence[str] = DEFAULT_DIGESTS, bufsize: int = BUFFER_SIZE
+) -> Dict[str, str]:
+    """Copy ``src`` to ``dest`` like :func:`shutil.copy2`, hashing the bytes on the way.
+
+    Returns ``{digest: hexdigest}`` of the copied content.
+    """
+    hashers = _new_hashers(digests)
+    buf = bytearray(bufsize)
+    view = memoryview(buf)
+    with span("copy_and_hash") as s:
+        with Path(src).open("rb") as fsrc, Path(dest).open("wb") as fdst:
+            while True:
+                n = fsrc.readinto(buf)
+                if not n:
+                    break
+                s.add_bytes(n)
+                chunk = view[:n]
+                for _, h in hashers:
+                    h.update(chunk)
+                fdst.write(chunk)
+        shutil.copystat(src, dest)
+    return {name: h.hexdigest() for name, h in hashers}
+
+
+class ManifestWriter:
+    """Append one line per file to a hash manifest as files are produced.
+
+    Paths are written relative to ``root`` so the manifest can be verified
+    from inside that folder, e.g. ``cd "Compiled Media" && sha256sum -c
+    compiled_media_log/compiled_media.sha256sum``.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        root: Path,
+        digests: Sequence[str],
+        style: str = "sums",
+    ):
+        if style not in MANIFEST_FORMATS:
+            raise ValueError(f"Unknown manifest format '{style}'. Choose from: {', '.join(MANIFEST_FORMATS)}")
+        self.root = Path(root)
+        self.style = style
+        if style == "sums":
+            self.digests: Tuple[str, ...] = ("sha256",) if "sha256" in digests else (digests[0],)
+        else:
+            self.digests = tuple(d for d in digests if d in HASHDEEP_DIGESTS)
+            if not self.digests:
+                raise ValueError("hashdeep manifests need at least one of md5, sha1 or sha256")
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fh = self.path.open("w", encoding="utf-8", newline="\n")
+        if style == "hashdeep":
+            self._fh.write("%%%% HASHDEEP-1.0\n")
+            self._fh.write(f"%%%% size,{','.join(self.digests)},filename\n")
+            self._fh.write(f"## Invoked from: {self.root.resolve()}\n")
+            self._fh.write("##\n")
+
+    @classmethod
+    def for_log(cls, logfile: Path, root: Path, digests: Sequence[str], style: str) -> "ManifestWriter":
+        """Create a manifest next to ``logfile`` named after the checking tool."""
+        if style == "sums":
+            digest = "sha256" if "sha256" in digests else digests[0]
+            suffix = "." + SUM_TOOLS[digest]
+        else:
+            suffix = ".hashdeep"
+        return cls(Path(logfile).with_suffix(suffix), root, digests, style)
+
+    def add(self, file: Path, hashes: Dict[str, str], size: Optional[int] = None) -> None:
+        rel = os.path.relpath(file, start=self.root).replace(os.sep, "/")
+        if self.style == "sums":
+            self._fh.write(f"{hashes[self.digests[0]]}  {rel}\n")
+        else:
+            if size is None:
+                size = Path(file).stat().st_size
+            values = ",".join(hashes[d] for d in self.digests)
+            self._fh.write(f"{size},{values},./{rel}\n")
+
+    def close(self) -> None:
+        self._fh.close()
+
+    def __enter__(self) -> "ManifestWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
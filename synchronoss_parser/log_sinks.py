@@ -0,0 +1,385 @@
+"""Pluggable writers for the metadata logs produced by the collectors.
+
+Every sink accepts dictionaries one at a time through :meth:`LogSink.write`
+so rows reach disk as they are produced. Columns are the fixed ``columns``
+passed at construction followed by any new keys in the order they first
+appear (EXIF tags, for example). How late keys are stored depends on the
+backend:
+
+* ``xlsx`` – the header row is extended in place (the workbook is held in
+  memory until it is saved).
+* ``jsonl`` – every line is self describing.
+* ``sqlite`` – the table gains a column via ``ALTER TABLE``.
+* ``csv`` / ``parquet`` – the schema is fixed after sampling the first rows;
+  keys first seen later are stored as JSON in an ``Extra`` column.
+
+Use :func:`open_sink` to pick a backend from a file extension or an explicit
+format name.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+from abc import ABC, abstractmethod
+import math
+import sqlite3
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+from openpyxl import Workbook
+
+from .profiling import span
+
+LOG_FORMATS = ("xlsx", "csv", "jsonl", "parquet", "sqlite")
+
+FORMAT_SUFFIXES = {
+    "xlsx": ".xlsx",
+    "csv": ".csv",
+    "jsonl": ".jsonl",
+    "parquet": ".parquet",
+    "sqlite": ".sqlite",
+}
+
+SUFFIX_FORMATS = {
+    ".xlsx": "xlsx",
+    ".csv": "csv",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+    ".parquet": "parquet",
+    ".sqlite": "sqlite",
+    ".sqlite3": "sqlite",
+    ".db": "sqlite",
+}
+
+EXTRA_COLUMN = "Extra"
+
+
+def plain_value(value: Any) -> Any:
+    """Return ``value`` as a JSON/CSV/SQLite friendly primitive."""
+    if value is None:
+        return None
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+class LogSink(ABC):
+    """Base class for row-at-a-time log writers."""
+
+    format = ""
+
+    def __init__(self, path: Path, columns: Sequence[str], title: str = "Log"):
+        self.path = Path(path)
+        self.columns: List[str] = list(columns)
+        self._known = set(self.columns)
+        self.title = title
+        self.rows = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def _new_keys(self, record: Mapping[str, Any]) -> List[str]:
+        new = [k for k in record if k not in self._known]
+        for key in new:
+            self._known.add(key)
+            self.columns.append(key)
+        return new
+
+    @abstractmethod
+    def write(self, record: Mapping[str, Any]) -> None:
+        """Append one row."""
+
+    def write_many(self, records: Iterable[Mapping[str, Any]]) -> None:
+        for record in records:
+            self.write(record)
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "LogSink":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        with span("log_save"):
+            self.close()
+
+
+class ExcelSink(LogSink):
+    """Write rows to an ``.xlsx`` workbook.
+
+    Unlike the other sinks this one is not streaming: openpyxl keeps the
+    whole workbook in memory until :meth:`close` saves it. A write-only
+    workbook would stream, but could not extend the header row for keys
+    that first appear late. Use ``csv``, ``jsonl``, ``parquet`` or
+    ``sqlite`` for very large logs.
+    """
+
+    format = "xlsx"
+
+    def __init__(self, path: Path, columns: Sequence[str], title: str = "Log"):
+        super().__init__(path, columns, title)
+        self.wb = Workbook()
+        self.ws = self.wb.active
+        self.ws.title = title
+        self.ws.append(self.columns)
+
+    def write(self, record: Mapping[str, Any]) -> None:
+        for key in self._new_keys(record):
+            self.ws.cell(row=1, column=len(self.columns), value=key)
+        self.ws.append([record.get(h, "") for h in self.columns])
+        self.rows += 1
+
+    def close(self) -> None:
+        self.wb.save(self.path)
+
+
+class JsonlSink(LogSink):
+    """Write one JSON object per line."""
+
+    format = "jsonl"
+
+    def __init__(self, path: Path, columns: Sequence[str], title: str = "Log"):
+        super().__init__(path, columns, title)
+        self._fh = self.path.open("w", encoding="utf-8")
+
+    def write(self, record: Mapping[str, Any]) -> None:
+        self._new_keys(record)
+        row = {k: plain_value(v) for k, v in record.items()}
+        self._fh.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self.rows += 1
+
+    def close(self) -> None:
+        self._fh.close()
+
+
+class _SampledSchemaSink(LogSink):
+    """Sink whose schema is fixed after buffering ``sample_size`` rows."""
+
+    def __init__(
+        self,
+        path: Path,
+        columns: Sequence[str],
+        title: str = "Log",
+        sample_size: int = 1000,
+    ):
+        super().__init__(path, columns, title)
+        self.sample_size = sample_size
+        self._pending: List[Mapping[str, Any]] = []
+        self._frozen = False
+
+    def _row(self, record: Mapping[str, Any]) -> List[Any]:
+        row = [plain_value(record.get(h)) for h in self.columns]
+        extra = {k: plain_value(v) for k, v in record.items() if k not in self._known}
+        row.append(json.dumps(extra, ensure_ascii=False) if extra else None)
+        return row
+
+    def _freeze(self) -> None:
+        for record in self._pending:
+            self._new_keys(record)
+        self._frozen = True
+        self._start()
+        pending, self._pending = self._pending, []
+        self._emit([self._row(r) for r in pending])
+
+    def write(self, record: Mapping[str, Any]) -> None:
+        self.rows += 1
+        if self._frozen:
+            self._emit([self._row(record)])
+            return
+        self._pending.append(record)
+        if len(self._pending) >= self.sample_size:
+            self._freeze()
+
+    def close(self) -> None:
+        if not self._frozen:
+            self._freeze()
+        self._finish()
+
+    @abstractmethod
+    def _start(self) -> None:
+        """Open the output once ``self.columns`` is final."""
+
+    @abstractmethod
+    def _emit(self, rows: List[List[Any]]) -> None:
+        """Write rows built by :meth:`_row`."""
+
+    def _finish(self) -> None:
+        pass
+
+
+class CsvSink(_SampledSchemaSink):
+    """Write rows to a UTF-8 CSV file."""
+
+    format = "csv"
+
+    def _start(self) -> None:
+        self._fh = self.path.open("w", encoding="utf-8", newline="")
+        self._writer = csv.writer(self._fh)
+        self._writer.writerow(self.columns + [EXTRA_COLUMN])
+
+    def _emit(self, rows: List[List[Any]]) -> None:
+        self._writer.writerows(rows)
+
+    def _finish(self) -> None:
+        self._fh.close()
+
+
+class ParquetSink(_SampledSchemaSink):
+    """Write rows to a Parquet file in row groups (requires ``pyarrow``).
+
+    All columns are stored as strings because EXIF values are not
+    consistently typed across files.
+    """
+
+    format = "parquet"
+
+    def __init__(
+        self,
+        path: Path,
+        columns: Sequence[str],
+        title: str = "Log",
+        sample_size: int = 1000,
+        batch_size: int = 10000,
+    ):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise RuntimeError(
+                "Parquet output requires pyarrow. Install with:\n  pip install pyarrow"
+            )
+        super().__init__(path, columns, title, sample_size)
+        self.batch_size = batch_size
+        self._batch: List[List[Any]] = []
+
+    def _start(self) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        names = self.columns + [EXTRA_COLUMN]
+        self._schema = pa.schema([(name, pa.string()) for name in names])
+        self._writer = pq.ParquetWriter(str(self.path), self._schema)
+
+    def _emit(self, rows: List[List[Any]]) -> None:
+        self._batch.extend(rows)
+        if len(self._batch) >= self.batch_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        import pyarrow as pa
+
+        if not self._batch:
+            return
+        arrays = [
+            pa.array([None if r[i] is None else str(r[i]) for r in self._batch], pa.string())
+            for i in range(len(self._schema))
+        ]
+        self._writer.write_table(pa.Table.from_arrays(arrays, schema=self._schema))
+        self._batch = []
+
+    def _finish(self) -> None:
+        self._flush()
+        self._writer.close()
+
+
+def _quote_ident(name: str) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+class SqliteSink(LogSink):
+    """Write rows to a table in an SQLite database."""
+
+    format = "sqlite"
+
+    def __init__(
+        self,
+        path: Path,
+        columns: Sequence[str],
+        title: str = "Log",
+        table: str = "log",
+        batch_size: int = 1000,
+    ):
+        super().__init__(path, columns, title)
+        self.table = table
+        self.batch_size = batch_size
+        self._batch: List[Dict[str, Any]] = []
+        if self.path.exists():
+            self.path.unlink()
+        self.conn = sqlite3.connect(str(self.path))
+        cols = ", ".join(_quote_ident(c) for c in self.columns)
+        self.conn.execute(f"CREATE TABLE {_quote_ident(table)} ({cols})")
+
+    def _flush(self) -> None:
+        # Rows are grouped by key set so each group is a single executemany.
+        groups: Dict[tuple, List[tuple]] = {}
+        for row in self._batch:
+            groups.setdefault(tuple(row), []).append(tuple(row.values()))
+        for keys, values in groups.items():
+            cols = ", ".join(_quote_ident(k) for k in keys)
+            marks = ", ".join("?" for _ in keys)
+            self.conn.executemany(
+                f"INSERT INTO {_quote_ident(self.table)} ({cols}) VALUES ({marks})",
+                values,
+            )
+        self._batch = []
+
+    def write(self, record: Mapping[str, Any]) -> None:
+        new = self._new_keys(record)
+        if new:
+            self._flush()
+            for key in new:
+                self.conn.execute(
+                    f"ALTER TABLE {_quote_ident(self.table)} ADD COLUMN {_quote_ident(key)}"
+                )
+        self._batch.append({k: plain_value(v) for k, v in record.items()})
+        self.rows += 1
+        if len(self._batch) >= self.batch_size:
+            self._flush()
+
+    def close(self) -> None:
+        self._flush()
+        self.conn.commit()
+        self.conn.close()
+
+
+SINKS = {
+    "xlsx": ExcelSink,
+    "csv": CsvSink,
+    "jsonl": JsonlSink,
+    "parquet": ParquetSink,
+    "sqlite": SqliteSink,
+}
+
+
+def resolve_log_format(path: Path, log_format: Optional[str] = None) -> tuple:
+    """Return ``(format, path)`` for ``path`` and an optional explicit format.
+
+    An explicit ``log_format`` wins and replaces the file extension;
+    otherwise the format is taken from the extension.
+    """
+    path = Path(path)
+    if log_format:
+        fmt = log_format.lower()
+        if fmt not in SINKS:
+            raise ValueError(f"Unknown log format '{log_format}'. Choose from: {', '.join(LOG_FORMATS)}")
+        if SUFFIX_FORMATS.get(path.suffix.lower()) != fmt:
+            path = path.with_suffix(FORMAT_SUFFIXES[fmt])
+        return fmt, path
+    fmt = SUFFIX_FORMATS.get(path.suffix.lower())
+    if fmt is None:
+        raise ValueError(f"Cannot infer log format from '{path.name}'. Use one of: {', '.join(LOG_FORMATS)}")
+    return fmt, path
+
+
+def open_sink(
+    path: Path,
+    columns: Sequence[str],
+    log_format: Optional[str] = None,
+    title: str = "Log",
+) -> LogSink:
+    """Create the sink for ``path`` (see :func:`resolve_log_format`)."""
+    fmt, path = resolve_log_format(path, log_format)
+    return SINKS[fmt](path, columns, title=title)
@@ -9,9 +9,14 @@ Usage:
   merge-contacts-logs --call-log 'Call Log/call_log.csv' --contacts-xlsx contacts.xlsx
 """
 
+from __future__ import annotations
+
 import argparse
+import gzip
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import IO, Dict, Iterable, Iterator, Optional, Tuple
 
 # Try imports and give friendly guidance if packages aren't installed
 try:  # pragma: no cover - import guidance
@@ -21,47 +26,248 @@ except ImportError:  # pragma: no cover - user guidance path
     print("Exiting due to missing dependency.")
     sys.exit(1)
 
-from .render_transcripts import build_contact_lookup
+from .call_summary import CallSummary, write_summary
+from .log_sinks import LOG_FORMATS
+from .phone_match import DEFAULT_MIN_SUFFIX, PhoneMatcher
+from .pipeline import ordered_map
+from .profiling import add_profile_arguments, profile_from_args, span
+from .render_transcripts import load_contact_mapping, normalize_phone_series
 
 
-def merge_call_log(call_log_csv: str, contacts_xlsx: str, output_csv: str) -> int:
-    """Merge call log with contacts and write a new CSV."""
-    lookup = build_contact_lookup(contacts_xlsx)
-    df = pd.read_csv(call_log_csv)
-    if "caller" in df.columns:
-        df["caller_name"] = df["caller"].apply(lookup)
-    else:
-        df["caller_name"] = ""
-    if "recipient" in df.columns:
-        df["recipient_name"] = df["recipient"].apply(lookup)
+NUMBER_COLUMNS = {"caller": "caller_name", "recipient": "recipient_name"}
+# Rows per chunk for --chunk-size
+CHUNK_SIZE = 100_000
+COMPRESSION_SUFFIXES = {".gz": "gzip", ".zst": "zstd"}
+COMPRESSIONS = tuple(COMPRESSION_SUFFIXES.values())
+# zlib default; level 9 is several times slower for a few percent smaller files
+GZIP_LEVEL = 6
+
+
+def resolve_names(numbers: pd.Series, mapping: Dict[str, str], matcher: Optional[PhoneMatcher] = None) -> pd.Series:
+    """Return contact names for a column of phone numbers.
+
+    The column is normalized at once and joined against ``mapping`` with
+    :meth:`pandas.Series.map`. ``matcher`` is only consulted for the distinct
+    numbers left unresolved. Unmatched numbers are returned unchanged.
+    """
+    digits = normalize_phone_series(numbers)
+    names = digits.map(mapping)
+    if matcher is not None:
+        missing = names.isna() & digits.ne("")
+        if missing.any():
+            found = {d: matcher.resolve(d) for d in digits[missing].unique()}
+            names = names.fillna(digits.map(found))
+    return names.fillna(numbers)
+
+
+def annotate_call_log(df: pd.DataFrame, mapping: Dict[str, str], matcher: Optional[PhoneMatcher] = None) -> pd.DataFrame:
+    """Add the ``caller_name`` and ``recipient_name`` columns to ``df``."""
+    for column, name_column in NUMBER_COLUMNS.items():
+        if column in df.columns:
+            df[name_column] = resolve_names(df[column], mapping, matcher)
+        else:
+            df[name_column] = ""
+    return df
+
+
+def _read_chunks(call_log_csv: str, chunk_size: Optional[int]) -> Iterator[pd.DataFrame]:
+    if not chunk_size:
+        with span("csv_parse", Path(call_log_csv).stat().st_size):
+            df = pd.read_csv(call_log_csv, dtype=str)
+        yield df
+        return
+    with pd.read_csv(call_log_csv, dtype=str, chunksize=chunk_size) as reader:
+        while True:
+            with span("csv_parse"):
+                df = next(reader, None)
+            if df is None:
+                return
+            yield df
+
+
+def _annotate_serial(
+    chunks: Iterable[pd.DataFrame], mapping: Dict[str, str], matcher: Optional[PhoneMatcher]
+) -> Iterator[pd.DataFrame]:
+    for df in chunks:
+        with span("name_lookup"):
+            df = annotate_call_log(df, mapping, matcher)
+        yield df
+
+
+# Contacts of a worker process, set once by _init_worker
+_WORKER: Tuple[Dict[str, str], Optional[PhoneMatcher]] = ({}, None)
+
+
+def _init_worker(mapping: Dict[str, str], match_suffix: Optional[int]) -> None:
+    global _WORKER
+    _WORKER = (mapping, PhoneMatcher(mapping, match_suffix) if match_suffix and mapping else None)
+
+
+def _annotate_chunk(df: pd.DataFrame) -> pd.DataFrame:
+    return annotate_call_log(df, *_WORKER)
+
+
+def _annotate_parallel(
+    chunks: Iterable[pd.DataFrame], mapping: Dict[str, str], match_suffix: Optional[int], workers: int
+) -> Iterator[pd.DataFrame]:
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(mapping, match_suffix)
+    ) as pool:
+        yield from ordered_map(pool, _annotate_chunk, chunks, workers * 2)
+
+
+def compression_for(path: str | Path) -> Optional[str]:
+    """Return the compression implied by the extension of ``path``."""
+    return COMPRESSION_SUFFIXES.get(Path(path).suffix.lower())
+
+
+def open_output(path: str | Path, compression: Optional[str] = None) -> IO[str]:
+    """Open ``path`` for writing text, compressed with ``gzip`` or ``zstd``."""
+    if compression == "gzip":
+        return gzip.open(path, "wt", compresslevel=GZIP_LEVEL, encoding="utf-8", newline="")
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise RuntimeError(
+                "zstd output requires zstandard. Install with:\n  pip install zstandard"
+            )
+        return zstandard.open(path, "wt", encoding="utf-8", newline="")
+    if compression:
+        raise ValueError(f"Unknown compression '{compression}'. Use one of: {', '.join(COMPRESSIONS)}")
+    return open(path, "w", encoding="utf-8", newline="")
+
+
+def merge_call_log(
+    call_log_csv: str,
+    contacts_xlsx: str,
+    output_csv: str,
+    match_suffix: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    compression: Optional[str] = None,
+    workers: int = 1,
+    summary: Optional[CallSummary] = None,
+) -> int:
+    """Merge call log with contacts and write a new CSV.
+
+    The log is read as text, so numbers keep their leading ``+`` and zeros.
+    ``match_suffix`` also matches numbers on their trailing digits when there
+    is no exact match (see
+    :func:`~synchronoss_parser.render_transcripts.build_contact_lookup`).
+
+    With ``chunk_size`` the log is read, annotated and appended to the output
+    ``chunk_size`` rows at a time, so memory stays flat however long the log
+    is; ``workers`` processes then annotate chunks in parallel while the
+    output keeps the input order. ``compression`` (``gzip`` or ``zstd``,
+    default: from the ``output_csv`` extension) compresses the output.
+    Annotated chunks are also added to ``summary`` when given (see
+    :mod:`synchronoss_parser.call_summary`). Returns the number of rows
+    written.
+    """
+    mapping = load_contact_mapping(contacts_xlsx)
+    if compression is None:
+        compression = compression_for(output_csv)
+    chunks = _read_chunks(call_log_csv, chunk_size)
+    if chunk_size and workers > 1:
+        annotated = _annotate_parallel(chunks, mapping, match_suffix, workers)
     else:
-        df["recipient_name"] = ""
-    df.to_csv(output_csv, index=False)
-    return len(df)
+        matcher = PhoneMatcher(mapping, match_suffix) if match_suffix and mapping else None
+        annotated = _annotate_serial(chunks, mapping, matcher)
+
+    # The header comes from the columns alone, so a log without rows (which
+    # yields no chunks) still gets one
+    header = annotate_call_log(pd.read_csv(call_log_csv, dtype=str, nrows=0), mapping)
+    rows = 0
+    with open_output(output_csv, compression) as out:
+        header.to_csv(out, index=False)
+        for df in annotated:
+            with span("log_save"):
+                df.to_csv(out, index=False, header=False)
+            if summary is not None:
+                with span("summary"):
+                    summary.add(df)
+            rows += len(df)
+    return rows
 
 
-def main() -> None:  # pragma: no cover - CLI convenience wrapper
+def main(argv=None) -> None:  # pragma: no cover - CLI convenience wrapper
     parser = argparse.ArgumentParser(
         description="Merge call log CSV with contacts to annotate names."
     )
     parser.add_argument("--call-log", required=True, help="Path to call_log.csv")
     parser.add_argument(
-        "--contacts-xlsx", required=True, help="Path to contacts Excel file"
+        "--contacts-xlsx", required=True, help="Path to contacts Excel file or phone index"
     )
     parser.add_argument(
         "--output", help="Path for output CSV (default: call_log_named.csv)"
     )
-    args = parser.parse_args()
+    parser.add_argument(
+        "--match-suffix",
+        type=int,
+        nargs="?",
+        const=DEFAULT_MIN_SUFFIX,
+        metavar="DIGITS",
+        help=f"Also match contacts on the last DIGITS digits (default: {DEFAULT_MIN_SUFFIX})",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        nargs="?",
+        const=CHUNK_SIZE,
+        metavar="ROWS",
+        help=f"Stream the log in chunks of ROWS rows with constant memory (default: {CHUNK_SIZE})",
+    )
+    parser.add_argument(
+        "--compress", choices=COMPRESSIONS, help="Compress the output (zstd requires zstandard)"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Processes annotating chunks with --chunk-size (default: 1)"
+    )
+    parser.add_argument(
+        "--summary",
+        action="store_true",
+        help="Also write per-contact and per-day call summaries next to the output",
+    )
+    parser.add_argument(
+        "--summary-format",
+        choices=LOG_FORMATS,
+        default="xlsx",
+        help="Format of the summary files (default: xlsx)",
+    )
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
 
     out_path = (
         Path(args.output)
         if args.output
         else Path(args.call_log).with_name(Path(args.call_log).stem + "_named.csv")
     )
+    compression = args.compress or compression_for(out_path)
+    if compression and compression_for(out_path) != compression:
+        out_path = out_path.with_name(
+            out_path.name + next(k for k, v in COMPRESSION_SUFFIXES.items() if v == compression)
+        )
 
+    summary = CallSummary() if args.summary else None
     try:
-        rows = merge_call_log(args.call_log, args.contacts_xlsx, str(out_path))
+        with profile_from_args(args):
+            rows = merge_call_log(
+                args.call_log,
+                args.contacts_xlsx,
+                str(out_path),
+                args.match_suffix,
+                chunk_size=args.chunk_size,
+                compression=compression,
+                workers=args.workers,
+                summary=summary,
+            )
+            if summary is not None:
+                with span("summary_save"):
+                    summary_files = write_summary(summary, out_path, args.summary_format)
         print(f"Wrote {rows} rows to {out_path}")
+        if summary is not None:
+            for path in summary_files:
+                print(f"Wrote summary {path}")
     except Exception as e:  # broad but intentional for user guidance
         print(f"Error: {e}")
         sys.exit(1)
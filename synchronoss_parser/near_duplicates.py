@@ -0,0 +1,222 @@
+"""Perceptual hashing and near-duplicate clustering for compiled images.
+
+Byte-level digests miss re-encoded copies of the same picture (MMS
+recompression, resized forwards, screenshots). This module computes a 64-bit
+perceptual hash from a small downscaled decode of each image:
+
+* ``dhash`` – difference hash of a 9x8 greyscale thumbnail (default)
+* ``phash`` – DCT hash of a 32x32 greyscale thumbnail
+
+Hashes are clustered online by :class:`NearDuplicateIndex`: each image joins
+the cluster of the closest earlier *leader* within ``radius`` bits, or starts
+a new cluster. Leaders are stored in a multi-index hash table so a radius
+query only inspects hashes sharing an exact chunk with the query, which keeps
+lookups fast for hundreds of thousands of images. Because assignment happens
+as files arrive, the cluster can be written straight into streaming logs.
+"""
+
+from __future__ import annotations
+
+import csv
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image
+
+from .profiling import span
+
+HASH_BITS = 64
+HASH_ALGORITHMS = ("dhash", "phash")
+DEFAULT_RADIUS = 4
+
+# Extensions worth decoding for a perceptual hash
+HASHABLE_EXTS = {".jpg", ".jpeg", ".png", ".gif", ".bmp", ".tif", ".tiff", ".webp"}
+
+# Log columns added when near-duplicate detection is enabled
+NEAR_DUPE_COLUMNS = ["Perceptual Hash", "Near-Duplicate Cluster", "Near Duplicate Of"]
+
+
+def _load_grey(path: Path, size: Tuple[int, int]) -> Image.Image:
+    with Image.open(path) as img:
+        # JPEG decoders can scale by 1/2..1/8 while decoding
+        img.draft("L", (size[0] * 4, size[1] * 4))
+        return img.convert("L").resize(size, Image.Resampling.BILINEAR)
+
+
+def dhash(path: Path) -> Optional[int]:
+    """Return the 64-bit difference hash of ``path`` or ``None`` if unreadable."""
+    try:
+        img = _load_grey(path, (9, 8))
+    except Exception:
+        return None
+    px = img.tobytes()
+    value = 0
+    for row in range(8):
+        base = row * 9
+        for col in range(8):
+            value = (value << 1) | (px[base + col] > px[base + col + 1])
+    return value
+
+
+_DCT_MATRIX = None
+
+
+def phash(path: Path) -> Optional[int]:
+    """Return the 64-bit DCT perceptual hash of ``path`` or ``None``."""
+    global _DCT_MATRIX
+    import numpy as np
+
+    try:
+        img = _load_grey(path, (32, 32))
+    except Exception:
+        return None
+    if _DCT_MATRIX is None:
+        n = np.arange(32)
+        _DCT_MATRIX = np.cos(np.pi * (2 * n[None, :] + 1) * n[:, None] / 64)
+    pixels = np.asarray(img, dtype=np.float64)
+    low = (_DCT_MATRIX @ pixels @ _DCT_MATRIX.T)[:8, :8].flatten()
+    median = np.median(low[1:])
+    value = 0
+    for bit in low > median:
+        value = (value << 1) | int(bit)
+    return value
+
+
+HASHERS = {"dhash": dhash, "phash": phash}
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def format_hash(value: int) -> str:
+    return f"{value:016x}"
+
+
+class HammingIndex:
+    """Multi-index hash table answering Hamming-radius queries.
+
+    Each hash is split into ``radius + 1`` disjoint chunks. Two hashes within
+    ``radius`` bits must agree exactly on at least one chunk (pigeonhole), so
+    only entries sharing a chunk with the query are compared.
+    """
+
+    def __init__(self, radius: int = DEFAULT_RADIUS, bits: int = HASH_BITS):
+        self.radius = radius
+        parts = radius + 1
+        bounds = [round(i * bits / parts) for i in range(parts + 1)]
+        self._chunks = [(lo, (1 << (hi - lo)) - 1) for lo, hi in zip(bounds, bounds[1:])]
+        self._tables: List[Dict[int, List[int]]] = [{} for _ in self._chunks]
+        self.hashes: List[int] = []
+
+    def add(self, value: int) -> int:
+        """Insert ``value`` and return its position."""
+        pos = len(self.hashes)
+        self.hashes.append(value)
+        for table, (shift, mask) in zip(self._tables, self._chunks):
+            table.setdefault((value >> shift) & mask, []).append(pos)
+        return pos
+
+    def query(self, value: int) -> List[Tuple[int, int]]:
+        """Return ``(position, distance)`` pairs within ``radius``, nearest first."""
+        seen = set()
+        found = []
+        for table, (shift, mask) in zip(self._tables, self._chunks):
+            for pos in table.get((value >> shift) & mask, ()):
+                if pos in seen:
+                    continue
+                seen.add(pos)
+                dist = hamming(value, self.hashes[pos])
+                if dist <= self.radius:
+                    found.append((pos, dist))
+        found.sort(key=lambda x: (x[1], x[0]))
+        return found
+
+
+@dataclass
+class NearDuplicate:
+    cluster: int
+    leader: str
+    distance: int
+    hash: int
+
+
+class NearDuplicateIndex:
+    """Online clustering of perceptual hashes (see module docstring)."""
+
+    def __init__(self, radius: int = DEFAULT_RADIUS, algorithm: str = "dhash"):
+        if algorithm not in HASHERS:
+            raise ValueError(f"Unknown hash '{algorithm}'. Choose from: {', '.join(HASH_ALGORITHMS)}")
+        self.radius = radius
+        self.algorithm = algorithm
+        self._hasher = HASHERS[algorithm]
+        self._leaders = HammingIndex(radius)
+        self._leader_names: List[str] = []
+        self.members: Dict[int, List[Tuple[str, int, int]]] = {}
+
+    def add(self, name: str, value: int) -> NearDuplicate:
+        """Assign ``name`` with hash ``value`` to a cluster."""
+        matches = self._leaders.query(value)
+        if matches:
+            cluster, dist = matches[0]
+        else:
+            cluster, dist = self._leaders.add(value), 0
+            self._leader_names.append(name)
+        self.members.setdefault(cluster, []).append((name, value, dist))
+        return NearDuplicate(cluster + 1, self._leader_names[cluster], dist, value)
+
+    def hash_path(self, path: Path) -> Optional[int]:
+        """Return the perceptual hash of ``path``; ``None`` if not an image.
+
+        Safe to call from several threads; only :meth:`add` must be serial.
+        """
+        if Path(path).suffix.lower() not in HASHABLE_EXTS:
+            return None
+        with span("perceptual_hash"):
+            return self._hasher(path)
+
+    def add_file(self, name: str, path: Path) -> Optional[NearDuplicate]:
+        """Hash ``path`` and cluster it under ``name``; ``None`` if not an image."""
+        value = self.hash_path(path)
+        if value is None:
+            return None
+        return self.add(name, value)
+
+    def record_columns(self, name: str, path: Path) -> Dict[str, object]:
+        """Return the log columns for ``path`` (empty if it is not an image)."""
+        return self.hash_columns(name, self.hash_path(path))
+
+    def hash_columns(self, name: str, value: Optional[int]) -> Dict[str, object]:
+        """Cluster a hash from :meth:`hash_path` and return its log columns."""
+        if value is None:
+            return {}
+        dup = self.add(name, value)
+        return {
+            "Perceptual Hash": format_hash(dup.hash),
+            "Near-Duplicate Cluster": dup.cluster,
+            "Near Duplicate Of": dup.leader if dup.leader != name else "",
+        }
+
+    def clusters(self, min_size: int = 2) -> List[Tuple[int, List[Tuple[str, int, int]]]]:
+        """Return ``(cluster, members)`` for clusters with at least ``min_size`` members."""
+        return [(c + 1, m) for c, m in sorted(self.members.items()) if len(m) >= min_size]
+
+    def write_report(self, path: Path) -> int:
+        """Write near-duplicate clusters to a CSV file; returns the cluster count."""
+        clusters = self.clusters()
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Cluster", "Size", "File Name", "Perceptual Hash", "Distance To First"])
+            for cluster, members in clusters:
+                for name, value, dist in members:
+                    writer.writerow([cluster, len(members), name, format_hash(value), dist])
+        return len(clusters)
+
+
+def report_path_for_log(logfile: Path) -> Path:
+    """Return the near-duplicate report path stored next to ``logfile``."""
+    logfile = Path(logfile)
+    return logfile.with_name(logfile.stem + "_near_duplicates.csv")
@@ -0,0 +1,73 @@
+"""Phone index files: normalized number -> display name.
+
+``contacts-to-excel --phone-index contacts_index.sqlite`` writes one row per
+contact phone number with the normalized ``number``, the display ``name`` and
+the contact's full set of columns. The index is written through the log sinks,
+so it can be CSV, JSONL, Parquet or SQLite (see
+:mod:`synchronoss_parser.log_sinks`).
+
+Every tool that takes a contacts workbook also accepts an index (see
+:func:`synchronoss_parser.render_transcripts.load_contact_mapping`). Only the
+``number`` and ``name`` columns are read, which for Parquet and SQLite means
+the other columns are never touched. That takes milliseconds, where
+``pd.read_excel`` on the workbook takes seconds.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import sqlite3
+from pathlib import Path
+from typing import Dict
+
+from .log_sinks import SUFFIX_FORMATS
+
+INDEX_COLUMNS = ["number", "name"]
+INDEX_FORMATS = ("csv", "jsonl", "parquet", "sqlite")
+# The table SqliteSink writes rows to
+SQLITE_TABLE = "log"
+
+
+def is_phone_index(path) -> bool:
+    """Return whether ``path`` names a phone index rather than a workbook."""
+    return SUFFIX_FORMATS.get(Path(path).suffix.lower()) in INDEX_FORMATS
+
+
+def read_phone_index(path) -> Dict[str, str]:
+    """Return ``{normalized number: name}`` from a phone index file.
+
+    Later rows win when a number appears twice, as in the workbook lookup.
+    """
+    path = Path(path)
+    fmt = SUFFIX_FORMATS.get(path.suffix.lower())
+    if fmt == "csv":
+        with path.open("r", encoding="utf-8", newline="") as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            i, j = header.index("number"), header.index("name")
+            width = max(i, j)
+            return {row[i]: row[j] for row in reader if len(row) > width and row[i] and row[j]}
+    if fmt == "jsonl":
+        mapping = {}
+        with path.open("r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    row = json.loads(line)
+                    if row.get("number") and row.get("name"):
+                        mapping[row["number"]] = row["name"]
+        return mapping
+    if fmt == "sqlite":
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            rows = conn.execute(f'SELECT number, name FROM "{SQLITE_TABLE}"')
+            return {number: name for number, name in rows if number and name}
+        finally:
+            conn.close()
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(str(path), columns=INDEX_COLUMNS)
+        pairs = zip(table.column("number").to_pylist(), table.column("name").to_pylist())
+        return {number: name for number, name in pairs if number and name}
+    raise ValueError(f"'{path.name}' is not a phone index. Use one of: {', '.join(INDEX_FORMATS)}")
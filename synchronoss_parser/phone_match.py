@@ -0,0 +1,124 @@
+"""Suffix matching of phone numbers against contacts.
+
+Exact matching misses numbers written differently in contacts and messages:
+``+44 7700 900123`` against ``07700 900123``, a number saved without its area
+code, or a carrier-shortened sender. :class:`PhoneMatcher` indexes contact
+numbers in a trie of their digits read right to left, so numbers that end the
+same way share a path. A lookup walks the query's digits from the end as far
+as the trie allows, which finds the longest common suffix in time linear in
+the length of the query, however many contacts there are.
+
+The match is accepted when that suffix is at least ``min_suffix`` digits long
+and every contact number sharing it belongs to one name. A contact number
+that matched in full (a short code, or a number saved without its area code)
+wins over longer numbers that diverge from the query. Anything else is
+reported as ambiguous, with the competing names, and left unresolved.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+
+DEFAULT_MIN_SUFFIX = 7
+# Distinct names kept per trie node; enough to tell and report ambiguity
+MAX_CANDIDATES = 5
+
+
+class _Node:
+    __slots__ = ("children", "names", "exact")
+
+    def __init__(self):
+        self.children: Dict[str, _Node] = {}
+        # Distinct names of all numbers ending with this suffix
+        self.names: Tuple[str, ...] = ()
+        # Distinct names of numbers that are exactly this suffix
+        self.exact: Tuple[str, ...] = ()
+
+
+def _add_name(names: Tuple[str, ...], name: str) -> Tuple[str, ...]:
+    if name in names or len(names) >= MAX_CANDIDATES:
+        return names
+    return names + (name,)
+
+
+@dataclass
+class PhoneMatch:
+    """Result of :meth:`PhoneMatcher.match`.
+
+    ``name`` is set for an unambiguous match. ``suffix`` is the number of
+    trailing digits shared with the matched contacts, and ``candidates``
+    lists the names (up to :data:`MAX_CANDIDATES`) that share it.
+    """
+
+    name: Optional[str]
+    suffix: int = 0
+    candidates: Tuple[str, ...] = ()
+
+    @property
+    def ambiguous(self) -> bool:
+        return self.name is None and len(self.candidates) > 1
+
+
+class PhoneMatcher:
+    """Reversed-digit trie of contact numbers mapped to names."""
+
+    def __init__(self, mapping: Mapping[str, str] = None, min_suffix: int = DEFAULT_MIN_SUFFIX):
+        self.min_suffix = min_suffix
+        self.root = _Node()
+        self._resolved: Dict[str, Optional[str]] = {}
+        if mapping:
+            self.update(mapping.items())
+
+    def add(self, number: str, name: str) -> None:
+        digits = "".join(ch for ch in str(number) if ch.isdigit())
+        if not digits or not name:
+            return
+        node = self.root
+        for digit in reversed(digits):
+            node = node.children.setdefault(digit, _Node())
+            node.names = _add_name(node.names, name)
+        node.exact = _add_name(node.exact, name)
+
+    def update(self, pairs: Iterable[Tuple[str, str]]) -> None:
+        for number, name in pairs:
+            self.add(number, name)
+
+    def match(self, number: str) -> PhoneMatch:
+        """Return the longest suffix match for ``number``."""
+        digits = "".join(ch for ch in str(number) if ch.isdigit())
+        node = self.root
+        depth = 0
+        for digit in reversed(digits):
+            child = node.children.get(digit)
+            if child is None:
+                break
+            node = child
+            depth += 1
+        if depth == 0:
+            return PhoneMatch(None)
+        # Contact numbers matched in full take precedence over longer ones
+        candidates = node.exact or node.names
+        if depth < self.min_suffix and not (node.exact and depth == len(digits)):
+            return PhoneMatch(None, depth)
+        if len(candidates) == 1:
+            return PhoneMatch(candidates[0], depth, candidates)
+        return PhoneMatch(None, depth, candidates)
+
+    def lookup(self, number: str) -> Optional[str]:
+        return self.match(number).name
+
+    def resolve(self, number: str) -> Optional[str]:
+        """Like :meth:`lookup`, but cached, logging each ambiguous number once."""
+        if number not in self._resolved:
+            match = self.match(number)
+            if match.ambiguous:
+                logging.warning(
+                    "Ambiguous contact match for %s: last %d digits shared by %s",
+                    number,
+                    match.suffix,
+                    ", ".join(match.candidates),
+                )
+            self._resolved[number] = match.name
+        return self._resolved[number]
@@ -0,0 +1,239 @@
+"""Bounded-queue pipelines with per-stage worker pools.
+
+A :class:`Pipeline` runs a serial *source* iterator in its own thread and
+passes each item through a chain of stages. Every stage has its own pool of
+worker threads, and stages are connected by bounded queues. A full queue
+blocks the stage feeding it, so a slow disk or a slow decoder holds back the
+walker instead of buffering the whole tree in memory. The number of items in
+flight is capped as a whole, so reordering cannot grow without bound either.
+
+Results are yielded in source order. Work that must stay serial (naming
+output files, appending to a manifest, writing the log) belongs in the source
+or in the consumer of :meth:`Pipeline.run`, not in a stage.
+
+Each stage records how many items it handled and how long its workers were
+busy. The time the consumer spends between results is recorded as the final
+stage, so a slow log writer shows up as well.
+
+:func:`ordered_map` is the lighter tool for a single stage that already has
+an executor, such as a process pool.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator, List, Sequence, Tuple
+
+from .profiling import span
+
+DEFAULT_QUEUE_SIZE = 32
+
+_DONE = object()
+
+StageSpec = Tuple[str, Callable[[Any], Any], int]
+
+
+class _Failed:
+    def __init__(self, exc: BaseException):
+        self.exc = exc
+
+
+@dataclass
+class StageTiming:
+    name: str
+    workers: int
+    items: int = 0
+    busy: float = 0.0
+
+
+def format_timings(timings: Sequence[StageTiming]) -> str:
+    """Return a one-line summary like ``walk 0.2s · copy 1.3s (4 workers)``."""
+    parts = []
+    for t in timings:
+        part = f"{t.name} {t.busy:.1f}s"
+        if t.workers > 1:
+            part += f" ({t.workers} workers)"
+        parts.append(part)
+    return "Stages: " + " · ".join(parts)
+
+
+def ordered_map(pool: Executor, fn: Callable[[Any], Any], items: Iterable, window: int) -> Iterator:
+    """Yield ``fn(item)`` for each of ``items`` in order, computed on ``pool``.
+
+    At most ``window`` items are in flight, so memory stays bounded however
+    long ``items`` is while the results are still consumed in order.
+    """
+    pending: deque = deque()
+    for item in items:
+        pending.append(pool.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+class Pipeline:
+    """Run items through ``stages`` of ``(name, func, workers)``.
+
+    ``source_name`` and ``sink_name`` label the time spent producing items
+    and consuming results in :attr:`timings`. A pipeline runs only once.
+    """
+
+    def __init__(
+        self,
+        stages: Sequence[StageSpec],
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        source_name: str = "source",
+        sink_name: str = "sink",
+    ):
+        self.stages = [(name, func, max(1, workers)) for name, func, workers in stages]
+        self.queue_size = queue_size
+        self.timings: List[StageTiming] = (
+            [StageTiming(source_name, 1)]
+            + [StageTiming(name, workers) for name, _, workers in self.stages]
+            + [StageTiming(sink_name, 1)]
+        )
+        self.wall = 0.0
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    # Blocking queue and semaphore operations give up once the pipeline stops
+    def _put(self, q: queue.Queue, item: Any) -> bool:
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q: queue.Queue) -> Any:
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _feed(self, items: Iterable, out: queue.Queue, slots: threading.Semaphore, consumers: int) -> None:
+        timing = self.timings[0]
+        it = iter(items)
+        seq = 0
+        try:
+            while not self._stop.is_set():
+                start = time.perf_counter()
+                failed = False
+                try:
+                    item = next(it)
+                except StopIteration:
+                    break
+                except BaseException as exc:
+                    # Queued like an item, so it holds a slot the consumer releases
+                    item, failed = _Failed(exc), True
+                finally:
+                    timing.busy += time.perf_counter() - start
+                if not failed:
+                    timing.items += 1
+                while not slots.acquire(timeout=0.1):
+                    if self._stop.is_set():
+                        return
+                if not self._put(out, (seq, item)) or failed:
+                    return
+                seq += 1
+        finally:
+            for _ in range(consumers):
+                self._put(out, _DONE)
+
+    def _work(
+        self,
+        index: int,
+        func: Callable[[Any], Any],
+        inq: queue.Queue,
+        out: queue.Queue,
+        remaining: List[int],
+        consumers: int,
+    ) -> None:
+        timing = self.timings[index + 1]
+        name = timing.name
+        while True:
+            msg = self._get(inq)
+            if msg is _DONE:
+                break
+            seq, item = msg
+            if not isinstance(item, _Failed):
+                start = time.perf_counter()
+                try:
+                    with span(name):
+                        item = func(item)
+                except BaseException as exc:
+                    item = _Failed(exc)
+                busy = time.perf_counter() - start
+                with self._lock:
+                    timing.busy += busy
+                    timing.items += 1
+            if not self._put(out, (seq, item)):
+                return
+        # The last worker of a stage to finish tells the next stage
+        with self._lock:
+            remaining[index] -= 1
+            last = remaining[index] == 0
+        if last:
+            for _ in range(consumers):
+                self._put(out, _DONE)
+
+    def run(self, items: Iterable) -> Iterator:
+        """Yield the processed ``items`` in their original order.
+
+        An exception raised by the source or a stage is re-raised here, at
+        the position of the item that failed.
+        """
+        started = time.perf_counter()
+        queues = [queue.Queue(self.queue_size) for _ in range(len(self.stages) + 1)]
+        slots = threading.BoundedSemaphore(self.queue_size * (len(self.stages) + 1))
+        remaining = [workers for _, _, workers in self.stages]
+        consumers = [workers for _, _, workers in self.stages] + [1]
+        threads = [
+            threading.Thread(target=self._feed, args=(items, queues[0], slots, consumers[0]), daemon=True)
+        ]
+        for i, (_, func, workers) in enumerate(self.stages):
+            for _ in range(workers):
+                threads.append(
+                    threading.Thread(
+                        target=self._work,
+                        args=(i, func, queues[i], queues[i + 1], remaining, consumers[i + 1]),
+                        daemon=True,
+                    )
+                )
+        for t in threads:
+            t.start()
+
+        sink = self.timings[-1]
+        pending = {}
+        next_seq = 0
+        try:
+            while True:
+                msg = self._get(queues[-1])
+                if msg is _DONE:
+                    break
+                seq, item = msg
+                pending[seq] = item
+                while next_seq in pending:
+                    item = pending.pop(next_seq)
+                    next_seq += 1
+                    slots.release()
+                    if isinstance(item, _Failed):
+                        raise item.exc
+                    start = time.perf_counter()
+                    yield item
+                    sink.busy += time.perf_counter() - start
+                    sink.items += 1
+        finally:
+            self._stop.set()
+            for t in threads:
+                t.join()
+            self.wall = time.perf_counter() - started
@@ -0,0 +1,287 @@
+"""Per-stage timing instrumentation for the command line tools.
+
+Code marks interesting stages with :func:`span` (a context manager) or the
+:func:`timed` decorator and bumps counters with :func:`count`. Nothing is
+recorded unless a :class:`Profiler` is active: the helpers then return a
+shared no-op object, so instrumentation stays in place at negligible cost.
+
+The CLIs enable profiling through :func:`add_profile_arguments` and
+:func:`profile_from_args`:
+
+* ``--profile`` prints a per-stage breakdown (wall time, calls, bytes and,
+  with ``--profile-memory``, peak traced memory) when the run ends.
+* ``--profile-out run.prof`` also dumps :mod:`cProfile` stats;
+  ``--profile-out run.json`` writes a Chrome trace of the spans that
+  Perfetto, ``chrome://tracing`` or speedscope display as a flame graph.
+
+Span times are inclusive: a stage nested inside another is counted in both.
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, TextIO
+
+try:  # pragma: no cover - not available on Windows
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None
+
+MAX_TRACE_EVENTS = 1_000_000
+
+
+@dataclass
+class StageStats:
+    calls: int = 0
+    wall: float = 0.0
+    bytes: int = 0
+    peak_memory: int = 0
+
+
+class _NullSpan:
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+    def add_bytes(self, n: int) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    def __init__(self, profiler: "Profiler", name: str, nbytes: int):
+        self.profiler = profiler
+        self.name = name
+        self.nbytes = nbytes
+
+    def add_bytes(self, n: int) -> None:
+        self.nbytes += n
+
+    def __enter__(self) -> "_Span":
+        if self.profiler.memory:
+            self.profiler._memory_enter()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        end = time.perf_counter()
+        peak = self.profiler._memory_exit() if self.profiler.memory else 0
+        self.profiler._record(self.name, self.start, end, self.nbytes, peak)
+
+
+class Profiler:
+    """Collects span timings, byte counts, counters and optional trace events."""
+
+    def __init__(self, trace: bool = False, memory: bool = False):
+        self.trace = trace
+        self.memory = memory
+        self.stages: Dict[str, StageStats] = {}
+        self.counters: Counter = Counter()
+        self.events: List[dict] = []
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def span(self, name: str, nbytes: int = 0) -> _Span:
+        return _Span(self, name, nbytes)
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += n
+
+    # tracemalloc has one global peak, so nested spans save the running
+    # peak of their parent before resetting it and hand their own peak back
+    # on exit.
+    def _memory_enter(self) -> None:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        peak = tracemalloc.get_traced_memory()[1]
+        if stack:
+            stack[-1] = max(stack[-1], peak)
+        tracemalloc.reset_peak()
+        stack.append(0)
+
+    def _memory_exit(self) -> int:
+        stack = self._local.stack
+        peak = max(stack.pop(), tracemalloc.get_traced_memory()[1])
+        if stack:
+            stack[-1] = max(stack[-1], peak)
+        tracemalloc.reset_peak()
+        return peak
+
+    def _record(self, name: str, start: float, end: float, nbytes: int, peak: int) -> None:
+        with self._lock:
+            stats = self.stages.get(name)
+            if stats is None:
+                stats = self.stages[name] = StageStats()
+            stats.calls += 1
+            stats.wall += end - start
+            stats.bytes += nbytes
+            stats.peak_memory = max(stats.peak_memory, peak)
+            if self.trace and len(self.events) < MAX_TRACE_EVENTS:
+                event = {
+                    "name": name,
+                    "ph": "X",
+                    "ts": (start - self.started) * 1e6,
+                    "dur": (end - start) * 1e6,
+                    "pid": os.getpid(),
+                    "tid": threading.get_ident(),
+                }
+                if nbytes:
+                    event["args"] = {"bytes": nbytes}
+                self.events.append(event)
+
+    def report(self) -> str:
+        """Return the per-stage breakdown as a text table."""
+        total = time.perf_counter() - self.started
+        lines = [f"{'Stage':<28}{'Calls':>9}{'Wall s':>10}{'Avg ms':>10}{'MB':>10}"
+                 + (f"{'Peak MB':>10}" if self.memory else "")]
+        for name, st in sorted(self.stages.items(), key=lambda kv: kv[1].wall, reverse=True):
+            avg = st.wall / st.calls * 1000 if st.calls else 0.0
+            line = f"{name:<28}{st.calls:>9}{st.wall:>10.3f}{avg:>10.2f}{st.bytes / 1e6:>10.1f}"
+            if self.memory:
+                line += f"{st.peak_memory / 1e6:>10.1f}"
+            lines.append(line)
+        for name, n in sorted(self.counters.items()):
+            lines.append(f"{name:<28}{n:>9}")
+        summary = f"Total wall time: {total:.3f} s"
+        rss = peak_rss()
+        if rss:
+            summary += f", peak RSS: {rss / 1e6:.1f} MB"
+        lines.append(summary)
+        return "\n".join(lines)
+
+    def write_trace(self, path: Path) -> None:
+        """Write recorded spans in Chrome trace-event JSON format."""
+        with Path(path).open("w", encoding="utf-8") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+
+
+def peak_rss() -> Optional[int]:
+    """Return the process peak resident set size in bytes, if known."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+_profiler: Optional[Profiler] = None
+
+
+def active_profiler() -> Optional[Profiler]:
+    return _profiler
+
+
+def span(name: str, nbytes: int = 0):
+    """Time the enclosed block as stage ``name`` (no-op when not profiling)."""
+    profiler = _profiler
+    if profiler is None:
+        return _NULL_SPAN
+    return profiler.span(name, nbytes)
+
+
+def count(name: str, n: int = 1) -> None:
+    """Increment counter ``name`` (no-op when not profiling)."""
+    profiler = _profiler
+    if profiler is not None:
+        profiler.count(name, n)
+
+
+def timed(name: str) -> Callable:
+    """Decorator timing every call of the wrapped function as stage ``name``."""
+
+    def decorate(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = _profiler
+            if profiler is None:
+                return func(*args, **kwargs)
+            with profiler.span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+@contextmanager
+def profiling(
+    enabled: bool = True,
+    out: Optional[str | Path] = None,
+    memory: bool = False,
+    stream: Optional[TextIO] = None,
+) -> Iterator[Optional[Profiler]]:
+    """Activate a :class:`Profiler` for the enclosed block and report on exit.
+
+    ``out`` ending in ``.json`` receives a Chrome trace; any other name
+    receives :mod:`cProfile` stats.
+    """
+    global _profiler
+    if not enabled:
+        yield None
+        return
+    out_path = Path(out) if out else None
+    trace = out_path is not None and out_path.suffix.lower() == ".json"
+    profiler = Profiler(trace=trace, memory=memory)
+    cprof = None
+    if out_path is not None and not trace:
+        import cProfile
+
+        cprof = cProfile.Profile()
+    if memory:
+        tracemalloc.start()
+    previous, _profiler = _profiler, profiler
+    if cprof is not None:
+        cprof.enable()
+    try:
+        yield profiler
+    finally:
+        if cprof is not None:
+            cprof.disable()
+        _profiler = previous
+        if memory:
+            tracemalloc.stop()
+        stream = stream or sys.stderr
+        stream.write(profiler.report() + "\n")
+        if trace:
+            profiler.write_trace(out_path)
+            stream.write(f"Wrote trace to '{out_path}'.\n")
+        elif cprof is not None:
+            cprof.dump_stats(str(out_path))
+            stream.write(f"Wrote cProfile stats to '{out_path}'.\n")
+
+
+def add_profile_arguments(ap: argparse.ArgumentParser) -> None:
+    """Add ``--profile``, ``--profile-memory`` and ``--profile-out`` to ``ap``."""
+    ap.add_argument("--profile", action="store_true", help="Print a per-stage timing breakdown when done")
+    ap.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="With --profile, also track peak memory per stage (slower)",
+    )
+    ap.add_argument(
+        "--profile-out",
+        help="Write cProfile stats (e.g. run.prof) or a JSON trace (run.json); implies --profile",
+    )
+
+
+def profile_from_args(args: argparse.Namespace):
+    """Return the :func:`profiling` context configured by the CLI flags."""
+    enabled = bool(args.profile or args.profile_out or args.profile_memory)
+    return profiling(enabled, args.profile_out, args.profile_memory)
@@ -0,0 +1,177 @@
+"""Progress reporting for long-running operations.
+
+Operations accept an optional ``progress`` callback receiving
+:class:`ProgressEvent` objects: one when the total is known after the
+pre-scan, throttled updates while items complete and a final event with
+``finished=True``. When no callback is given the :class:`Progress` tracker
+returns immediately from every call, so reporting costs nothing.
+
+:class:`ConsoleProgress` renders events as a single updating line for the
+command line tools and :func:`tk_progress_callback` drives a
+``ttk.Progressbar`` from a worker thread.
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional, TextIO
+
+
+@dataclass
+class ProgressEvent:
+    stage: str
+    done: int
+    total: Optional[int]
+    bytes_done: int
+    elapsed: float
+    files_per_sec: float
+    mb_per_sec: float
+    eta: Optional[float]
+    finished: bool = False
+
+    @property
+    def fraction(self) -> Optional[float]:
+        if not self.total:
+            return None
+        return min(self.done / self.total, 1.0)
+
+
+ProgressCallback = Callable[[ProgressEvent], None]
+
+
+class Progress:
+    """Throttled progress tracker feeding an optional callback.
+
+    ``interval`` is the minimum number of seconds between update events;
+    the start and finish events are always delivered.
+    """
+
+    def __init__(self, callback: Optional[ProgressCallback] = None, stage: str = "", interval: float = 0.2):
+        self.callback = callback
+        self.stage = stage
+        self.interval = interval
+        self.total: Optional[int] = None
+        self.done = 0
+        self.bytes_done = 0
+        self._started = 0.0
+        self._last = 0.0
+
+    @property
+    def active(self) -> bool:
+        return self.callback is not None
+
+    def start(self, total: Optional[int] = None, stage: Optional[str] = None) -> None:
+        """Begin a stage whose item count is ``total`` (``None`` if unknown)."""
+        if self.callback is None:
+            return
+        if stage is not None:
+            self.stage = stage
+        self.total = total
+        self.done = 0
+        self.bytes_done = 0
+        self._started = time.monotonic()
+        self._emit(self._started)
+
+    def advance(self, n: int = 1, nbytes: int = 0) -> None:
+        """Record ``n`` completed items totalling ``nbytes`` bytes."""
+        if self.callback is None:
+            return
+        self.done += n
+        self.bytes_done += nbytes
+        now = time.monotonic()
+        if now - self._last >= self.interval:
+            self._emit(now)
+
+    def finish(self) -> None:
+        if self.callback is None:
+            return
+        self._emit(time.monotonic(), finished=True)
+
+    def _emit(self, now: float, finished: bool = False) -> None:
+        self._last = now
+        elapsed = max(now - self._started, 0.0)
+        fps = self.done / elapsed if elapsed > 0 else 0.0
+        mbps = self.bytes_done / elapsed / 1e6 if elapsed > 0 else 0.0
+        eta = None
+        if self.total is not None and fps > 0:
+            eta = max(self.total - self.done, 0) / fps
+        self.callback(
+            ProgressEvent(
+                self.stage, self.done, self.total, self.bytes_done, elapsed, fps, mbps, eta, finished
+            )
+        )
+
+
+def _format_seconds(seconds: float) -> str:
+    seconds = int(round(seconds))
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    return f"{h}:{m:02d}:{s:02d}"
+
+
+def format_progress(event: ProgressEvent) -> str:
+    """Return a compact one-line description of ``event``."""
+    parts = []
+    if event.total is not None:
+        pct = (event.fraction or 0.0) * 100
+        parts.append(f"{event.done}/{event.total} ({pct:.0f}%)")
+    else:
+        parts.append(str(event.done))
+    parts.append(f"{event.files_per_sec:.1f} files/s")
+    if event.bytes_done:
+        parts.append(f"{event.mb_per_sec:.1f} MB/s")
+    if event.finished:
+        parts.append(f"done in {_format_seconds(event.elapsed)}")
+    elif event.eta is not None:
+        parts.append(f"ETA {_format_seconds(event.eta)}")
+    prefix = f"{event.stage}: " if event.stage else ""
+    return prefix + " · ".join(parts)
+
+
+class ConsoleProgress:
+    """Callback rendering events as a single, rewritten terminal line."""
+
+    def __init__(self, stream: Optional[TextIO] = None):
+        self.stream = stream or sys.stderr
+        self._width = 0
+
+    def __call__(self, event: ProgressEvent) -> None:
+        line = format_progress(event)
+        pad = max(self._width - len(line), 0)
+        self._width = len(line)
+        self.stream.write("\r" + line + " " * pad)
+        if event.finished:
+            self.stream.write("\n")
+            self._width = 0
+        self.stream.flush()
+
+
+def console_progress() -> Optional[ConsoleProgress]:
+    """Return a :class:`ConsoleProgress` when stderr is a terminal."""
+    if sys.stderr.isatty():
+        return ConsoleProgress()
+    return None
+
+
+def tk_progress_callback(widget, bar, status_var) -> ProgressCallback:
+    """Return a callback updating a ``ttk.Progressbar`` and status variable.
+
+    Safe to call from a worker thread: updates are scheduled on the Tk
+    event loop with ``widget.after``. The bar switches from indeterminate
+    to determinate mode once a total is known.
+    """
+
+    def apply(event: ProgressEvent) -> None:
+        if event.total:
+            if str(bar.cget("mode")) != "determinate":
+                bar.stop()
+                bar.configure(mode="determinate")
+            bar.configure(maximum=event.total, value=event.done)
+        status_var.set(format_progress(event))
+
+    def callback(event: ProgressEvent) -> None:
+        widget.after(0, lambda: apply(event))
+
+    return callback
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""Reconcile message CSV attachment references against the attachment tree.
+
+Every attachment named in a message CSV is joined against the files under
+``messages/attachments/<type>/<direction>/<day>/`` in one pass. The join uses
+in-memory sets keyed on ``(type, direction, day, filename)``, and the walk
+uses directory-entry types only, so no file is stat'ed or opened. The result
+lists:
+
+* **missing** – references with no file on disk
+* **orphaned** – files no message references
+* **multiply referenced** – files referenced by more than one message
+
+Files stored without the dated subfolder (``attachments/<type>/<direction>/
+<file>``) satisfy a reference from any day, matching what
+``render_transcripts`` links to.
+
+Usage:
+    reconcile-attachments [--messages DIR] [--out DIR] [--log-format FMT]
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import os
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .collect_attachments import AttachmentKey, attachment_key
+from .log_sinks import LOG_FORMATS, open_sink
+from .profiling import add_profile_arguments, profile_from_args, span
+from .render_transcripts import (
+    PLACEHOLDER_ATTACHMENTS,
+    derive_attachment_day_from_csv_name,
+    split_attachments,
+)
+from .walker import scan_files
+
+MISSING_COLUMNS = ["Type", "Direction", "Day", "File Name", "References", "CSV", "Message ID"]
+ORPHANED_COLUMNS = ["Path"]
+MULTIPLE_COLUMNS = ["Path", "References"]
+
+
+@dataclass
+class Reconciliation:
+    references: int = 0
+    files: int = 0
+    # key -> (reference count, first CSV name, first message ID)
+    missing: Dict[AttachmentKey, Tuple[int, str, str]] = field(default_factory=dict)
+    orphaned: List[str] = field(default_factory=list)
+    multiple: List[Tuple[str, int]] = field(default_factory=list)
+
+    def summary(self) -> str:
+        return (
+            f"{self.references} references, {self.files} files: {len(self.missing)} missing, "
+            f"{len(self.orphaned)} orphaned, {len(self.multiple)} referenced more than once."
+        )
+
+
+def _field(row: List[str], i: Optional[int]) -> str:
+    return row[i] if i is not None and i < len(row) else ""
+
+
+def _read_references(messages_root: Path):
+    """Return reference counts and the first referencing message per key."""
+    counts: Counter = Counter()
+    first: Dict[AttachmentKey, Tuple[str, str]] = {}
+    for csv_file in sorted(messages_root.glob("*.csv")):
+        day = derive_attachment_day_from_csv_name(csv_file) or ""
+        with span("csv_parse", csv_file.stat().st_size), csv_file.open("r", encoding="utf-8", newline="") as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if not header:
+                continue
+            col = {name: i for i, name in enumerate(header)}
+            i_att = col.get("Attachments")
+            if i_att is None:
+                continue
+            i_type, i_dir, i_id = col.get("Type"), col.get("Direction"), col.get("Message ID")
+
+            for row in reader:
+                # Short rows still count; only the attachment column is required
+                if i_att >= len(row) or not row[i_att]:
+                    continue
+                msg_type = _field(row, i_type).strip()
+                direction = _field(row, i_dir).strip()
+                for fname in split_attachments(row[i_att]):
+                    if fname.lower() in PLACEHOLDER_ATTACHMENTS:
+                        continue
+                    key = attachment_key(msg_type, direction, day, fname)
+                    counts[key] += 1
+                    if key not in first:
+                        first[key] = (csv_file.name, _field(row, i_id))
+    return counts, first
+
+
+def _walk_tree(attachments_root: Path):
+    """Return dated and undated file keys mapped to their relative paths,
+    plus files at any other depth (which no message can reference)."""
+    dated: Dict[AttachmentKey, str] = {}
+    undated: Dict[Tuple[str, str, str], str] = {}
+    other: List[str] = []
+    root = os.fspath(attachments_root)
+    with span("walk"):
+        for entry in scan_files(root):
+            parts = os.path.relpath(entry.path, root).split(os.sep)
+            rel = "/".join(parts)
+            if len(parts) == 4:
+                dated[attachment_key(*parts)] = rel
+            elif len(parts) == 3:
+                msg_type, direction, _, name = attachment_key(parts[0], parts[1], "", parts[2])
+                undated[(msg_type, direction, name)] = rel
+            else:
+                other.append(rel)
+    return dated, undated, other
+
+
+def reconcile(messages_root: Path, attachments_root: Optional[Path] = None) -> Reconciliation:
+    """Join the CSV references below ``messages_root`` against its attachments."""
+    attachments_root = attachments_root or messages_root / "attachments"
+    counts, first = _read_references(messages_root)
+    dated, undated, other = _walk_tree(attachments_root)
+
+    result = Reconciliation(
+        references=sum(counts.values()), files=len(dated) + len(undated) + len(other)
+    )
+    # Reference counts per file, dated keys first and the undated fallback after
+    hits: Counter = Counter()
+    with span("join"):
+        for key, n in counts.items():
+            rel = dated.get(key)
+            if rel is None:
+                rel = undated.get((key[0], key[1], key[3]))
+            if rel is None:
+                result.missing[key] = (n,) + first[key]
+            else:
+                hits[rel] += n
+        result.orphaned.extend(other)
+        for rel in list(dated.values()) + list(undated.values()):
+            n = hits.get(rel, 0)
+            if n == 0:
+                result.orphaned.append(rel)
+            elif n > 1:
+                result.multiple.append((rel, n))
+    result.orphaned.sort()
+    result.multiple.sort()
+    return result
+
+
+def write_report(result: Reconciliation, out_dir: Path, log_format: Optional[str] = "csv") -> List[Path]:
+    """Write the missing, orphaned and multiply referenced lists to ``out_dir``."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    written = []
+    with open_sink(out_dir / "missing.csv", MISSING_COLUMNS, log_format, title="Missing") as sink:
+        for (t, d, day, name), (n, csv_name, message_id) in sorted(result.missing.items()):
+            sink.write(dict(zip(MISSING_COLUMNS, (t, d, day, name, n, csv_name, message_id))))
+    written.append(sink.path)
+    with open_sink(out_dir / "orphaned.csv", ORPHANED_COLUMNS, log_format, title="Orphaned") as sink:
+        sink.write_many({"Path": rel} for rel in result.orphaned)
+    written.append(sink.path)
+    with open_sink(out_dir / "multiply_referenced.csv", MULTIPLE_COLUMNS, log_format, title="Multiple") as sink:
+        sink.write_many({"Path": rel, "References": n} for rel, n in result.multiple)
+    written.append(sink.path)
+    return written
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Reconcile message attachment references against files on disk.")
+    ap.add_argument("--messages", default="messages", help="Folder containing message CSVs and attachments/")
+    ap.add_argument("--out", default="Attachment Reconciliation", help="Output folder")
+    ap.add_argument("--log-format", choices=LOG_FORMATS, default="csv", help="Format of the lists (default: csv)")
+    add_profile_arguments(ap)
+    args = ap.parse_args(argv)
+
+    messages_root = Path(args.messages)
+    if not messages_root.exists():
+        raise SystemExit(f"Messages folder '{messages_root}' not found.")
+    with profile_from_args(args):
+        result = reconcile(messages_root)
+        paths = write_report(result, Path(args.out), args.log_format)
+    print(result.summary())
+    for path in paths:
+        print(f"Wrote '{path}'.")
+
+
+if __name__ == "__main__":
+    main()
@@ -54,6 +54,11 @@ from typing import Callable, Dict, List, Optional, Tuple
 
 import pandas as pd
 
+from .phone_index import is_phone_index, read_phone_index
+from .phone_match import DEFAULT_MIN_SUFFIX, PhoneMatcher
+from .profiling import active_profiler, add_profile_arguments, profile_from_args, span, timed
+from .progress import Progress, ProgressCallback, console_progress
+
 
 # ------------------------- Config & Utilities -------------------------
 
@@ -62,6 +67,9 @@ VIDEO_EXTS = {".mp4", ".webm", ".ogg", ".mov", ".m4v"}
 AUDIO_EXTS = {".mp3", ".wav", ".m4a", ".aac", ".flac", ".ogg"}
 INLINE_TEXT_EXTS = {".vcard", ".vcf"}  # small text-like files we might show inline
 
+# Attachment names some exports write when a message has no real attachment
+PLACEHOLDER_ATTACHMENTS = {"null", "null.txt", "none", "(null)", "aaaa"}
+
 CSV_DATE_FROM_FILENAME_FMT = "%Y%m%d"
 ATTACHMENT_FOLDER_DATE_FMT = "%Y-%m-%d"
 
@@ -272,13 +280,29 @@ def normalize_phone_number(number: str) -> str:
     return digits
 
 
-def build_contact_lookup(xlsx_path: Optional[str]) -> Callable[[str], str]:
-    """Return a lookup function mapping phone numbers to contact names."""
+def normalize_phone_series(numbers: pd.Series) -> pd.Series:
+    """Apply :func:`normalize_phone_number` to a whole column at once."""
+    digits = numbers.fillna("").astype(str).str.replace(r"\D", "", regex=True)
+    us = (digits.str.len() == 11) & digits.str.startswith("1")
+    return digits.where(~us, digits.str[1:])
+
+
+def load_contact_mapping(path: Optional[str]) -> Dict[str, str]:
+    """Return ``{normalized number: name}`` from a contacts workbook or phone index.
+
+    Phone index files (see :mod:`synchronoss_parser.phone_index`) are read
+    directly; anything else is read as the workbook written by
+    ``contacts-to-excel``. Unreadable files give an empty mapping.
+    """
     mapping: Dict[str, str] = {}
-    if xlsx_path:
-        try:
-            df = pd.read_excel(xlsx_path)
-            for _, row in df.iterrows():
+    if not path:
+        return mapping
+    try:
+        with span("contacts_load"):
+            if is_phone_index(path):
+                return read_phone_index(path)
+            df = pd.read_excel(path)
+            for row in df.astype(object).where(df.notna(), None).to_dict("records"):
                 first = str(row.get("firstname") or "").strip()
                 last = str(row.get("lastname") or "").strip()
                 numbers = str(row.get("phone_numbers") or "").split(";")
@@ -289,13 +313,32 @@ def build_contact_lookup(xlsx_path: Optional[str]) -> Callable[[str], str]:
                     digits = normalize_phone_number(num)
                     if digits:
                         mapping[digits] = name
-        except Exception:
-            pass
+    except Exception:
+        pass
+    return mapping
+
+
+def build_contact_lookup(xlsx_path: Optional[str], min_suffix: Optional[int] = None) -> Callable[[str], str]:
+    """Return a lookup function mapping phone numbers to contact names.
+
+    ``xlsx_path`` is a contacts workbook or a phone index file. Numbers are
+    matched on their normalized digits. With ``min_suffix`` set, numbers
+    without an exact match fall back to the longest shared suffix of at least
+    that many digits (see :class:`~synchronoss_parser.phone_match.PhoneMatcher`);
+    ambiguous suffixes are logged once per number and left unresolved.
+    """
+    mapping = load_contact_mapping(xlsx_path)
+    matcher = PhoneMatcher(mapping, min_suffix) if min_suffix and mapping else None
 
     def lookup(number: str) -> str:
         digits = normalize_phone_number(number)
-        return mapping.get(digits, number)
+        name = mapping.get(digits)
+        if name is None and matcher is not None and digits:
+            name = matcher.resolve(digits)
+        return number if name is None else name
 
+    if active_profiler() is not None:
+        lookup = timed("contact_lookup")(lookup)
     return lookup
 
 
@@ -313,7 +356,7 @@ def relpath_for_html(from_file: Path, to_target: Path) -> str:
 def load_messages_from_csv(csv_file: Path, contact_lookup: Callable[[str], str] = lambda x: x) -> List[Message]:
     msgs: List[Message] = []
     day_folder = derive_attachment_day_from_csv_name(csv_file)
-    with csv_file.open("r", encoding="utf-8", newline="") as f:
+    with span("csv_parse", csv_file.stat().st_size), csv_file.open("r", encoding="utf-8", newline="") as f:
         reader = csv.DictReader(f)
         for row in reader:
             date_raw = (row.get("Date") or "").strip()
@@ -389,6 +432,7 @@ def group_messages_by_chat(messages: List[Message], target: str) -> Dict[Tuple[s
 
 # ------------------------- HTML Rendering -------------------------
 
+@timed("render_thread_html")
 def render_thread_html(
     messages_root: Path,
     out_file: Path,
@@ -462,7 +506,7 @@ def render_thread_html(
         attachment_snippets: List[str] = []
         if m.attachments:
             for fname in m.attachments:
-                if not fname or fname.lower() in {"null", "null.txt", "none", "(null)", "aaaa"}:
+                if not fname or fname.lower() in PLACEHOLDER_ATTACHMENTS:
                     continue
                 if not m.attachment_day:
                     continue
@@ -587,7 +631,7 @@ def write_index(out_dir: Path, entries: List[Tuple[str, str, int, int]]):
 
 # ------------------------- Main -------------------------
 
-def main():
+def main(argv: Optional[List[str]] = None, progress: Optional[ProgressCallback] = None):
     ap = argparse.ArgumentParser(description="Render chat transcripts from CSVs into HTML.")
     ap.add_argument("--in", dest="in_dir", required=True, help="Input root folder (expects CSVs inside, plus attachments/...) e.g. messages")
     ap.add_argument("--out", dest="out_dir", required=True, help="Output folder for HTML transcripts, e.g. transcripts")
@@ -596,12 +640,29 @@ def main():
         "--contacts-xlsx",
         dest="contacts_xlsx",
         default="",
-        help="Path to Excel file mapping phone numbers to contacts",
+        help="Path to Excel file or phone index mapping phone numbers to contacts",
+    )
+    ap.add_argument(
+        "--match-suffix",
+        type=int,
+        nargs="?",
+        const=DEFAULT_MIN_SUFFIX,
+        metavar="DIGITS",
+        help=f"Also match contacts on the last DIGITS digits when there is no exact match (default: {DEFAULT_MIN_SUFFIX})",
     )
-    args = ap.parse_args()
+    add_profile_arguments(ap)
+    args = ap.parse_args(argv)
+    if progress is None:
+        progress = console_progress()
+    with profile_from_args(args):
+        _render(args, progress)
+
+
+def _render(args: argparse.Namespace, progress: Optional[ProgressCallback]) -> None:
+    tracker = Progress(progress)
 
     target = args.target_number
-    lookup = build_contact_lookup(args.contacts_xlsx)
+    lookup = build_contact_lookup(args.contacts_xlsx, args.match_suffix)
 
     messages_root = Path(args.in_dir).resolve()
     out_root = Path(args.out_dir).resolve()
@@ -615,6 +676,7 @@ def main():
     all_msgs: List[Message] = []
     call_records: List[Message] = []
 
+    tracker.start(len(csv_files), "Reading CSVs")
     for csv_file in csv_files:
         msgs = load_messages_from_csv(csv_file, lookup)
         for m in msgs:
@@ -626,10 +688,14 @@ def main():
                 call_records.append(m)
             else:
                 all_msgs.append(m)
+        if tracker.active:
+            tracker.advance(1, csv_file.stat().st_size)
+    tracker.finish()
 
     grouped = group_messages_by_chat(all_msgs, target)
 
     index_entries: List[Tuple[str, str, int, int]] = []
+    tracker.start(len(grouped), "Rendering chats")
     for participants, msgs in grouped.items():
         title = f"Chat – {', '.join(participants)}"
         key = sanitize_participants(participants)
@@ -639,7 +705,10 @@ def main():
         )
         rel = os.path.relpath(out_file, start=out_root).replace(os.sep, "/")
         index_entries.append((title, rel, total, with_attachments))
-        print(f"Rendered chat {', '.join(participants)}: {total} messages ({with_attachments} with attachments)")
+        if not tracker.active:
+            print(f"Rendered chat {', '.join(participants)}: {total} messages ({with_attachments} with attachments)")
+        tracker.advance()
+    tracker.finish()
 
     write_index(out_root, index_entries)
 
@@ -655,7 +724,8 @@ def main():
         else:
             date_str = m.date_raw
         ws.append([date_str, m.direction, m.sender, m.recipients, m.message_id])
-    wb.save(call_log_path)
+    with span("log_save"):
+        wb.save(call_log_path)
 
     print(f"\nDone. Open: {out_root / 'index.html'}")
 
@@ -0,0 +1,166 @@
+"""Pack thumbnails into sprite sheets with a JSON offset map.
+
+Hundreds of thousands of tiny thumbnail files are slow to create, copy and
+sync, and a page showing them makes one request per image. :class:`SpriteSheets`
+packs up to :data:`PER_SHEET` thumbnails into each sheet image, left to right
+and top to bottom in cells of the thumbnail size. ``sprites.json`` records
+the sheet and pixel offset of every thumbnail, so pages can show it as a CSS
+background with an offset.
+
+Packing is incremental. Thumbnails keep their cell between runs, and new ones
+fill the free cells after the last one used, so only the sheets that gain
+thumbnails are rewritten. A thumbnail in the map no longer needs its own file.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from PIL import Image
+
+from .profiling import span
+
+PER_SHEET = 256
+MAP_NAME = "sprites.json"
+MAP_VERSION = 1
+
+# Sheet format per thumbnail format; lossless unless the thumbnails are lossy anyway
+SHEET_FORMATS = {"jpeg": ("JPEG", ".jpg"), "webp": ("WEBP", ".webp")}
+DEFAULT_SHEET_FORMAT = ("PNG", ".png")
+
+# (sheet file name, x, y, width, height)
+SpriteRef = Tuple[str, int, int, int, int]
+
+
+class SpriteSheets:
+    """Sprite sheets of ``size`` cells stored in ``sprite_dir``.
+
+    ``fmt`` is the thumbnail format (see
+    :data:`~synchronoss_parser.thumbnails.THUMBNAIL_FORMATS`) and picks the
+    sheet format; ``quality`` applies to lossy sheets.
+    """
+
+    def __init__(
+        self,
+        sprite_dir: Path,
+        size: Tuple[int, int],
+        fmt: str = "source",
+        quality: Optional[int] = None,
+        per_sheet: int = PER_SHEET,
+    ):
+        self.sprite_dir = Path(sprite_dir)
+        self.size = tuple(size)
+        self.per_sheet = per_sheet
+        self.columns = max(1, int(per_sheet**0.5))
+        self.pil_format, self.ext = SHEET_FORMATS.get(fmt, DEFAULT_SHEET_FORMAT)
+        self.quality = quality
+        self.map_path = self.sprite_dir / MAP_NAME
+        # thumbnail name -> [slot, width, height]
+        self.cells: Dict[str, List[int]] = {}
+        self._next_slot = 0
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.map_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        layout = [list(self.size), self.per_sheet, self.pil_format]
+        if data.get("version") != MAP_VERSION or data.get("layout") != layout:
+            return
+        self.cells = data.get("cells", {})
+        self._next_slot = max((c[0] for c in self.cells.values()), default=-1) + 1
+
+    def save(self) -> None:
+        """Write the offset map; call once after packing."""
+        self.sprite_dir.mkdir(parents=True, exist_ok=True)
+        data = {
+            "version": MAP_VERSION,
+            "layout": [list(self.size), self.per_sheet, self.pil_format],
+            "sheets": [self.sheet_name(i) for i in range(self._sheet_count())],
+            "cells": self.cells,
+        }
+        tmp = self.map_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data), encoding="utf-8")
+        os.replace(tmp, self.map_path)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.cells
+
+    def _sheet_count(self) -> int:
+        return -(-self._next_slot // self.per_sheet)
+
+    def sheet_name(self, sheet: int) -> str:
+        return f"sheet-{sheet:05d}{self.ext}"
+
+    def _offset(self, slot: int) -> Tuple[int, int, int]:
+        sheet, index = divmod(slot, self.per_sheet)
+        row, col = divmod(index, self.columns)
+        return sheet, col * self.size[0], row * self.size[1]
+
+    def ref(self, name: str) -> Optional[SpriteRef]:
+        """Return the sheet and offset of thumbnail ``name``, or ``None``."""
+        cell = self.cells.get(name)
+        if cell is None:
+            return None
+        slot, w, h = cell
+        sheet, x, y = self._offset(slot)
+        return self.sheet_name(sheet), x, y, w, h
+
+    def pack(self, thumbs: Iterable[Path], remove: bool = True) -> int:
+        """Add the ``thumbs`` that are not packed yet; return how many were added.
+
+        Packed thumbnail files are deleted when ``remove`` is true.
+        """
+        new: Dict[int, List[Tuple[int, Path]]] = {}
+        for thumb in thumbs:
+            if thumb.name in self.cells:
+                continue
+            slot = self._next_slot
+            self._next_slot += 1
+            self.cells[thumb.name] = [slot, 0, 0]
+            new.setdefault(slot // self.per_sheet, []).append((slot, thumb))
+
+        self.sprite_dir.mkdir(parents=True, exist_ok=True)
+        for sheet, members in new.items():
+            with span("pack_sprites"):
+                self._paste(sheet, members)
+        if remove:
+            for members in new.values():
+                for _, thumb in members:
+                    if thumb.name in self.cells:
+                        thumb.unlink(missing_ok=True)
+        return sum(1 for m in new.values() for _, thumb in m if thumb.name in self.cells)
+
+    def _paste(self, sheet: int, members: List[Tuple[int, Path]]) -> None:
+        w, h = self.size
+        last_slot = min((sheet + 1) * self.per_sheet, self._next_slot) - 1
+        rows = (last_slot % self.per_sheet) // self.columns + 1
+        mode = "RGB" if self.pil_format == "JPEG" else "RGBA"
+        background = "white" if mode == "RGB" else (0, 0, 0, 0)
+        canvas = Image.new(mode, (self.columns * w, rows * h), background)
+        path = self.sprite_dir / self.sheet_name(sheet)
+        try:
+            with Image.open(path) as old:
+                canvas.paste(old.convert(mode), (0, 0))
+        except OSError:
+            pass
+        for slot, thumb in members:
+            _, x, y = self._offset(slot)
+            try:
+                with Image.open(thumb) as img:
+                    img = img.convert(mode)
+            except OSError:
+                logging.warning("Failed to pack thumbnail %s", thumb)
+                del self.cells[thumb.name]
+                continue
+            canvas.paste(img, (x, y))
+            self.cells[thumb.name][1:] = list(img.size)
+        params = {"quality": self.quality} if self.quality is not None and self.pil_format != "PNG" else {}
+        tmp = path.with_name(path.name + ".tmp")
+        canvas.save(tmp, self.pil_format, **params)
+        os.replace(tmp, path)
@@ -0,0 +1,239 @@
+"""Thumbnail rendering and a persistent, content-keyed thumbnail cache.
+
+Thumbnails are rendered with JPEG draft decoding, on a process pool when
+more than one worker is requested, in the source format or as JPEG, PNG or
+WebP.
+
+:class:`ThumbnailCache` stores thumbnails as ``<digest>_<w>x<h><ext>`` in a
+single folder, so identical images found under different paths share one
+file. ``cache_index.json`` next to them remembers the size, modification
+time and digest of every source seen before. On re-runs an unchanged source
+costs one ``stat``: it is neither hashed nor decoded. Only sources Pillow
+can open are hashed; others (videos, documents) are recognised from their
+header and remembered without a digest. Images that could not be rendered
+are remembered as well, so neither is retried until it changes.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Container, Dict, Iterable, Optional, Tuple
+
+from PIL import Image
+
+from .hashing import hash_file
+from .profiling import timed
+
+DEFAULT_SIZE = (128, 128)
+INDEX_NAME = "cache_index.json"
+INDEX_VERSION = 1
+
+# Thumbnail formats; "source" keeps the format of each source image
+THUMBNAIL_FORMATS = ("source", "jpeg", "png", "webp")
+FORMAT_EXTENSIONS = {"jpeg": ".jpg", "png": ".png", "webp": ".webp"}
+PIL_FORMATS = {"jpeg": "JPEG", "png": "PNG", "webp": "WEBP"}
+LOSSY_FORMATS = {"JPEG", "WEBP"}
+
+
+@timed("create_thumbnail")
+def create_thumbnail(
+    src: Path,
+    dest: Path,
+    size: Tuple[int, int] = DEFAULT_SIZE,
+    fmt: Optional[str] = None,
+    quality: Optional[int] = None,
+) -> bool:
+    """Create a thumbnail image.
+
+    JPEGs are decoded at the smallest DCT scale (1/2 to 1/8) that still
+    covers ``size``, so a 12-megapixel photo never decodes at full size.
+    ``fmt`` is a Pillow format name (``"WEBP"``, ``"JPEG"``...) and defaults
+    to the one implied by ``dest``; ``quality`` applies to lossy formats.
+
+    Returns ``True`` on success, ``False`` if the source cannot be processed
+    as an image or the thumbnail cannot be written.
+    """
+    try:
+        with Image.open(src) as img:
+            img.draft(img.mode, size)
+            img.thumbnail(size)
+            fmt = fmt or Image.registered_extensions().get(Path(dest).suffix.lower())
+            if fmt == "JPEG" and img.mode not in ("RGB", "L"):
+                img = img.convert("RGB")
+            params = {"quality": quality} if quality is not None and fmt in LOSSY_FORMATS else {}
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            img.save(dest, fmt, **params)
+        return True
+    except Exception:
+        return False
+
+
+def _render(job: Tuple[str, str, Tuple[int, int], Optional[str], Optional[int]]) -> bool:
+    src, dest, size, fmt, quality = job
+    return create_thumbnail(Path(src), Path(dest), size, fmt, quality)
+
+
+def _is_image(path: str) -> bool:
+    """Return whether Pillow can open ``path``.
+
+    Files with an extension Pillow registers are assumed to be images; any
+    other file is checked by reading its header, so a multi-GB video costs a
+    few bytes of I/O rather than a full hash.
+    """
+    if os.path.splitext(path)[1].lower() in Image.registered_extensions():
+        return True
+    try:
+        with Image.open(path):
+            return True
+    except Exception:
+        return False
+
+
+class ThumbnailCache:
+    """Content-keyed thumbnails of one ``size`` and format stored in ``thumb_dir``.
+
+    ``fmt`` is one of :data:`THUMBNAIL_FORMATS`; ``"source"`` keeps the
+    format of each source image.
+    """
+
+    def __init__(
+        self,
+        thumb_dir: Path,
+        size: Tuple[int, int] = DEFAULT_SIZE,
+        fmt: str = "source",
+        quality: Optional[int] = None,
+    ):
+        if fmt not in THUMBNAIL_FORMATS:
+            raise ValueError(f"Unknown thumbnail format '{fmt}'. Choose from: {', '.join(THUMBNAIL_FORMATS)}")
+        self.thumb_dir = Path(thumb_dir)
+        self.size = tuple(size)
+        self.fmt = fmt
+        self.quality = quality
+        self.index_path = self.thumb_dir / INDEX_NAME
+        # source path -> [size, mtime_ns, digest]
+        self.sources: Dict[str, list] = {}
+        # thumbnail names (see path_for) that failed to render
+        self.failed: set = set()
+        self.stats = {"reused": 0, "created": 0, "failed": 0}
+        # sources found missing or not to be images since the last get_many
+        self._unreadable: list = []
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if data.get("version") != INDEX_VERSION:
+            return
+        self.sources = data.get("sources", {})
+        self.failed = set(data.get("failed", []))
+
+    def save(self) -> None:
+        """Write the cache index; call once after a run."""
+        self.thumb_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_path.with_suffix(".tmp")
+        data = {"version": INDEX_VERSION, "sources": self.sources, "failed": sorted(self.failed)}
+        tmp.write_text(json.dumps(data), encoding="utf-8")
+        os.replace(tmp, self.index_path)
+
+    def digest(self, src: Path) -> Optional[str]:
+        """Return the content digest of ``src``, reusing it while the file is unchanged.
+
+        Returns ``None`` for missing or unreadable files and for files Pillow
+        cannot open (see :func:`_is_image`), which are never hashed.
+        """
+        key = os.fspath(src)
+        try:
+            st = os.stat(key)
+        except OSError:
+            self._unreadable.append(key)
+            return None
+        known = self.sources.get(key)
+        if known and known[0] == st.st_size and known[1] == st.st_mtime_ns:
+            return known[2]
+        if _is_image(key):
+            digest = hash_file(src, ("md5",))["md5"]
+        else:
+            digest = None
+            self._unreadable.append(key)
+        self.sources[key] = [st.st_size, st.st_mtime_ns, digest]
+        return digest
+
+    def path_for(self, digest: str, src: Path) -> Path:
+        w, h = self.size
+        if self.fmt == "source":
+            ext = Path(src).suffix.lower()
+        else:
+            ext = FORMAT_EXTENSIONS[self.fmt]
+        pil_format = Image.registered_extensions().get(ext)
+        quality = f"_q{self.quality}" if self.quality is not None and pil_format in LOSSY_FORMATS else ""
+        return self.thumb_dir / f"{digest}_{w}x{h}{quality}{ext}"
+
+    def get(self, src: Path) -> Optional[Path]:
+        """Return the thumbnail for ``src``, rendering it only if needed.
+
+        Returns ``None`` when ``src`` is missing or cannot be rendered.
+        """
+        return self.get_many([src])[os.fspath(src)]
+
+    def get_many(
+        self,
+        sources: Iterable[Path],
+        workers: int = 1,
+        stored: Optional[Container[str]] = None,
+    ) -> Dict[str, Optional[Path]]:
+        """Return ``{source path: thumbnail or None}`` for all ``sources``.
+
+        Changed sources are hashed on a thread pool. Missing thumbnails are
+        rendered once per distinct content, on ``workers`` processes when
+        ``workers`` is greater than one. Thumbnail names in ``stored`` (such
+        as :class:`~synchronoss_parser.sprites.SpriteSheets`) are kept
+        elsewhere and count as present even without their own file.
+        """
+        keys = list(dict.fromkeys(os.fspath(s) for s in sources))
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, 8))) as pool:
+            digests = dict(zip(keys, pool.map(self.digest, keys)))
+        unreadable, self._unreadable = self._unreadable, []
+        for src in unreadable:
+            self.stats["failed"] += 1
+            logging.warning("Failed to create thumbnail for %s", src)
+
+        result: Dict[str, Optional[Path]] = {}
+        jobs: Dict[Path, str] = {}
+        for key in keys:
+            digest = digests[key]
+            thumb = None if digest is None else self.path_for(digest, Path(key))
+            if thumb is None or thumb.name in self.failed:
+                result[key] = None
+                continue
+            result[key] = thumb
+            if thumb in jobs or (stored is not None and thumb.name in stored) or thumb.exists():
+                self.stats["reused"] += 1
+            else:
+                jobs[thumb] = key
+
+        pil_format = None if self.fmt == "source" else PIL_FORMATS[self.fmt]
+        args = [(src, os.fspath(thumb), self.size, pil_format, self.quality) for thumb, src in jobs.items()]
+        if workers > 1 and len(args) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                outcomes = list(pool.map(_render, args, chunksize=max(1, len(args) // (workers * 4))))
+        else:
+            outcomes = [_render(a) for a in args]
+
+        unrendered = set()
+        for (thumb, src), ok in zip(jobs.items(), outcomes):
+            if ok:
+                self.stats["created"] += 1
+                continue
+            self.stats["failed"] += 1
+            self.failed.add(thumb.name)
+            unrendered.add(thumb)
+            logging.warning("Failed to create thumbnail for %s", src)
+        if unrendered:
+            result = {k: (None if v in unrendered else v) for k, v in result.items()}
+        return result
@@ -3,8 +3,10 @@
 
 This script bundles the existing utilities into a single window with
 tabbed navigation so non-technical users can run them more easily. Long
-running operations are executed in background threads while an indeterminate
-``ttk.Progressbar`` is shown to keep the interface responsive.
+running operations are executed in background threads. A ``ttk.Progressbar``
+runs in indeterminate mode while inputs are scanned and switches to a
+determinate bar, with throughput and ETA in the status line, once the tool
+reports its total.
 
 Tabs provided:
 
@@ -25,7 +27,6 @@ pyinstaller --onefile synchronoss_parser/toolbox_gui.py
 
 from __future__ import annotations
 
-import sys
 import threading
 from pathlib import Path
 import tkinter as tk
@@ -36,6 +37,7 @@ from synchronoss_parser import collect_media as cm
 from synchronoss_parser import collect_attachments as ca
 from synchronoss_parser.contacts_to_excel import convert_contacts
 from synchronoss_parser import render_transcripts as rt
+from synchronoss_parser.progress import tk_progress_callback
 from synchronoss_parser.utils import normalize_phone_number
 
 
@@ -74,7 +76,9 @@ def build_collect_media_tab(nb: ttk.Notebook) -> None:
             contacts_var.set(path)
 
     def run() -> None:
+        progress.configure(mode="indeterminate", value=0)
         progress.start()
+        on_progress = tk_progress_callback(frame, progress, status_var)
 
         def task() -> None:
             root_path = Path(in_var.get()).expanduser()
@@ -106,7 +110,9 @@ def build_collect_media_tab(nb: ttk.Notebook) -> None:
 
             logfile = compiled_path / "compiled_media_log" / "compiled_media_log.xlsx"
             try:
-                records, exif_keys = cm.collect_media(root_path, compiled_path)
+                records, exif_keys = cm.collect_media(
+                    root_path, compiled_path, progress=on_progress
+                )
                 cm.write_excel(records, exif_keys, logfile)
                 msg = (
                     f"Copied {len(records)} files from '{root_path}' to '{compiled_path}' and "
@@ -192,8 +198,11 @@ def build_contacts_tab(nb: ttk.Notebook) -> None:
 
         def task() -> None:
             try:
-                rows = convert_contacts(in_var.get(), out_var.get())
+                dropped: list = []
+                rows = convert_contacts(in_var.get(), out_var.get(), dropped=dropped)
                 msg = f"Wrote {rows} rows to '{out_var.get()}'"
+                if dropped:
+                    msg += f"\nSkipped {len(dropped)} damaged record(s); run contacts-to-excel for details"
             except Exception as e:  # pragma: no cover - user feedback
                 msg = f"Error: {e}"
 
@@ -269,29 +278,29 @@ def build_render_tab(nb: ttk.Notebook) -> None:
             status_var.set(f"Contacts file '{contacts_path}' does not exist.")
             return
 
+        progress.configure(mode="indeterminate", value=0)
         progress.start()
         status_var.set("Rendering...")
+        on_progress = tk_progress_callback(frame, progress, status_var)
 
         def task() -> None:
-            old_argv = sys.argv[:]
             try:
-                sys.argv = [
-                    "render-transcripts",
-                    "--in",
-                    in_var.get(),
-                    "--out",
-                    out_var.get(),
-                    "--target-number",
-                    target,
-                    "--contacts-xlsx",
-                    contacts_path.as_posix(),
-                ]
-                rt.main()
+                rt.main(
+                    [
+                        "--in",
+                        in_var.get(),
+                        "--out",
+                        out_var.get(),
+                        "--target-number",
+                        target,
+                        "--contacts-xlsx",
+                        contacts_path.as_posix(),
+                    ],
+                    progress=on_progress,
+                )
                 msg = f"Rendered transcripts to '{out_var.get()}'"
             except Exception as e:  # pragma: no cover - user feedback
                 msg = f"Error: {e}"
-            finally:
-                sys.argv = old_argv
 
             frame.after(0, lambda: [status_var.set(msg), progress.stop()])
 
@@ -380,7 +389,9 @@ def build_collect_attachments_tab(nb: ttk.Notebook) -> None:
             contacts_var.set(path)
 
     def run() -> None:
+        progress.configure(mode="indeterminate", value=0)
         progress.start()
+        on_progress = tk_progress_callback(frame, progress, status_var)
 
         def task() -> None:
             attachments_root = Path(attachments_var.get()).expanduser()
@@ -420,7 +431,7 @@ def build_collect_attachments_tab(nb: ttk.Notebook) -> None:
             contacts_path = contacts_var.get() or None
             try:
                 records, exif_keys = ca.collect_attachments(
-                    attachments_root, compiled_path, contacts_path
+                    attachments_root, compiled_path, contacts_path, progress=on_progress
                 )
                 ca.write_excel(records, exif_keys, logfile)
                 msg = (
@@ -0,0 +1,97 @@
+import json
+import sys
+from pathlib import Path
+
+from PIL import Image
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from synchronoss_parser.attachment_log import generate_log
+
+
+def load_rows(out_dir):
+    rows = []
+    for shard in sorted((out_dir / "attachment_log_data").glob("rows-*.js")):
+        text = shard.read_text(encoding="utf-8")
+        rows.extend(json.loads(text[text.index("[") : text.rindex(")")]))
+    return rows
+
+
+def test_virtual_viewer_writes_data_shards(tmp_path):
+    messages = tmp_path / "messages"
+    folder = messages / "attachments" / "mms" / "in" / "2024-01-01"
+    folder.mkdir(parents=True)
+    Image.new("RGB", (40, 40), color="red").save(folder / "my photo.png")
+    (folder / "note.txt").write_text("text")
+    (messages / "20240101.csv").write_text(
+        "Date,Type,Direction,Attachments,Body,Sender,Recipients,\"Message ID\"\n"
+        "2024-01-01T10:00:00Z,mms,in,my photo.png|note.txt,Hi,<Alice>,Bob,id1\n"
+    )
+
+    out = tmp_path / "log"
+    generate_log(messages, out, "csv", thumb_size=32, html_mode="virtual")
+
+    page = (out / "attachment_log.html").read_text(encoding="utf-8")
+    assert "<table>" not in page
+    assert '<script src="attachment_log_data/rows-00000.js"></script>' in page
+    rows = load_rows(out)
+    assert [r[:5] for r in rows] == [
+        ["my photo.png", "<Alice>", "Bob", "2024-01-01T10:00:00+00:00", "../messages/attachments/mms/in/2024-01-01/my%20photo.png"],
+        ["note.txt", "<Alice>", "Bob", "2024-01-01T10:00:00+00:00", "../messages/attachments/mms/in/2024-01-01/note.txt"],
+    ]
+    assert rows[0][5].startswith("thumbnails/") and rows[1][5] == ""
+    assert (out / rows[0][5]).exists()
+
+
+def test_virtual_viewer_dates_are_iso(tmp_path):
+    messages = tmp_path / "messages"
+    folder = messages / "attachments" / "mms" / "in" / "2023-12-02"
+    folder.mkdir(parents=True)
+    (folder / "a.txt").write_text("a")
+    (folder / "b.txt").write_text("b")
+    (messages / "20231202.csv").write_text(
+        "Date,Type,Direction,Attachments,Body,Sender,Recipients,\"Message ID\"\n"
+        "12/02/2023 10:00:00 AM,mms,in,a.txt,Hi,Alice,Bob,id1\n"
+        "sometime,mms,in,b.txt,Hi,Alice,Bob,id2\n"
+    )
+
+    out = tmp_path / "log"
+    generate_log(messages, out, "csv", html_mode="virtual")
+
+    assert [r[3] for r in load_rows(out)] == ["2023-12-02T10:00:00", "2023-12-02"]
+
+
+def test_sprite_sheets_replace_thumbnail_files(tmp_path):
+    messages = tmp_path / "messages"
+    folder = messages / "attachments" / "mms" / "in" / "2024-01-01"
+    folder.mkdir(parents=True)
+    names = []
+    for i in range(5):
+        Image.new("RGB", (60, 30), color=(i * 40, 0, 0)).save(folder / f"p{i}.png")
+        names.append(f"p{i}.png")
+    (messages / "20240101.csv").write_text(
+        "Date,Type,Direction,Attachments,Body,Sender,Recipients,\"Message ID\"\n"
+        f"2024-01-01T10:00:00Z,mms,in,{'|'.join(names[:3])},Hi,Alice,Bob,id1\n"
+    )
+
+    out = tmp_path / "log"
+    stats = generate_log(messages, out, "csv", thumb_size=20, html_mode="virtual", sprite_sheets=True)
+    assert stats["created"] == 3
+    assert not list((out / "thumbnails").glob("*.png"))
+    sprite_map = json.loads((out / "sprites" / "sprites.json").read_text())
+    assert sprite_map["sheets"] == ["sheet-00000.png"]
+    assert sorted(c[0] for c in sprite_map["cells"].values()) == [0, 1, 2]
+    thumbs = [r[5] for r in load_rows(out)]
+    assert thumbs[1] == ["sprites/sheet-00000.png", 20, 0, 20, 10]
+
+    # A re-run reuses packed thumbnails and only adds new ones
+    (messages / "20240101.csv").write_text(
+        "Date,Type,Direction,Attachments,Body,Sender,Recipients,\"Message ID\"\n"
+        f"2024-01-01T10:00:00Z,mms,in,{'|'.join(names)},Hi,Alice,Bob,id1\n"
+    )
+    stats = generate_log(messages, out, "csv", thumb_size=20, sprite_sheets=True)
+    assert stats["created"] == 2 and stats["reused"] == 3
+    page = (out / "attachment_log.html").read_text(encoding="utf-8")
+    assert page.count("url(sprites/sheet-00000.png)") == 5
+    with Image.open(out / "sprites" / "sheet-00000.png") as sheet:
+        assert sheet.size == (16 * 20, 20)
+        assert sheet.getpixel((4 * 20 + 5, 5))[0] == 160
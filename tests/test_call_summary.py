@@ -0,0 +1,55 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from synchronoss_parser.call_summary import CallSummary, HOUR_COLUMNS, write_summary
+
+LOG = pd.DataFrame(
+    {
+        "date": ["2024-01-01T10:05:00Z", "2024-01-01 23:00:00", "01/02/2024 08:00:00", None],
+        "direction": ["Outgoing", "incoming", "missed", "outgoing"],
+        "caller": ["me", "555", "555", "me"],
+        "recipient": ["111", "me", "me", "111"],
+        "caller_name": ["me", "Bob", "Bob", "me"],
+        "recipient_name": ["Alice", "me", "me", "Alice"],
+        "duration": ["60", "00:02:00", None, "5"],
+    }
+)
+
+
+def test_call_summary_combines_chunks():
+    summary = CallSummary()
+    summary.add(LOG.iloc[:2].copy())
+    summary.add(LOG.iloc[2:].copy())
+    tables = summary.tables()
+
+    contacts = tables["by_contact"].set_index("contact")
+    assert list(contacts.index) == ["Alice", "Bob"]
+    assert contacts.loc["Alice", ["calls", "calls_outgoing", "calls_incoming"]].tolist() == [2, 2, 0]
+    assert contacts.loc["Bob", ["calls_incoming", "calls_missed", "duration"]].tolist() == [1, 1, 120]
+    assert str(contacts.loc["Bob", "first"]) == "2024-01-01 23:00:00+00:00"
+    assert str(contacts.loc["Bob", "last"]) == "2024-01-02 08:00:00+00:00"
+    assert contacts.loc["Bob", HOUR_COLUMNS].sum() == 2
+    assert contacts.loc["Bob", ["hour_08", "hour_23"]].tolist() == [1, 1]
+
+    days = tables["by_day"]
+    assert days["day"].tolist() == ["2024-01-01", "2024-01-02"]
+    assert days["calls"].tolist() == [2, 1]
+    assert days["contacts"].tolist() == [2, 1]
+    assert days["duration"].tolist() == [180, 0]
+
+
+def test_call_summary_without_direction_counts_both_parties(tmp_path):
+    summary = CallSummary()
+    summary.add(pd.DataFrame({"Date": ["2024-03-01 09:00:00"], "Sender": ["Ann"], "Recipients": ["Ben"]}))
+    tables = summary.tables()
+    contacts = tables["by_contact"].set_index("contact")
+    assert contacts.loc["Ann", "calls_in"] == 1 and contacts.loc["Ben", "calls_out"] == 1
+    assert "duration" not in contacts.columns
+
+    paths = write_summary(summary, tmp_path / "call_log_named.csv.gz")
+    assert [p.name for p in paths] == ["call_log_named_by_contact.xlsx", "call_log_named_by_day.xlsx"]
+    day = pd.read_excel(paths[1])
+    assert day.loc[0, "contacts"] == 2
@@ -119,3 +119,119 @@ def test_duplicate_filenames_same_message(tmp_path):
     ]
 
     assert len(list(compiled.glob("*.jpg"))) == 2
+
+
+def test_attachment_referenced_by_several_messages(tmp_path, monkeypatch):
+    collect_attachments = load_module()
+
+    messages_dir = tmp_path / "messages"
+    attachments_dir = messages_dir / "attachments" / "MMS" / "in" / "2024-01-01"
+    attachments_dir.mkdir(parents=True)
+    Image.new("RGB", (10, 10), color="red").save(attachments_dir / "a.jpg")
+
+    csv = (
+        "Date,Type,Direction,Attachments,Body,Sender,Recipients,\"Message ID\"\n"
+        "2024-01-01T00:00:00Z,mms,in,a.jpg,Hi,Alice,Bob,id1\n"
+        "2024-01-01T01:00:00Z,mms,in,a.jpg,Again,Carol,Bob;Dave,id2\n"
+    )
+    (messages_dir / "20240101.csv").write_text(csv)
+
+    def no_resolve(self, *args, **kwargs):
+        raise AssertionError("resolve() should not be needed to match attachments")
+
+    monkeypatch.setattr(Path, "resolve", no_resolve)
+    compiled = tmp_path / "Compiled Attachments"
+    records, _ = collect_attachments.collect_attachments(messages_dir / "attachments", compiled)
+
+    assert [(r["File Name"], r["Sender"], r["Recipient"]) for r in records] == [
+        ("Alice - 2024-01-01 00-00-00.jpg", "Alice", "Bob"),
+        ("Alice - 2024-01-01 00-00-00.jpg", "Carol", "Bob; Dave"),
+    ]
+    assert len(list(compiled.glob("*.jpg"))) == 1
+
+
+def test_dedupe_stores_identical_content_once(tmp_path):
+    collect_attachments = load_module()
+
+    messages_dir = tmp_path / "messages"
+    data = b"\x89PNG\r\n\x1a\nsame bytes"
+    for sub in ("mms/out", "mms/in", "rcs/in"):
+        folder = messages_dir / "attachments" / sub / "2024-01-01"
+        folder.mkdir(parents=True)
+        (folder / "pic.png").write_bytes(data)
+    (messages_dir / "attachments" / "rcs" / "in" / "2024-01-01" / "other.png").write_bytes(b"different")
+
+    csv = (
+        "Date,Type,Direction,Attachments,Body,Sender,Recipients,\"Message ID\"\n"
+        "2024-01-01T00:00:00Z,mms,out,pic.png,Hi,Alice,Bob;Carol,id1\n"
+        "2024-01-01T00:00:05Z,mms,in,pic.png,Hi,Alice,Bob;Carol,id2\n"
+        "2024-01-01T01:00:00Z,rcs,in,pic.png,Fwd,Bob,Dave,id3\n"
+    )
+    (messages_dir / "20240101.csv").write_text(csv)
+
+    compiled = tmp_path / "Compiled Attachments"
+    records, exif_keys = collect_attachments.collect_attachments(
+        messages_dir / "attachments", compiled, dedupe=True
+    )
+
+    stored = sorted(f.name for f in compiled.iterdir())
+    assert stored == ["Alice - 2024-01-01 00-00-05.png", "unknown - unknown-date.png"]
+    pic_rows = [r for r in records if r["File Name"] == "Alice - 2024-01-01 00-00-05.png"]
+    assert [(r["Original Path"], r["Sender"], r["Date"]) for r in pic_rows] == [
+        ("mms/in/2024-01-01/pic.png", "Alice", "2024-01-01T00:00:05Z"),
+        ("mms/out/2024-01-01/pic.png", "Alice", "2024-01-01T00:00:00Z"),
+        ("rcs/in/2024-01-01/pic.png", "Bob", "2024-01-01T01:00:00Z"),
+    ]
+    assert len({r["MD5"] for r in pic_rows}) == 1
+    assert "Original Path" not in exif_keys
+
+    counts = {}
+    rows = list(
+        collect_attachments.iter_attachments(
+            messages_dir / "attachments", tmp_path / "again", dedupe=True, stats=counts
+        )
+    )
+    assert len(rows) == 4 and counts == {"copied": 2}
+
+
+def test_main_accepts_legacy_path_arguments(tmp_path):
+    collect_attachments = load_module()
+
+    attachments = tmp_path / "messages" / "attachments"
+    day = attachments / "mms" / "in" / "2024-01-01"
+    day.mkdir(parents=True)
+    (day / "note.txt").write_text("hi")
+    compiled = tmp_path / "out"
+    logfile = tmp_path / "log.csv"
+
+    collect_attachments.main(attachments_root=attachments, compiled_path=compiled, logfile=logfile)
+
+    assert [p.read_text() for p in compiled.glob("*.txt")] == ["hi"]
+    assert logfile.exists()
+
+
+def test_undated_files_and_placeholders_match_like_reconcile(tmp_path):
+    collect_attachments = load_module()
+
+    attachments = tmp_path / "messages" / "attachments"
+    undated = attachments / "mms" / "in"
+    (undated / "2024-01-01").mkdir(parents=True)
+    (undated / "a.txt").write_text("a")
+    (undated / "b.txt").write_text("b")
+    (undated / "2024-01-01" / "null.txt").write_text("placeholder")
+    header = "Date,Type,Direction,Attachments,Body,Sender,Recipients,\"Message ID\"\n"
+    # A dated reference without its dated file falls back to the undated one
+    (tmp_path / "messages" / "20240101.csv").write_text(
+        header + "2024-01-01T00:00:00Z,mms,in,a.txt|null.txt,Hi,Alice,Bob,id1\n"
+    )
+    # References from a CSV without a date in its name have an empty day
+    (tmp_path / "messages" / "export.csv").write_text(
+        header + "2024-01-02T00:00:00Z,mms,in,b.txt,Hi,Carol,Bob,id2\n"
+    )
+
+    index = collect_attachments.build_metadata_index(tmp_path / "messages")
+    assert not any(key[3] == "null.txt" for key in index)
+
+    records, _ = collect_attachments.collect_attachments(attachments, tmp_path / "out")
+    senders = {r["File Name"].split(" - ")[0]: r["Sender"] for r in records}
+    assert senders == {"Alice": "Alice", "Carol": "Carol", "unknown": ""}
@@ -41,3 +41,41 @@ def test_write_excel_handles_rational(tmp_path):
 
     assert ws.cell(row=2, column=5).value == 0.5
     assert ws.cell(row=2, column=6).value == "2.5, 1.0"
+
+
+def test_collect_media_walks_date_and_device_folders(tmp_path):
+    collect_media = load_module()
+
+    root = tmp_path / "VZMOBILE"
+    device = root / "2024-01-02" / "My Phone"
+    (device / "DCIM").mkdir(parents=True)
+    (device / "DCIM" / "a.jpg").write_bytes(b"jpeg")
+    (device / "notes.txt").write_text("skip me")
+    (root / "not-a-date" / "dev").mkdir(parents=True)
+    (root / "not-a-date" / "dev" / "b.jpg").write_bytes(b"skip")
+
+    compiled = root / "Compiled Media"
+    records, _ = collect_media.collect_media(root, compiled, digests=("md5", "sha256"))
+
+    assert [(r["File Name"], r["Date"], r["Device"]) for r in records] == [
+        ("a.jpg", "2024-01-02", "My Phone")
+    ]
+    assert len(records[0]["SHA256"]) == 64
+    assert (compiled / "a.jpg").read_bytes() == b"jpeg"
+
+
+def test_main_accepts_legacy_path_arguments(tmp_path):
+    collect_media = load_module()
+
+    root = tmp_path / "VZMOBILE"
+    device = root / "2024-01-02" / "My Phone"
+    device.mkdir(parents=True)
+    (device / "a.jpg").write_bytes(b"jpeg")
+    compiled = tmp_path / "out"
+    logfile = tmp_path / "log.csv"
+
+    collect_media.main(root, compiled_path=compiled, logfile=logfile)
+    collect_media.main(root_path=root, compiled_path=tmp_path / "again", logfile=tmp_path / "again.csv")
+
+    assert (compiled / "a.jpg").read_bytes() == b"jpeg"
+    assert logfile.exists() and (tmp_path / "again.csv").exists()
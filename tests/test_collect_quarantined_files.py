@@ -28,3 +28,63 @@ def test_collect_quarantined_files(tmp_path):
     assert dest.exists()
     assert dest.suffix == ".png"
     assert copied[0] == dest
+
+
+def test_collect_quarantined_files_limits_members(tmp_path, caplog):
+    module = load_module()
+    root = tmp_path / "VZMOBILE"
+    root.mkdir()
+    compiled = root / "Compiled Quarantine Files"
+
+    with zipfile.ZipFile(root / "bomb.zip_file_1", "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("zeros", b"\0" * (4 << 20))
+        zf.writestr("dir/doc", b"%PDF-1.4 " + b"x" * 100)
+        zf.writestr("../escape.txt", b"text")
+
+    copied = module.collect_quarantined_files(root, compiled)
+
+    assert sorted(p.name for p in copied) == ["doc.pdf", "escape.txt"]
+    assert sorted(p.name for p in compiled.iterdir()) == ["doc.pdf", "escape.txt"]
+    assert "Skipping zeros" in caplog.text
+
+    copied = module.collect_quarantined_files(root, compiled, max_ratio=0, max_member_size=100)
+    assert [p.name for p in copied] == ["escape_1.txt"]
+
+    copied = module.collect_quarantined_files(root, compiled, max_ratio=None)
+    assert [p.name for p in copied] == ["zeros", "doc_1.pdf", "escape_2.txt"]
+    assert (compiled / "zeros").stat().st_size == 4 << 20
+
+
+def make_backup(root):
+    root.mkdir()
+    for n in range(4):
+        with zipfile.ZipFile(root / f"a{n}.zip_file_{n}", "w") as zf:
+            zf.writestr("image", b"\x89PNG\r\n\x1a\n" + bytes([n]))
+            zf.writestr("sub/image", b"GIF89a" + bytes([n]))
+            zf.writestr(f"note{n}.txt", b"note")
+    # A truncated archive and one with a corrupt member after a good one
+    (root / "b.zip_file_1").write_bytes((root / "a0.zip_file_0").read_bytes()[:40])
+    good = (root / "a1.zip_file_1").read_bytes()
+    (root / "c.zip_file_1").write_bytes(good.replace(b"GIF89a\x01", b"GIF89a\x09"))
+
+
+def test_collect_quarantined_files_parallel_matches_serial(tmp_path):
+    module = load_module()
+    results = {}
+    for workers in (1, 3):
+        root = tmp_path / f"VZMOBILE{workers}"
+        make_backup(root)
+        compiled = root / "out"
+        errors = []
+        copied = module.collect_quarantined_files(root, compiled, workers=workers, errors=errors)
+        results[workers] = (
+            [(p.name, p.read_bytes()) for p in copied],
+            [(e.path.name, e.reason.split(":")[0]) for e in errors],
+        )
+        assert sorted(p.name for p in compiled.iterdir()) == sorted(p.name for p in copied)
+
+    assert results[1] == results[3]
+    names = [name for name, _ in results[1][0]]
+    assert names[:4] == ["image.png", "image.gif", "note0.txt", "image_1.png"]
+    assert len(names) == len(set(names)) == 13
+    assert results[1][1] == [("b.zip_file_1", "BadZipFile"), ("c.zip_file_1", "BadZipFile")]
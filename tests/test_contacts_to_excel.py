@@ -0,0 +1,126 @@
+import io
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from synchronoss_parser.contacts_to_excel import build_dataframe, convert_contacts, iter_contacts
+from synchronoss_parser.render_transcripts import build_contact_lookup, load_contact_mapping
+
+DUMP = (
+    '﻿{"contacts": {"contact": [\n'
+    '{"firstname": "Alice", "lastname": "Sm\x01ith", "tel": [{"number": "111", "type": "cell"},]},\n'
+    '{"firstname": "Béa", "note": "has } and \\" inside", "tel": [{"number": "222", "preference": "1"}]},\n'
+    '{"firstname": "Carol", "deep": {"a": {"b": {"c": {"d": {"e": {"f": [1, 2]}}}}}}},\n'
+)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 20])
+def test_iter_contacts_streams_records(chunk_size):
+    contacts = list(iter_contacts(io.BytesIO(DUMP.encode("utf-8")), chunk_size))
+
+    assert [c["firstname"] for c in contacts] == ["Alice", "Béa", "Carol"]
+    assert contacts[0]["lastname"] == "Smith"
+    assert contacts[0]["tel"] == [{"number": "111", "type": "cell"}]
+    assert contacts[1]["note"] == 'has } and " inside'
+    assert contacts[2]["deep"]["a"]["b"]["c"]["d"]["e"]["f"] == [1, 2]
+
+
+def test_iter_contacts_rejects_dump_without_contact_list():
+    with pytest.raises(ValueError, match="contact list"):
+        list(iter_contacts(io.BytesIO(b'{"groups": {}}')))
+
+
+def test_convert_contacts_writes_batches(tmp_path):
+    dump = tmp_path / "contacts.txt"
+    dump.write_text(DUMP + "]}}", encoding="utf-8")
+
+    out = tmp_path / "contacts.csv"
+    assert convert_contacts(str(dump), str(out), batch_size=2) == 3
+
+    df = pd.read_csv(out, dtype=str)
+    assert list(df.columns[:5]) == ["firstname", "lastname", "phone_numbers", "phone_types", "phone_preferences"]
+    assert df["phone_numbers"].tolist()[:2] == ["111", "222"]
+    assert df["firstname"].tolist() == ["Alice", "Béa", "Carol"]
+
+
+@pytest.mark.parametrize("chunk_size", [3, 1 << 20])
+def test_iter_contacts_recovers_damaged_dump(chunk_size):
+    data = (
+        DUMP
+        + '{"firstname": "Dan" "broken": 1},\n'
+        + 'garbage,\n'
+        + '{"firstname": "Eve", "tel": [{"number": "5'
+    ).encode("utf-8")
+
+    with pytest.raises(ValueError, match="byte"):
+        list(iter_contacts(io.BytesIO(data), chunk_size))
+
+    dropped = []
+    contacts = list(iter_contacts(io.BytesIO(data), chunk_size, dropped=dropped))
+
+    assert [c["firstname"] for c in contacts] == ["Alice", "Béa", "Carol"]
+    assert [d.reason for d in dropped] == [
+        "Expecting ',' delimiter",
+        "expected a contact record",
+        "file ends inside a contact record",
+    ]
+    for d in dropped:
+        assert data[d.start:d.end] == d.data
+    assert dropped[0].data == b'{"firstname": "Dan" "broken": 1}'
+    assert dropped[1].data == b"garbage,\n"
+    assert dropped[2].end == len(data)
+
+
+def test_build_dataframe_reads_phones_from_tel_lists():
+    df = build_dataframe(
+        [
+            {"firstname": "A", "tel": [{"number": "1, ext=2", "type": "cell"}, "x", {"number": " 3 ", "preference": 1}]},
+            {"firstname": "B"},
+            {"firstname": "C", "tel": [], "email": [{"address": "c@x"}]},
+        ]
+    )
+
+    rows = df.astype(object).where(df.notna(), None).to_dict("records")
+    assert [r["phone_numbers"] for r in rows] == ["1, ext=2; 3", None, None]
+    assert [r["phone_types"] for r in rows] == ["cell", None, None]
+    assert [r["phone_preferences"] for r in rows] == ["1", None, None]
+    assert rows[0]["tel"].startswith("{'number': '1, ext=2', 'type': 'cell'}; x; ")
+    assert rows[2]["email"] == "address=c@x"
+    assert rows[0]["firstname"] == "A"
+
+
+@pytest.mark.parametrize("suffix", [".sqlite", ".csv", ".parquet"])
+def test_phone_index_feeds_contact_lookup(tmp_path, suffix):
+    dump = tmp_path / "contacts.txt"
+    dump.write_text(
+        '{"contacts": {"contact": ['
+        '{"firstname": "Alice", "lastname": "Smith", "tel": [{"number": "+1 (555) 222-3333"}, {"number": "12"}]},'
+        '{"firstname": "NoPhone"},'
+        '{"lastname": "Zed", "tel": [{"number": "999"}]}'
+        "]}}",
+        encoding="utf-8",
+    )
+    index = tmp_path / f"phones{suffix}"
+    convert_contacts(str(dump), str(tmp_path / "contacts.xlsx"), phone_index=str(index))
+
+    expected = {"5552223333": "Alice Smith", "12": "Alice Smith", "999": "Zed"}
+    assert load_contact_mapping(str(index)) == expected
+    assert load_contact_mapping(str(tmp_path / "contacts.xlsx")) == expected
+    lookup = build_contact_lookup(str(index))
+    assert lookup("555-222-3333") == "Alice Smith"
+    assert lookup("777") == "777"
+
+
+def test_convert_contacts_flattens_lists_mixed_with_numbers(tmp_path):
+    dump = tmp_path / "contacts.txt"
+    dump.write_text(
+        '{"contacts": {"contact": [{"firstname": "A", "group": 1}, {"firstname": "B", "group": [1, 2]}]}}',
+        encoding="utf-8",
+    )
+    out = tmp_path / "contacts.xlsx"
+
+    assert convert_contacts(str(dump), str(out)) == 2
+    assert pd.read_excel(out, dtype=str)["group"].tolist() == ["1", "1; 2"]
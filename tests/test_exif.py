@@ -0,0 +1,50 @@
+import sys
+from pathlib import Path
+
+from PIL import Image
+from PIL.TiffImagePlugin import IFDRational
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from synchronoss_parser import exif as exif_mod
+from synchronoss_parser.collect_media import extract_exif
+
+
+def make_image(path, fmt):
+    img = Image.new("RGB", (10, 10), color="red")
+    exif = img.getexif()
+    exif[274] = 3  # Orientation
+    exif[271] = "Canon"  # Make
+    exif.get_ifd(0x8769)[33434] = IFDRational(1, 250)  # ExposureTime
+    img.save(path, fmt, exif=exif)
+    return path
+
+
+def test_header_path_matches_pillow_for_jpeg(tmp_path):
+    src = make_image(tmp_path / "a.jpg", "JPEG")
+    fast = exif_mod.read_exif_header(src)
+    slow = exif_mod.read_exif_pillow(src)
+    assert fast["Orientation"] == 3
+    assert fast["Make"] == "Canon"
+    assert float(fast["ExposureTime"]) == float(slow["ExposureTime"])
+    assert set(fast) == set(slow)
+
+
+def test_header_path_reads_tiff(tmp_path):
+    src = make_image(tmp_path / "a.tiff", "TIFF")
+    tags = exif_mod.read_exif_header(src)
+    assert tags["Orientation"] == 3
+    assert tags["Make"] == "Canon"
+
+
+def test_read_exif_counts_each_path(tmp_path):
+    jpg = make_image(tmp_path / "a.jpg", "JPEG")
+    png = tmp_path / "b.png"
+    Image.new("RGB", (10, 10)).save(png)
+    plain = tmp_path / "c.jpg"
+    Image.new("RGB", (10, 10)).save(plain)
+
+    exif_mod.reset_exif_path_stats()
+    assert extract_exif(jpg)["ExposureTime"] == 0.004
+    assert extract_exif(png) == {}
+    assert extract_exif(plain) == {}
+    assert exif_mod.exif_path_stats() == {"header": 2, "pillow": 1}
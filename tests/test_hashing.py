@@ -0,0 +1,54 @@
+import hashlib
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from synchronoss_parser import hashing
+
+
+def test_parse_digests():
+    assert hashing.parse_digests("") == ("md5",)
+    assert hashing.parse_digests("SHA-256, md5,sha256") == ("sha256", "md5")
+    with pytest.raises(ValueError):
+        hashing.parse_digests("crc32")
+
+
+def test_copy_and_hash_computes_all_digests_in_one_pass(tmp_path):
+    src = tmp_path / "src.bin"
+    data = b"x" * 3000 + b"y" * 5
+    src.write_bytes(data)
+    dest = tmp_path / "dest.bin"
+
+    hashes = hashing.copy_and_hash(src, dest, hashing.DIGESTS, bufsize=1024)
+
+    assert dest.read_bytes() == data
+    for name in hashing.DIGESTS:
+        assert hashes[name] == hashlib.new(name, data).hexdigest()
+    assert hashing.hash_file(dest, ("sha1",)) == {"sha1": hashes["sha1"]}
+
+
+@pytest.mark.parametrize("style", hashing.MANIFEST_FORMATS)
+def test_manifest_lines(tmp_path, style):
+    root = tmp_path / "Compiled"
+    (root / "sub").mkdir(parents=True)
+    f = root / "sub" / "a.jpg"
+    f.write_bytes(b"abc")
+    hashes = hashing.hash_file(f, ("md5", "sha256"))
+
+    logfile = root / "log" / "compiled_log.xlsx"
+    with hashing.ManifestWriter.for_log(logfile, root, ("md5", "sha256"), style) as manifest:
+        manifest.add(f, hashes)
+
+    lines = manifest.path.read_text().splitlines()
+    if style == "sums":
+        assert manifest.path.name == "compiled_log.sha256sum"
+        assert lines == [f"{hashes['sha256']}  sub/a.jpg"]
+        if shutil.which("sha256sum"):
+            subprocess.run(["sha256sum", "-c", "--quiet", str(manifest.path)], cwd=root, check=True)
+    else:
+        assert lines[1] == "%%%% size,md5,sha256,filename"
+        assert lines[-1] == f"3,{hashes['md5']},{hashes['sha256']},./sub/a.jpg"
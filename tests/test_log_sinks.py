@@ -0,0 +1,66 @@
+import csv
+import json
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+from openpyxl import load_workbook
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from synchronoss_parser import log_sinks
+
+COLUMNS = ["File Name", "MD5"]
+ROWS = [
+    {"File Name": "a.jpg", "MD5": "1", "Make": "Canon"},
+    {"File Name": "b.jpg", "MD5": "2", "Orientation": 1},
+]
+
+
+def test_open_sink_picks_format_from_extension_or_flag(tmp_path):
+    assert log_sinks.resolve_log_format(tmp_path / "log.db") == ("sqlite", tmp_path / "log.db")
+    fmt, path = log_sinks.resolve_log_format(tmp_path / "log.xlsx", "jsonl")
+    assert (fmt, path) == ("jsonl", tmp_path / "log.jsonl")
+    with pytest.raises(ValueError):
+        log_sinks.resolve_log_format(tmp_path / "log.txt")
+
+
+def test_excel_sink_extends_header_for_late_keys(tmp_path):
+    with log_sinks.open_sink(tmp_path / "log.xlsx", COLUMNS) as sink:
+        sink.write_many(ROWS)
+    ws = load_workbook(tmp_path / "log.xlsx").active
+    rows = list(ws.iter_rows(values_only=True))
+    assert rows[0] == ("File Name", "MD5", "Make", "Orientation")
+    assert rows[2][3] == 1
+
+
+def test_csv_sink_stores_keys_after_sampling_as_extra(tmp_path):
+    sink = log_sinks.CsvSink(tmp_path / "log.csv", COLUMNS, sample_size=1)
+    with sink:
+        sink.write_many(ROWS)
+    with (tmp_path / "log.csv").open(newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert list(rows[0]) == ["File Name", "MD5", "Make", "Extra"]
+    assert rows[0]["Make"] == "Canon"
+    assert json.loads(rows[1]["Extra"]) == {"Orientation": 1}
+
+
+def test_jsonl_and_sqlite_sinks(tmp_path):
+    with log_sinks.open_sink(tmp_path / "log.jsonl", COLUMNS) as sink:
+        sink.write_many(ROWS)
+    lines = (tmp_path / "log.jsonl").read_text().splitlines()
+    assert [json.loads(line) for line in lines] == ROWS
+
+    with log_sinks.open_sink(tmp_path / "log.sqlite", COLUMNS) as sink:
+        sink.write_many(ROWS)
+    conn = sqlite3.connect(tmp_path / "log.sqlite")
+    rows = conn.execute('SELECT "File Name", Make, Orientation FROM log').fetchall()
+    assert rows == [("a.jpg", "Canon", None), ("b.jpg", None, 1)]
+
+
+def test_parquet_sink(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    with log_sinks.open_sink(tmp_path / "log.parquet", COLUMNS) as sink:
+        sink.write_many(ROWS)
+    table = pq.read_table(tmp_path / "log.parquet").to_pylist()
+    assert table[1]["Orientation"] == "1"
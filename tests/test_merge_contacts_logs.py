@@ -0,0 +1,69 @@
+import gzip
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from synchronoss_parser.merge_contacts_logs import merge_call_log
+
+
+def test_merge_call_log_keeps_numbers_as_text(tmp_path):
+    contacts = tmp_path / "contacts.xlsx"
+    pd.DataFrame(
+        [
+            {"firstname": "Alice", "lastname": "Smith", "phone_numbers": "+1 (555) 222-3333"},
+            {"firstname": "Bob", "lastname": "", "phone_numbers": "+44 7700 900123"},
+        ]
+    ).to_excel(contacts, index=False)
+    call_log = tmp_path / "call_log.csv"
+    call_log.write_text(
+        "caller,recipient,duration\n"
+        "+15552223333,0123,60\n"
+        "5552223333,07700900123,\n"
+        ",555-222-3333,5\n"
+    )
+
+    out = tmp_path / "named.csv"
+    assert merge_call_log(str(call_log), str(contacts), str(out)) == 3
+    df = pd.read_csv(out, dtype=str, keep_default_na=False)
+    assert df["caller_name"].tolist() == ["Alice Smith", "Alice Smith", ""]
+    assert df["recipient"].tolist() == ["0123", "07700900123", "555-222-3333"]
+    assert df["recipient_name"].tolist() == ["0123", "07700900123", "Alice Smith"]
+    assert df["duration"].tolist() == ["60", "", "5"]
+
+    merge_call_log(str(call_log), str(contacts), str(out), match_suffix=7)
+    df = pd.read_csv(out, dtype=str, keep_default_na=False)
+    assert df["recipient_name"].tolist() == ["0123", "Bob", "Alice Smith"]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_merge_call_log_chunked_gzip(tmp_path, workers):
+    contacts = tmp_path / "contacts.xlsx"
+    pd.DataFrame([{"firstname": "Alice", "lastname": "", "phone_numbers": "555-222-3333"}]).to_excel(
+        contacts, index=False
+    )
+    call_log = tmp_path / "call_log.csv"
+    lines = ["caller,recipient"] + [f"{i:03d},5552223333" if i % 2 else f"5552223333,{i:03d}" for i in range(25)]
+    call_log.write_text("\n".join(lines) + "\n")
+
+    out = tmp_path / "named.csv.gz"
+    rows = merge_call_log(str(call_log), str(contacts), str(out), chunk_size=4, workers=workers)
+    assert rows == 25
+
+    with gzip.open(out, "rt") as f:
+        df = pd.read_csv(f, dtype=str)
+    assert df["caller"].tolist()[:3] == ["5552223333", "001", "5552223333"]
+    assert df["caller_name"].tolist()[:3] == ["Alice", "001", "Alice"]
+    assert df["recipient_name"].tolist()[-2:] == ["Alice", "024"]
+
+
+@pytest.mark.parametrize("chunk_size", [None, 4])
+def test_merge_call_log_without_rows_keeps_header(tmp_path, chunk_size):
+    call_log = tmp_path / "call_log.csv"
+    call_log.write_text("caller,recipient,duration\n")
+    out = tmp_path / "named.csv"
+
+    assert merge_call_log(str(call_log), "", str(out), chunk_size=chunk_size) == 0
+    assert out.read_text().splitlines() == ["caller,recipient,duration,caller_name,recipient_name"]
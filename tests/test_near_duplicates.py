@@ -0,0 +1,55 @@
+import random
+import sys
+from pathlib import Path
+
+import pytest
+from PIL import Image, ImageDraw
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from synchronoss_parser.near_duplicates import HammingIndex, NearDuplicateIndex, hamming
+
+
+def make_picture(path, size=(200, 150), flip=False, quality=90):
+    img = Image.new("RGB", (200, 150), "white")
+    draw = ImageDraw.Draw(img)
+    draw.rectangle([20, 20, 90, 120], fill="black")
+    draw.ellipse([110, 30, 190, 110], fill="gray")
+    if flip:
+        img = img.transpose(Image.Transpose.FLIP_LEFT_RIGHT)
+    img = img.resize(size)
+    if path.suffix == ".jpg":
+        img.save(path, quality=quality)
+    else:
+        img.save(path)
+    return path
+
+
+def test_hamming_index_matches_brute_force():
+    rng = random.Random(1)
+    base = [rng.getrandbits(64) for _ in range(200)]
+    values = base + [b ^ (1 << rng.randrange(64)) ^ (1 << rng.randrange(64)) for b in base[:50]]
+    index = HammingIndex(radius=3)
+    for v in values:
+        index.add(v)
+    for q in values[:60]:
+        expected = sorted(i for i, v in enumerate(values) if hamming(q, v) <= 3)
+        assert sorted(pos for pos, _ in index.query(q)) == expected
+
+
+@pytest.mark.parametrize("algorithm", ["dhash", "phash"])
+def test_reencoded_copies_share_a_cluster(tmp_path, algorithm):
+    original = make_picture(tmp_path / "a.png")
+    resized = make_picture(tmp_path / "b.jpg", size=(100, 75), quality=40)
+    other = make_picture(tmp_path / "c.png", flip=True)
+
+    index = NearDuplicateIndex(radius=6, algorithm=algorithm)
+    cols = [index.record_columns(p.name, p) for p in (original, resized, other)]
+
+    assert cols[0]["Near-Duplicate Cluster"] == cols[1]["Near-Duplicate Cluster"]
+    assert cols[1]["Near Duplicate Of"] == "a.png"
+    assert cols[2]["Near-Duplicate Cluster"] != cols[0]["Near-Duplicate Cluster"]
+    assert index.record_columns("notes.txt", tmp_path / "notes.txt") == {}
+
+    report = tmp_path / "report.csv"
+    assert index.write_report(report) == 1
+    assert len(report.read_text().splitlines()) == 3
@@ -0,0 +1,57 @@
+import logging
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from synchronoss_parser.phone_match import PhoneMatcher
+from synchronoss_parser.render_transcripts import build_contact_lookup
+
+
+def test_phone_matcher_longest_unambiguous_suffix():
+    matcher = PhoneMatcher(
+        {
+            "447700900123": "Alice",
+            "5551234": "Bob",
+            "2025559876": "Carol",
+            "3125559876": "Dave",
+            "12345": "Bank",
+        }
+    )
+
+    assert matcher.lookup("07700 900123") == "Alice"
+    assert matcher.lookup("+1 (617) 555-1234") == "Bob"
+    assert matcher.lookup("12345") == "Bank"
+    # Too short a suffix is not a match
+    assert matcher.lookup("900123") is None
+    assert matcher.lookup("99912345") is None
+
+    match = matcher.match("4155559876")
+    assert match.ambiguous
+    assert match.suffix == 7
+    assert sorted(match.candidates) == ["Carol", "Dave"]
+    assert PhoneMatcher({"5551234": "Bob"}, min_suffix=8).lookup("6175551234") is None
+
+
+def test_contact_lookup_falls_back_to_suffix(tmp_path, caplog):
+    df = pd.DataFrame(
+        [
+            {"firstname": "Alice", "lastname": "", "phone_numbers": "+44 7700 900123"},
+            {"firstname": "Carol", "lastname": "", "phone_numbers": "202-555-9876"},
+            {"firstname": "Dave", "lastname": "", "phone_numbers": "312-555-9876"},
+        ]
+    )
+    xlsx_path = tmp_path / "contacts.xlsx"
+    df.to_excel(xlsx_path, index=False)
+
+    assert build_contact_lookup(str(xlsx_path))("07700 900123") == "07700 900123"
+
+    lookup = build_contact_lookup(str(xlsx_path), min_suffix=7)
+    assert lookup("07700 900123") == "Alice"
+    assert lookup("202-555-9876") == "Carol"
+    with caplog.at_level(logging.WARNING):
+        assert lookup("415-555-9876") == "415-555-9876"
+        assert lookup("415-555-9876") == "415-555-9876"
+    assert len(caplog.records) == 1
+    assert "Carol, Dave" in caplog.records[0].getMessage()
@@ -0,0 +1,93 @@
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from synchronoss_parser.pipeline import Pipeline, format_timings, ordered_map
+
+
+def jitter(x):
+    time.sleep(random.random() / 1000)
+    return x
+
+
+def test_results_keep_source_order_across_worker_pools():
+    pipeline = Pipeline(
+        [("double", lambda x: jitter(x * 2), 4), ("inc", lambda x: jitter(x + 1), 3)],
+        queue_size=4,
+        source_name="walk",
+        sink_name="write",
+    )
+    assert list(pipeline.run(range(200))) == [x * 2 + 1 for x in range(200)]
+    names = [t.name for t in pipeline.timings]
+    assert names == ["walk", "double", "inc", "write"]
+    assert all(t.items == 200 for t in pipeline.timings)
+    assert format_timings(pipeline.timings).startswith("Stages: walk ")
+
+
+def test_source_is_held_back_by_slow_consumer():
+    produced = []
+
+    def source():
+        for i in range(1000):
+            produced.append(i)
+            yield i
+
+    pipeline = Pipeline([("noop", lambda x: x, 2)], queue_size=2)
+    results = pipeline.run(source())
+    assert next(results) == 0
+    time.sleep(0.05)
+    # Capped at queue_size * (stages + 1) items in flight, plus one waiting
+    assert len(produced) <= 2 * 2 + 2
+    results.close()
+
+
+def test_stage_errors_are_raised_in_order_and_threads_stop():
+    def fail_on_five(x):
+        if x == 5:
+            raise ValueError("bad item")
+        return x
+
+    before = threading.active_count()
+    pipeline = Pipeline([("check", fail_on_five, 3)])
+    seen = []
+    with pytest.raises(ValueError, match="bad item"):
+        for x in pipeline.run(range(50)):
+            seen.append(x)
+    assert seen == [0, 1, 2, 3, 4]
+    assert threading.active_count() == before
+
+
+def test_source_errors_are_raised_after_its_items():
+    def source():
+        yield from range(3)
+        raise OSError("walk failed")
+
+    pipeline = Pipeline([("noop", lambda x: x, 2)], queue_size=2)
+    seen = []
+    # Slots are a bounded semaphore, so an unbalanced release fails here too
+    with pytest.raises(OSError, match="walk failed"):
+        for x in pipeline.run(source()):
+            seen.append(x)
+    assert seen == [0, 1, 2]
+    assert pipeline.timings[0].items == 3
+
+
+def test_ordered_map_keeps_order_with_a_bounded_window():
+    submitted = []
+
+    def source():
+        for x in range(50):
+            submitted.append(x)
+            yield x
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = ordered_map(pool, lambda x: jitter(x * 3), source(), 8)
+        assert next(results) == 0
+        assert len(submitted) <= 8
+        assert list(results) == [x * 3 for x in range(1, 50)]
@@ -0,0 +1,63 @@
+import io
+import json
+import pstats
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from synchronoss_parser import profiling
+from synchronoss_parser.hashing import copy_and_hash
+
+
+def test_span_is_noop_without_profiler():
+    assert profiling.active_profiler() is None
+    with profiling.span("anything") as s:
+        s.add_bytes(10)
+    profiling.count("anything")
+
+
+def test_profiling_records_nested_spans_and_bytes(tmp_path):
+    src = tmp_path / "src.bin"
+    src.write_bytes(b"x" * 5000)
+    stream = io.StringIO()
+
+    with profiling.profiling(memory=True, stream=stream) as profiler:
+        with profiling.span("outer"):
+            copy_and_hash(src, tmp_path / "dest.bin")
+            copy_and_hash(src, tmp_path / "dest2.bin")
+        profiling.count("files", 2)
+
+    assert profiling.active_profiler() is None
+    stage = profiler.stages["copy_and_hash"]
+    assert stage.calls == 2
+    assert stage.bytes == 10000
+    assert profiler.stages["outer"].wall >= stage.wall
+    assert profiler.counters["files"] == 2
+    report = stream.getvalue()
+    assert "copy_and_hash" in report and "Peak MB" in report
+
+
+def test_profile_out_writes_trace_or_cprofile(tmp_path):
+    trace = tmp_path / "run.json"
+    with profiling.profiling(out=trace, stream=io.StringIO()):
+        with profiling.span("stage", nbytes=3):
+            pass
+    events = json.loads(trace.read_text())["traceEvents"]
+    assert events[0]["name"] == "stage" and events[0]["ph"] == "X"
+    assert events[0]["args"] == {"bytes": 3}
+
+    prof = tmp_path / "run.prof"
+    with profiling.profiling(out=prof, stream=io.StringIO()):
+        sum(range(100))
+    assert pstats.Stats(str(prof)).total_calls > 0
+
+
+def test_timed_decorator_wraps_function():
+    @profiling.timed("work")
+    def work(x):
+        return x * 2
+
+    assert work(2) == 4
+    with profiling.profiling(stream=io.StringIO()) as profiler:
+        assert work(3) == 6
+    assert profiler.stages["work"].calls == 1
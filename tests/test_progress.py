@@ -0,0 +1,54 @@
+import io
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from synchronoss_parser.collect_quarantined_files import collect_quarantined_files
+from synchronoss_parser.progress import ConsoleProgress, Progress, ProgressEvent, format_progress
+
+
+def test_tracker_without_callback_is_inert():
+    tracker = Progress()
+    tracker.start(10)
+    tracker.advance(5, 100)
+    tracker.finish()
+    assert not tracker.active
+    assert tracker.done == 0
+
+
+def test_tracker_throttles_and_reports_totals():
+    events = []
+    tracker = Progress(events.append, "Copying", interval=3600)
+    tracker.start(3)
+    for _ in range(3):
+        tracker.advance(1, 1_000_000)
+    tracker.finish()
+
+    assert [e.done for e in events] == [0, 3]
+    assert events[0].total == 3
+    assert events[-1].finished and events[-1].bytes_done == 3_000_000
+    assert events[-1].fraction == 1.0
+
+
+def test_format_and_console_line():
+    event = ProgressEvent("Copying", 5, 10, 2_000_000, 2.0, 2.5, 1.0, 2.0)
+    assert format_progress(event) == "Copying: 5/10 (50%) · 2.5 files/s · 1.0 MB/s · ETA 0:00:02"
+
+    stream = io.StringIO()
+    ConsoleProgress(stream)(ProgressEvent("", 1, None, 0, 1.0, 1.0, 0.0, None, finished=True))
+    assert stream.getvalue() == "\r1 · 1.0 files/s · done in 0:00:01\n"
+
+
+def test_collector_emits_pre_scan_total(tmp_path):
+    import zipfile
+
+    root = tmp_path / "VZMOBILE"
+    root.mkdir()
+    for i in range(2):
+        with zipfile.ZipFile(root / f"a.zip_file_{i}", "w") as zf:
+            zf.writestr(f"f{i}", b"data")
+
+    events = []
+    collect_quarantined_files(root, root / "out", progress=events.append)
+    assert events[0].total == 2 and events[0].done == 0
+    assert events[-1].finished and events[-1].done == 2
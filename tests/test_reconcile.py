@@ -0,0 +1,51 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from synchronoss_parser import reconcile
+
+
+def test_reconcile_lists_missing_orphaned_and_multiple(tmp_path):
+    messages = tmp_path / "messages"
+    day = messages / "attachments" / "mms" / "in" / "2024-01-01"
+    day.mkdir(parents=True)
+    (day / "a.jpg").write_bytes(b"a")
+    (day / "orphan.jpg").write_bytes(b"o")
+    undated = messages / "attachments" / "mms" / "out"
+    undated.mkdir(parents=True)
+    (undated / "b.png").write_bytes(b"b")
+    (messages / "attachments" / "stray.txt").write_bytes(b"s")
+
+    (messages / "20240101.csv").write_text(
+        "Date,Type,Direction,Attachments,Body,Sender,Recipients,\"Message ID\"\n"
+        "2024-01-01T00:00:00Z,MMS,in,a.jpg,Hi,1,2,id1\n"
+        "2024-01-01T00:01:00Z,mms,in,a.jpg|gone.jpg|null,Hi,1,2,id2\n"
+        "2024-01-01T00:02:00Z,mms,out,b.png,Hi,2,1,id3\n"
+    )
+
+    result = reconcile.reconcile(messages)
+
+    assert result.references == 4
+    assert result.files == 4
+    assert result.missing == {("mms", "in", "2024-01-01", "gone.jpg"): (1, "20240101.csv", "id2")}
+    assert result.orphaned == ["mms/in/2024-01-01/orphan.jpg", "stray.txt"]
+    assert result.multiple == [("mms/in/2024-01-01/a.jpg", 2)]
+
+    paths = reconcile.write_report(result, tmp_path / "out")
+    assert [p.name for p in paths] == ["missing.csv", "orphaned.csv", "multiply_referenced.csv"]
+    assert "gone.jpg" in paths[0].read_text()
+
+
+def test_reconcile_counts_short_rows(tmp_path):
+    messages = tmp_path / "messages"
+    (messages / "attachments").mkdir(parents=True)
+    (messages / "20240101.csv").write_text(
+        "Type,Direction,Attachments,\"Message ID\",Extra\n"
+        "mms,in,gone.jpg,id1\n"
+        "mms,in\n"
+    )
+
+    result = reconcile.reconcile(messages)
+
+    assert result.references == 1
+    assert result.missing == {("mms", "in", "2024-01-01", "gone.jpg"): (1, "20240101.csv", "id1")}
@@ -0,0 +1,99 @@
+import json
+import sys
+from pathlib import Path
+
+from PIL import Image, JpegImagePlugin
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from synchronoss_parser import thumbnails
+from synchronoss_parser.thumbnails import ThumbnailCache
+
+
+def test_cache_shares_thumbnails_and_skips_unchanged_sources(tmp_path, monkeypatch):
+    a = tmp_path / "in" / "a.png"
+    b = tmp_path / "out" / "b.png"
+    for p in (a, b):
+        p.parent.mkdir()
+        Image.new("RGB", (300, 200), color="red").save(p)
+    doc = tmp_path / "notes.txt"
+    doc.write_text("not an image")
+    thumb_dir = tmp_path / "thumbs"
+
+    cache = ThumbnailCache(thumb_dir, (64, 64))
+    ta, tb = cache.get(a), cache.get(b)
+    assert ta == tb and ta.name.endswith("_64x64.png")
+    assert cache.get(doc) is None
+    assert cache.get(tmp_path / "missing.png") is None
+    assert cache.stats == {"reused": 1, "created": 1, "failed": 2}
+    cache.save()
+    assert json.loads((thumb_dir / "cache_index.json").read_text())["version"] == 1
+
+    # A re-run neither hashes nor decodes unchanged sources
+    monkeypatch.setattr(thumbnails, "hash_file", lambda *a, **k: (_ for _ in ()).throw(AssertionError))
+    monkeypatch.setattr(thumbnails.Image, "open", lambda *a, **k: (_ for _ in ()).throw(AssertionError))
+    cache = ThumbnailCache(thumb_dir, (64, 64))
+    assert cache.get(a) == ta
+    assert cache.get(doc) is None
+    assert cache.stats == {"reused": 1, "created": 0, "failed": 0}
+
+
+def test_webp_thumbnails_rendered_on_process_pool(tmp_path):
+    sources = []
+    for i, color in enumerate(("red", "green", "blue")):
+        src = tmp_path / f"img{i}.jpg"
+        Image.new("RGB", (1600, 1200), color=color).save(src)
+        sources.append(src)
+
+    cache = ThumbnailCache(tmp_path / "thumbs", (64, 64), fmt="webp", quality=60)
+    result = cache.get_many(sources, workers=2)
+
+    assert cache.stats["created"] == 3
+    for src in sources:
+        thumb = result[str(src)]
+        assert thumb.name.endswith("_64x64_q60.webp")
+        with Image.open(thumb) as img:
+            assert img.format == "WEBP" and max(img.size) == 64
+
+
+def test_jpeg_sources_use_draft_decoding(tmp_path, monkeypatch):
+    src = tmp_path / "big.jpg"
+    Image.new("RGB", (2048, 1536), color="red").save(src)
+    requested = []
+    original = JpegImagePlugin.JpegImageFile.draft
+
+    def spy(self, mode, size):
+        result = original(self, mode, size)
+        requested.append(self.size)
+        return result
+
+    monkeypatch.setattr(JpegImagePlugin.JpegImageFile, "draft", spy)
+    assert thumbnails.create_thumbnail(src, tmp_path / "t.png", (128, 128))
+    assert requested[0] == (256, 192)  # 1/8 scale
+
+
+def test_non_images_are_not_hashed(tmp_path, monkeypatch):
+    video = tmp_path / "clip.mp4"
+    video.write_bytes(b"\0\0\0\x18ftypmp42" + b"\0" * 4096)
+    monkeypatch.setattr(thumbnails, "hash_file", lambda *a, **k: (_ for _ in ()).throw(AssertionError))
+
+    cache = ThumbnailCache(tmp_path / "thumbs", (64, 64))
+    assert cache.get(video) is None
+    assert cache.stats["failed"] == 1
+    assert cache.sources[str(video)][2] is None
+
+
+def test_failed_renders_are_remembered_per_format_and_quality(tmp_path, monkeypatch):
+    src = tmp_path / "a.png"
+    Image.new("RGB", (300, 200), color="red").save(src)
+    thumb_dir = tmp_path / "thumbs"
+    monkeypatch.setattr(thumbnails, "create_thumbnail", lambda *a, **k: False)
+
+    cache = ThumbnailCache(thumb_dir, (64, 64), fmt="jpeg", quality=50)
+    assert cache.get(src) is None
+    assert cache.failed == {f"{cache.digest(src)}_64x64_q50.jpg"}
+    cache.save()
+    monkeypatch.undo()
+
+    assert ThumbnailCache(thumb_dir, (64, 64), fmt="jpeg", quality=50).get(src) is None
+    assert ThumbnailCache(thumb_dir, (64, 64), fmt="jpeg", quality=80).get(src).name.endswith("_64x64_q80.jpg")
+    assert ThumbnailCache(thumb_dir, (64, 64), fmt="png").get(src).name.endswith("_64x64.png")
@@ -0,0 +1,51 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from synchronoss_parser.walker import scan_dirs, scan_files, scan_many
+
+
+@pytest.fixture
+def tree(tmp_path):
+    for rel in [
+        "b/2.JPG",
+        "b/notes.txt",
+        "a/1.jpg",
+        "a/deep/3.png",
+        "out/copied.jpg",
+        "x.zip_file_1",
+        "top.jpg",
+    ]:
+        p = tmp_path / rel
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_text("x")
+    return tmp_path
+
+
+def rel_names(root, entries):
+    return [Path(e.path).relative_to(root).as_posix() for e in entries]
+
+
+def test_scan_files_filters_and_prunes_in_order(tree):
+    entries = scan_files(tree, extensions={".jpg", ".png"}, exclude_dirs=[tree / "out"])
+    assert rel_names(tree, entries) == ["top.jpg", "a/1.jpg", "a/deep/3.png", "b/2.JPG"]
+
+    zips = scan_files(tree, patterns=["*.zip_file_*"])
+    assert rel_names(tree, zips) == ["x.zip_file_1"]
+
+
+def test_parallel_walk_keeps_order(tree):
+    serial = rel_names(tree, scan_files(tree))
+    assert rel_names(tree, scan_files(tree, workers=3)) == serial
+
+    roots = [tree / "b", tree / "a"]
+    pairs = list(scan_many(roots, extensions={".jpg"}, workers=2))
+    assert [(Path(r).name, e.name) for r, e in pairs] == [("b", "2.JPG"), ("a", "1.jpg")]
+
+
+def test_scan_dirs_matches_pattern(tree):
+    (tree / "2024-01-01").mkdir()
+    assert [d.name for d in scan_dirs(tree, "20??-??-??")] == ["2024-01-01"]
+    assert [d.name for d in scan_dirs(tree)] == ["2024-01-01", "a", "b", "out"]